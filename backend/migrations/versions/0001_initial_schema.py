@@ -0,0 +1,81 @@
+"""initial schema
+
+Creates the agents, campaigns, contacts and call_logs tables exactly as the app
+created them with Base.metadata.create_all before migrations existed. Databases
+built that way are already at this revision: run `alembic stamp 0001` once, then
+`alembic upgrade head` applies everything added since.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'agents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('system_prompt', sa.Text(), nullable=False),
+        sa.Column('llm_provider', sa.String(), nullable=False),
+        sa.Column('llm_model', sa.String(), nullable=False),
+        sa.Column('tts_voice_id', sa.String(), nullable=False),
+        sa.Column('stt_provider', sa.String(), nullable=False),
+        sa.Column('voice_id', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_agents_id', 'agents', ['id'])
+    op.create_index('ix_agents_name', 'agents', ['name'])
+
+    op.create_table(
+        'campaigns',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('agent_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['agent_id'], ['agents.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_campaigns_id', 'campaigns', ['id'])
+    op.create_index('ix_campaigns_name', 'campaigns', ['name'])
+
+    op.create_table(
+        'contacts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('phone_number', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_contacts_id', 'contacts', ['id'])
+    op.create_index('ix_contacts_phone_number', 'contacts', ['phone_number'])
+
+    op.create_table(
+        'call_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('call_sid', sa.String(), nullable=False),
+        sa.Column('from_number', sa.String(), nullable=True),
+        sa.Column('start_time', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('full_transcript', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_call_logs_id', 'call_logs', ['id'])
+    op.create_index('ix_call_logs_call_sid', 'call_logs', ['call_sid'], unique=True)
+    op.create_index('ix_call_logs_from_number', 'call_logs', ['from_number'])
+
+
+def downgrade():
+    op.drop_table('call_logs')
+    op.drop_table('contacts')
+    op.drop_table('campaigns')
+    op.drop_table('agents')
@@ -0,0 +1,34 @@
+"""campaign dialer settings
+
+Adds the concurrent dialer's per-campaign settings (services/campaign_service.py)
+and an index on campaigns.status, used to resume running campaigns at startup.
+Existing campaigns keep dialing one contact at a time.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('campaigns') as batch_op:
+        batch_op.add_column(sa.Column('dialer_mode', sa.String(), server_default='sequential', nullable=False))
+        batch_op.add_column(sa.Column('max_concurrent_calls', sa.Integer(), server_default='5', nullable=False))
+        batch_op.add_column(sa.Column('calls_per_second', sa.Float(), server_default='1.0', nullable=False))
+    op.create_index('ix_campaigns_status', 'campaigns', ['status'])
+
+
+def downgrade():
+    op.drop_index('ix_campaigns_status', table_name='campaigns')
+    with op.batch_alter_table('campaigns') as batch_op:
+        batch_op.drop_column('calls_per_second')
+        batch_op.drop_column('max_concurrent_calls')
+        batch_op.drop_column('dialer_mode')
@@ -0,0 +1,39 @@
+"""contact leases
+
+Adds the dialer's work-item lease columns to contacts (services/campaign_queue.py)
+and the indexes behind contact queries:
+  - contacts (campaign_id, status)   status counts and claiming pending contacts
+  - contacts (campaign_id, id)       keyset pagination of a campaign's contacts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.add_column(sa.Column('lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('dialed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_contacts_campaign_id_status', 'contacts', ['campaign_id', 'status'])
+    op.create_index('ix_contacts_campaign_id_id', 'contacts', ['campaign_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_contacts_campaign_id_id', table_name='contacts')
+    op.drop_index('ix_contacts_campaign_id_status', table_name='contacts')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('dialed_at')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
@@ -0,0 +1,49 @@
+"""call tracking
+
+Adds what we know about originated calls to call_logs (services/call_tracking.py):
+the dialed number, the latest Twilio status and duration, and the agent, contact
+and campaign the call belongs to, with indexes for per-contact and per-campaign
+call history.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('call_logs') as batch_op:
+        batch_op.add_column(sa.Column('to_number', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('duration_seconds', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('agent_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('contact_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('campaign_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_call_logs_agent_id_agents', 'agents', ['agent_id'], ['id'])
+        batch_op.create_foreign_key('fk_call_logs_contact_id_contacts', 'contacts', ['contact_id'], ['id'])
+        batch_op.create_foreign_key('fk_call_logs_campaign_id_campaigns', 'campaigns', ['campaign_id'], ['id'])
+    op.create_index('ix_call_logs_contact_id', 'call_logs', ['contact_id'])
+    op.create_index('ix_call_logs_campaign_id', 'call_logs', ['campaign_id'])
+
+
+def downgrade():
+    op.drop_index('ix_call_logs_campaign_id', table_name='call_logs')
+    op.drop_index('ix_call_logs_contact_id', table_name='call_logs')
+    with op.batch_alter_table('call_logs') as batch_op:
+        batch_op.drop_constraint('fk_call_logs_campaign_id_campaigns', type_='foreignkey')
+        batch_op.drop_constraint('fk_call_logs_contact_id_contacts', type_='foreignkey')
+        batch_op.drop_constraint('fk_call_logs_agent_id_agents', type_='foreignkey')
+        batch_op.drop_column('campaign_id')
+        batch_op.drop_column('contact_id')
+        batch_op.drop_column('agent_id')
+        batch_op.drop_column('duration_seconds')
+        batch_op.drop_column('status')
+        batch_op.drop_column('to_number')
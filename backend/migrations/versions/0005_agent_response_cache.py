@@ -0,0 +1,29 @@
+"""agent response cache flag
+
+Adds agents.response_cache_enabled so individual agents can opt out of the shared
+LLM response cache (services/response_cache.py). Existing agents default to enabled.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('agents') as batch_op:
+        batch_op.add_column(
+            sa.Column('response_cache_enabled', sa.Boolean(), server_default=sa.true(), nullable=False)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('agents') as batch_op:
+        batch_op.drop_column('response_cache_enabled')
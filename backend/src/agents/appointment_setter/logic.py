@@ -1,42 +1,109 @@
 # backend/src/agents/appointment_setter/logic.py
 
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
 from ..base_agent import BaseAgent
-from .prompts import APPOINTMENT_SETTER_SYSTEM_PROMPT # <-- IMPORT THIS
-from ...services.llm_service import LLMService
+from .prompts import APPOINTMENT_SETTER_SYSTEM_PROMPT, VOICE_RESPONSE_RULES
+from ..context_builder import ContextBuilder
+from ...services.llm_service import FALLBACK_RESPONSE, LLMService
+from ...services.response_cache import ResponseCache
 
 class AppointmentSetterAgent(BaseAgent):
     """A voice agent specialized in setting appointments."""
 
     # We now expect a system_prompt to be passed in.
-    def __init__(self, llm_service: LLMService, system_prompt: str = APPOINTMENT_SETTER_SYSTEM_PROMPT):
+    def __init__(
+        self,
+        llm_service: LLMService,
+        system_prompt: str = APPOINTMENT_SETTER_SYSTEM_PROMPT,
+        response_cache: Optional[ResponseCache] = None,
+    ):
         self.llm_service = llm_service
         self.system_prompt = system_prompt
+        # Replies to repeated turns (and the greeting) are served from here when set
+        self.response_cache = response_cache
+        self.model_id = getattr(llm_service, "model_id", type(llm_service).__name__)
+        # Keeps long calls inside the model's token budget; the system prompt is its fixed prefix
+        self.context = ContextBuilder(system_prompt + "\n\n" + VOICE_RESPONSE_RULES, self.model_id)
+
+    def _cached(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(self.model_id, messages)
+
+    def _remember(self, messages: List[Dict[str, str]], reply: str):
+        if self.response_cache is not None:
+            self.response_cache.set(self.model_id, messages, reply)
+
+    def _generate(self, messages: List[Dict[str, str]]) -> str:
+        reply = self._cached(messages)
+        if reply is None:
+            reply = self.llm_service.get_response(messages)
+            self._remember(messages, reply)
+        return reply
+
+    async def _agenerate(self, messages: List[Dict[str, str]]) -> str:
+        reply = self._cached(messages)
+        if reply is None:
+            reply = await self.llm_service.agenerate(messages)
+            self._remember(messages, reply)
+        return reply
+
+    def _greeting_messages(self) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.system_prompt + "\n\nIMPORTANT: Generate ONLY a brief 1-sentence greeting. Maximum 15 words."},
+            {"role": "user", "content": "Start the conversation with a brief greeting."}
+        ]
+
+    def _response_messages(self, user_input: str, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Recent exchanges verbatim, older ones summarized, within the model's token budget
+        return self.context.build(user_input, conversation_history)
 
     def get_initial_greeting(self) -> str:
         """
         Generate a dynamic initial greeting using the agent's system prompt.
         """
         # Use the LLM to generate a greeting based on the system prompt
-        messages = [
-            {"role": "system", "content": self.system_prompt + "\n\nIMPORTANT: Generate ONLY a brief 1-sentence greeting. Maximum 15 words."},
-            {"role": "user", "content": "Start the conversation with a brief greeting."}
-        ]
-        
-        greeting = self.llm_service.get_response(messages)
+        greeting = self._generate(self._greeting_messages())
         return greeting
 
     def process_response(self, user_input: str, conversation_history: List[Dict[str, str]]) -> str:
         """
         Uses the LLM to generate a response based on the conversation.
         """
-        # Add extra emphasis on brevity for voice interactions
-        enhanced_prompt = self.system_prompt + "\n\n**CRITICAL FOR VOICE: Respond in MAXIMUM 2 short sentences (under 30 words total). No bullet points. No lists. Natural speech only.**"
-        
-        messages = [{"role": "system", "content": enhanced_prompt}]
-        messages.extend(conversation_history)
-        messages.append({"role": "user", "content": user_input})
-        
-        ai_response = self.llm_service.get_response(messages)
+        ai_response = self._generate(self._response_messages(user_input, conversation_history))
         
-        return ai_response
\ No newline at end of file
+        return ai_response
+
+    async def aget_initial_greeting(self) -> str:
+        """Async version of get_initial_greeting using the LLM's async client."""
+        return await self._agenerate(self._greeting_messages())
+
+    async def aprocess_response(self, user_input: str, conversation_history: List[Dict[str, str]]) -> str:
+        """Async version of process_response using the LLM's async client."""
+        return await self._agenerate(self._response_messages(user_input, conversation_history))
+
+    async def astream_response(self, user_input: str, conversation_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Streams the agent's response token by token as the LLM produces it."""
+        messages = self._response_messages(user_input, conversation_history)
+        cached = self._cached(messages)
+        if cached is not None:
+            # A cached reply is complete already; hand it over in one piece
+            yield cached
+            return
+
+        # astream_raw raises on errors, so a reply cut off mid-stream is never cached
+        tokens = []
+        stream = self.llm_service.astream_raw(messages)
+        try:
+            async for token in stream:
+                tokens.append(token)
+                yield token
+        except Exception as e:
+            print(f"Error streaming LLM response: {e}")
+            # Only fall back if the caller has not heard anything yet
+            if not tokens:
+                yield FALLBACK_RESPONSE
+            return
+        finally:
+            await stream.aclose()
+        self._remember(messages, "".join(tokens))
@@ -26,4 +26,7 @@ You: "I'm scheduling your service appointment. Do you prefer Tuesday at 10 AM or
 
 User: "Tuesday works"
 You: "Perfect! You're booked for Tuesday at 10 AM. You'll get a confirmation text. Thanks!"
-"""
\ No newline at end of file
+"""
+
+# Appended to the system prompt of every reply turn; kept constant so the prompt prefix is too
+VOICE_RESPONSE_RULES = "**CRITICAL FOR VOICE: Respond in MAXIMUM 2 short sentences (under 30 words total). No bullet points. No lists. Natural speech only.**"
@@ -1,6 +1,7 @@
 # backend/src/agents/base_agent.py
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 
 class BaseAgent(ABC):
     """Abstract Base Class for all voice agents."""
@@ -22,4 +23,23 @@ class BaseAgent(ABC):
         Returns:
             The text of the agent's response.
         """
-        pass
\ No newline at end of file
+        pass
+
+    # --- Async API ---
+    # The defaults run the blocking methods in a worker thread so every agent can be
+    # used from async routes. Agents backed by an async LLM client should override them.
+
+    async def aget_initial_greeting(self) -> str:
+        """Async version of get_initial_greeting."""
+        return await asyncio.to_thread(self.get_initial_greeting)
+
+    async def aprocess_response(self, user_input: str, conversation_history: List[Dict[str, str]]) -> str:
+        """Async version of process_response."""
+        return await asyncio.to_thread(self.process_response, user_input, conversation_history)
+
+    async def astream_response(self, user_input: str, conversation_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Streams the agent's response in pieces as they become available.
+        The default yields the whole response at once.
+        """
+        yield await self.aprocess_response(user_input, conversation_history)
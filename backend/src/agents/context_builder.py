@@ -0,0 +1,165 @@
+# backend/src/agents/context_builder.py
+"""
+Token-aware prompt construction for conversational agents.
+
+Sending the whole history on every turn makes each turn of a long call slower and
+more expensive than the last. ContextBuilder keeps the prompt inside a per-model
+token budget instead:
+
+    [system] static prefix        agent prompt + voice rules; byte-identical every turn
+    [system] memo (optional)      compact notes on turns that no longer fit
+    ...      recent turns         whole user/assistant exchanges, newest last
+    [user]   latest input
+
+History is split into exchanges (a user message plus the agent's replies), and an
+exchange is kept or dropped as a whole, so the model never sees an answer without its
+question. When the window outgrows the budget, the oldest exchanges move into the memo
+in blocks, down to a low-water mark, so the window and memo stay unchanged for
+several turns. Together with the fixed prefix, that keeps most of the prompt identical
+from turn to turn for providers that cache prompt prefixes.
+
+Token counts are estimates (no tokenizer dependency): words, punctuation and long
+words split into pieces, which tracks BPE/SentencePiece counts for English closely
+enough to budget with.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+Messages = List[Dict[str, str]]
+
+# Formatting tokens each chat message costs on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+# Room kept free for the caller's latest message
+USER_INPUT_RESERVE_TOKENS = 100
+# After an eviction the window is cut down to this share of its budget
+LOW_WATER = 0.6
+MEMO_HEADER = "Summary of the earlier conversation (older turns are not shown):"
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text."""
+    # Common words are one token; rarer long words split roughly every 6 characters
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECES.findall(text or ""))
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def prompt_tokens(messages: Messages) -> int:
+    """Approximate prompt size of a list of chat messages."""
+    return sum(message_tokens(m) for m in messages)
+
+
+def budget_for(model_id: str) -> int:
+    """Prompt token budget for a model: LLM_CONTEXT_TOKEN_BUDGETS[model_id], else the default."""
+    budgets = settings.LLM_CONTEXT_TOKEN_BUDGETS
+    return budgets.get(model_id) or budgets.get(model_id.split(":", 1)[0]) or settings.LLM_CONTEXT_TOKEN_BUDGET
+
+
+def split_exchanges(history: Messages) -> List[Messages]:
+    """Group history into exchanges: each user message starts a new one."""
+    exchanges: List[Messages] = []
+    for message in history:
+        if message["role"] == "user" or not exchanges:
+            exchanges.append([message])
+        else:
+            exchanges[-1].append(message)
+    return exchanges
+
+
+@lru_cache(maxsize=4096)
+def _memo_line(role: str, content: str, max_words: int = 25) -> str:
+    # The first sentence carries the gist of a spoken turn; long ones are cut short
+    sentence = _SENTENCE_END.split(content.strip(), maxsplit=1)[0]
+    words = sentence.split()
+    if len(words) > max_words:
+        sentence = " ".join(words[:max_words]) + " ..."
+    speaker = "Caller" if role == "user" else "Agent"
+    return f"- {speaker}: {sentence}"
+
+
+class ContextBuilder:
+    """Builds budgeted prompts for one agent (one system prompt on one model)."""
+
+    def __init__(self, system_prompt: str, model_id: str = "", budget_tokens: int = None, memo_tokens: int = None):
+        """
+        Args:
+            system_prompt: Static system prompt, sent unchanged at the start of every prompt
+            model_id: Model the prompts are for ("provider:model"), which selects the budget
+            budget_tokens: Prompt token budget. Defaults to budget_for(model_id)
+            memo_tokens: Largest memo of older turns. Defaults to settings.LLM_CONTEXT_MEMO_TOKENS
+        """
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.prefix_tokens = message_tokens(self.system_message)
+        self.prefix_digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+        self.budget = budget_tokens or budget_for(model_id)
+        self.memo_tokens = settings.LLM_CONTEXT_MEMO_TOKENS if memo_tokens is None else memo_tokens
+        # Whatever the prefix, memo and latest input leave over is for recent exchanges
+        self.window_tokens = max(0, self.budget - self.prefix_tokens - self.memo_tokens - USER_INPUT_RESERVE_TOKENS)
+
+    def window_start(self, exchanges: List[Messages]) -> int:
+        """
+        Index of the oldest exchange kept verbatim. Replays the evictions from the start
+        of the call, so the result is the same on every turn and on every worker.
+        """
+        sizes = [prompt_tokens(exchange) for exchange in exchanges]
+        start, total = 0, 0
+        for end, size in enumerate(sizes):
+            total += size
+            if total <= self.window_tokens:
+                continue
+            # Over budget: evict in one block down to the low-water mark, but always keep the newest exchange
+            while start < end and total > self.window_tokens * LOW_WATER:
+                total -= sizes[start]
+                start += 1
+        return start
+
+    def memo(self, evicted: List[Messages]) -> Optional[str]:
+        """Extractive notes on evicted exchanges, newest kept when space runs out."""
+        if not evicted or self.memo_tokens <= 0:
+            return None
+        lines = [_memo_line(m["role"], m["content"]) for exchange in evicted for m in exchange if m["content"].strip()]
+        kept: List[str] = []
+        used = estimate_tokens(MEMO_HEADER) + MESSAGE_OVERHEAD_TOKENS
+        for line in reversed(lines):
+            cost = estimate_tokens(line)
+            if used + cost > self.memo_tokens:
+                break
+            kept.append(line)
+            used += cost
+        if not kept:
+            return None
+        omitted = len(lines) - len(kept)
+        header = MEMO_HEADER if not omitted else f"{MEMO_HEADER} ({omitted} earliest lines omitted)"
+        return "\n".join([header] + kept[::-1])
+
+    def build(self, user_input: str, history: Messages) -> Messages:
+        """Prompt for the agent's reply to `user_input` after `history`."""
+        messages, _ = self.build_with_stats(user_input, history)
+        return messages
+
+    def build_with_stats(self, user_input: str, history: Messages) -> Tuple[Messages, dict]:
+        exchanges = split_exchanges([m for m in history if m["role"] != "system"])
+        start = self.window_start(exchanges)
+        messages = [self.system_message]
+        memo = self.memo(exchanges[:start])
+        if memo:
+            messages.append({"role": "system", "content": memo})
+        for exchange in exchanges[start:]:
+            messages.extend(exchange)
+        messages.append({"role": "user", "content": user_input})
+        return messages, {
+            "prompt_tokens": prompt_tokens(messages),
+            "prefix_tokens": self.prefix_tokens,
+            "exchanges_kept": len(exchanges) - start,
+            "exchanges_summarized": start,
+        }
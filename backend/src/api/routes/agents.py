@@ -7,6 +7,11 @@ from sqlalchemy.orm import Session
 from ...core.database import get_db
 from ...models import agent as agent_model
 from ...schemas import agent as agent_schema
+from ...services.service_factory import service_factory
+from ...services.response_cache import response_cache
+from ...services.tts_cache import tts_cache
+from ...services.llm_router import llm_health
+from ...services.greeting_audio import greeting_audio
 
 router = APIRouter()
 
@@ -22,13 +27,35 @@ def create_agent(agent: agent_schema.AgentCreate, db: Session = Depends(get_db))
         llm_provider=agent.llm_provider,
         llm_model=agent.llm_model,
         tts_voice_id=agent.tts_voice_id,
-        stt_provider=agent.stt_provider
+        stt_provider=agent.stt_provider,
+        response_cache_enabled=agent.response_cache_enabled
     )
     db.add(db_agent)
     db.commit()
     db.refresh(db_agent)
     return db_agent
 
+@router.get("/response-cache/stats")
+def get_response_cache_stats():
+    """
+    Hit/miss counters of the shared LLM response cache.
+    """
+    return response_cache.stats()
+
+@router.get("/llm-router/stats")
+def get_llm_router_stats():
+    """
+    Per-model latency percentiles, error rates and circuit states, plus hedge/failover counters.
+    """
+    return llm_health.stats()
+
+@router.get("/tts-cache/stats")
+def get_tts_cache_stats():
+    """
+    Hit/miss and eviction counters of the shared synthesized-audio cache.
+    """
+    return tts_cache.stats()
+
 @router.get("/{agent_id}", response_model=agent_schema.Agent)
 def read_agent(agent_id: int, db: Session = Depends(get_db)):
     """
@@ -39,6 +66,25 @@ def read_agent(agent_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Agent not found")
     return db_agent
 
+@router.put("/{agent_id}", response_model=agent_schema.Agent)
+def update_agent(agent_id: int, agent: agent_schema.AgentCreate, db: Session = Depends(get_db)):
+    """
+    Update an agent's prompt and provider configuration.
+    Cached service clients and greeting audio built for the previous configuration are dropped.
+    """
+    db_agent = db.query(agent_model.Agent).filter(agent_model.Agent.id == agent_id).first()
+    if db_agent is None:
+        raise HTTPException(status_code=404, detail="Agent not found")
+
+    service_factory.invalidate_agent(db_agent)
+    greeting_audio.invalidate(db_agent)
+
+    for field, value in agent.model_dump().items():
+        setattr(db_agent, field, value)
+    db.commit()
+    db.refresh(db_agent)
+    return db_agent
+
 @router.get("/", response_model=List[agent_schema.Agent])
 def read_agents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
@@ -1,20 +1,30 @@
 # backend/src/api/routes/calls.py
 
+import asyncio
 import os
 import uuid
 import traceback # Import for detailed error logging
-from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException, Query
-from fastapi.responses import Response # Import Response for returning XML
+from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse # Import Response for returning XML
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from typing import Literal
 
 # --- IMPORT TWILIO'S TwiML BUILDER ---
-from twilio.twiml.voice_response import VoiceResponse, Gather
+from twilio.twiml.voice_response import VoiceResponse, Gather, Connect
 # -------------------------------------
 
-from ...core.database import get_db
+from ...core.config import settings
+from ...core.database import get_db, get_async_db, get_async_sessionmaker
 from ...services.service_factory import service_factory
+from ...services.conversation_store import conversation_store
 from ...services.telephony_service import twilio_service
+from ...services.call_tracking import call_tracking
+from ...services.media_stream import MediaStreamSession
+from ...services.greeting_audio import greeting_audio
+from ...services.response_cache import response_cache_for
+from ...services.speculative_llm import speculation_stats, speculative_responses, speculation_text_key
 from ...agents.appointment_setter.logic import AppointmentSetterAgent
 from ...models import agent as agent_model, campaign as campaign_model
 
@@ -35,6 +45,7 @@ def originate_call(request: OriginateCallRequest, db: Session = Depends(get_db))
             to_number=request.to_number,
             agent_id=request.agent_id
         )
+        call_tracking.record_originated_call(db, result["call_sid"], request.to_number, request.agent_id)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -42,17 +53,111 @@ def originate_call(request: OriginateCallRequest, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Failed to initiate call. Error: {str(e)}")
 
 
+# Content types Twilio <Play> and browsers accept for each streamed speech format
+SPEECH_MEDIA_TYPES = {"mp3": "audio/mpeg", "ulaw": "audio/basic"}
+
+
+@router.get("/speech/{agent_id}")
+async def stream_speech(
+    agent_id: int,
+    text: str = Query(..., min_length=1, max_length=2000),
+    format: Literal["mp3", "ulaw"] = Query("mp3"),
+):
+    """
+    Speak `text` in the agent's voice, streamed with chunked transfer encoding as the
+    audio is synthesized. Usable directly as a TwiML <Play> URL or an <audio> src, so
+    playback starts after the first chunk. format=ulaw returns raw 8 kHz G.711 u-law.
+    """
+    # Short-lived session: the stream can outlast the request handler by seconds
+    async with get_async_sessionmaker()() as db:
+        db_agent = await db.get(agent_model.Agent, agent_id)
+    if not db_agent:
+        raise HTTPException(status_code=404, detail=f"Agent with ID {agent_id} not found.")
+
+    tts = service_factory.get_services_for_agent(db_agent).tts
+    return StreamingResponse(tts.astream(text, ulaw=format == "ulaw"), media_type=SPEECH_MEDIA_TYPES[format])
+
+
+@router.post("/status", status_code=204)
+async def call_status_callback(
+    db: AsyncSession = Depends(get_async_db),
+    CallSid: str = Form(...),
+    CallStatus: str = Form(...),
+    CallDuration: int = Form(None)
+):
+    """
+    Twilio status callback (initiated, ringing, answered, completed...). Looks the call
+    up by its SID and updates the call and its campaign contact; conversation turns go
+    to /webhook instead.
+    """
+    call_log = await call_tracking.aapply_status(db, CallSid, CallStatus, duration=CallDuration)
+    print(f"📶 Call {CallSid} is {CallStatus} (contact {call_log.contact_id}, campaign {call_log.campaign_id})")
+    return Response(status_code=204)
+
+
+def _gather_action(agent_id: int, message_count: int) -> str:
+    # The message count lets whichever worker handles the next turn detect a stale cached history
+    return f'/api/v1/calls/webhook?agent_id={agent_id}&messages={message_count}'
+
+
+def _gather(agent_id: int, message_count: int) -> Gather:
+    extra = {}
+    if settings.LLM_SPECULATION_ENABLED:
+        # Interim recognition results let the reply be generated before the caller finishes
+        extra['partialResultCallback'] = f'/api/v1/calls/webhook/partial?agent_id={agent_id}&messages={message_count}'
+    return Gather(input='speech', action=_gather_action(agent_id, message_count), speechTimeout='auto', **extra)
+
+
+@router.get("/speculation/stats")
+def get_speculation_stats():
+    """
+    Hit/waste counters of speculative LLM generation on interim transcripts.
+    """
+    return speculation_stats.stats()
+
+
+@router.post("/webhook/partial")
+async def call_webhook_partial(
+    agent_id: int = Query(...),
+    messages: int = Query(0),
+    CallSid: str = Form(...),
+    # The part of the interim result Twilio will no longer revise
+    StableSpeechResult: str = Form(""),
+):
+    """
+    Twilio <Gather> partialResultCallback: starts generating the reply to the caller's
+    words so far. call_webhook commits it if the final SpeechResult matches.
+    """
+    if not settings.LLM_SPECULATION_ENABLED or not speculation_text_key(StableSpeechResult):
+        return Response(status_code=204)
+    if speculative_responses.get(CallSid).speculating_on(StableSpeechResult):
+        # Most partial results repeat the stable text; skip the agent and history lookups
+        return Response(status_code=204)
+
+    async with get_async_sessionmaker()() as db:
+        db_agent = await db.get(agent_model.Agent, agent_id)
+    if db_agent is not None:
+        services = service_factory.get_services_for_agent(db_agent)
+        agent = AppointmentSetterAgent(
+            llm_service=services.llm, system_prompt=db_agent.system_prompt, response_cache=response_cache_for(db_agent)
+        )
+        conversation_history = await asyncio.to_thread(conversation_store.get_history, CallSid, messages)
+        speculative_responses.get(CallSid).update(StableSpeechResult, conversation_history, agent.aprocess_response)
+    return Response(status_code=204)
+
+
 @router.post("/webhook", response_class=Response(media_type="application/xml"))
 async def call_webhook(
-    db: Session = Depends(get_db),
     agent_id: int = Query(...),
+    # Messages the conversation had when the previous turn's <Gather> was issued
+    messages: int = Query(0),
     # Twilio sends speech recognition results in the 'SpeechResult' field
     SpeechResult: str = Form(None), 
     # Twilio sends the Call SID with a capital 'S'
     CallSid: str = Form(...),
-    # Twilio sends call status updates
     CallStatus: str = Form(None),
-    To: str = Form(None)
+    To: str = Form(None),
+    From: str = Form(None)
 ):
     """
     Main webhook to handle call progression. Now returns proper TwiML.
@@ -63,53 +168,54 @@ async def call_webhook(
     response = VoiceResponse()
 
     try:
-        # Update contact status based on call status
-        if To and CallStatus:
-            contact = db.query(campaign_model.Contact).filter(
-                campaign_model.Contact.phone_number == To
-            ).first()
-            
-            if contact:
-                if CallStatus in ['completed', 'answered']:
-                    contact.status = 'completed'
-                elif CallStatus in ['failed', 'busy', 'no-answer']:
-                    contact.status = 'failed'
-                elif CallStatus == 'in-progress':
-                    contact.status = 'calling'
-                db.commit()
-                print(f"Updated contact {To} status to {contact.status}")
-
-        # Fetch agent configuration
-        db_agent = db.query(agent_model.Agent).filter(agent_model.Agent.id == agent_id).first()
+        # Fetch agent configuration in a short-lived session, so the LLM turn below
+        # does not hold a pooled connection
+        async with get_async_sessionmaker()() as db:
+            db_agent = await db.get(agent_model.Agent, agent_id)
         if not db_agent:
             print(f"❌ ERROR: Agent with ID {agent_id} not found in webhook.")
             response.say("Sorry, an internal error occurred. Goodbye.")
             response.hangup()
             return Response(content=str(response), media_type="application/xml")
 
-        # Create agent-specific services based on configuration
-        print(f"🔧 Initializing services for agent {agent_id}:")
-        print(f"   LLM: {db_agent.llm_provider} ({db_agent.llm_model})")
-        print(f"   TTS Voice: {db_agent.tts_voice_id}")
-        print(f"   STT: {db_agent.stt_provider}")
+        # Agent-specific services come from the shared cache; the TwiML path only needs the LLM
+        print(f"🔧 Using services for agent {agent_id}: LLM {db_agent.llm_provider} ({db_agent.llm_model})")
+        services = service_factory.get_services_for_agent(db_agent)
         
-        services = service_factory.create_services_for_agent(db_agent)
-        llm_service = services['llm']
-        tts_service = services['tts']
-        stt_service = services['stt']
-        
-        agent = AppointmentSetterAgent(llm_service=llm_service, system_prompt=db_agent.system_prompt)
+        agent = AppointmentSetterAgent(
+            llm_service=services.llm, system_prompt=db_agent.system_prompt, response_cache=response_cache_for(db_agent)
+        )
         
-        conversation_history = [] # In a real app, you'd store and retrieve this from the DB based on CallSid
+        # The conversation so far lives in the shared store, keyed by CallSid
+        # (a cache miss reads call_logs, so keep it off the event loop)
+        conversation_history = await asyncio.to_thread(conversation_store.get_history, CallSid, messages)
+
+        if SpeechResult is None and settings.TWILIO_MEDIA_STREAMS:
+            # Hand the call over to the real-time Media Streams WebSocket
+            stream_url = settings.PUBLIC_URL.replace("https://", "wss://").replace("http://", "ws://")
+            connect = Connect()
+            connect.stream(url=f"{stream_url}/api/v1/calls/media-stream/{agent_id}")
+            response.append(connect)
+            print("📡 Responded with <Connect><Stream> for real-time audio.")
 
-        if SpeechResult is None:
+        elif SpeechResult is None:
             # This is the first webhook hit (user just answered)
-            print("🎙️ No speech result, generating initial greeting...")
-            greeting_text = agent.get_initial_greeting()
-            response.say(greeting_text)
+            prepared = await asyncio.to_thread(greeting_audio.lookup, db_agent)
+            if prepared is not None:
+                # Pre-rendered when the campaign started; Twilio just fetches the file
+                print("🎙️ No speech result, playing prepared greeting...")
+                greeting_text = prepared.text
+                response.play(prepared.audio_url)
+            else:
+                print("🎙️ No speech result, generating initial greeting...")
+                greeting_text = await agent.aget_initial_greeting()
+                response.say(greeting_text)
+            message_count = conversation_store.append(
+                CallSid, {"role": "assistant", "content": greeting_text}, from_number=From
+            )
             
             # Tell Twilio to listen for the user's response and call this webhook back
-            gather = Gather(input='speech', action=f'/api/v1/calls/webhook?agent_id={agent_id}', speechTimeout='auto')
+            gather = _gather(agent_id, message_count)
             response.append(gather)
             print("✅ Responded with greeting and gather instruction.")
 
@@ -118,8 +224,19 @@ async def call_webhook(
             user_transcript = SpeechResult
             print(f"🎤 User said: '{user_transcript}'")
 
-            ai_response_text = agent.process_response(user_transcript, conversation_history)
+            # Reuse the reply generated from Twilio's partial results if the final one matches
+            responder = speculative_responses.pop(CallSid)
+            if responder is not None:
+                ai_response_text = await responder.commit(user_transcript, conversation_history, agent.aprocess_response)
+            else:
+                ai_response_text = await agent.aprocess_response(user_transcript, conversation_history)
             print(f"🤖 AI will say: '{ai_response_text}'")
+            message_count = conversation_store.append(
+                CallSid,
+                {"role": "user", "content": user_transcript},
+                {"role": "assistant", "content": ai_response_text},
+                from_number=From,
+            )
 
             response.say(ai_response_text)
             
@@ -128,7 +245,7 @@ async def call_webhook(
                 response.hangup()
             else:
                 print("👂 Responding with Say and gathering next user input...")
-                gather = Gather(input='speech', action=f'/api/v1/calls/webhook?agent_id={agent_id}', speechTimeout='auto')
+                gather = _gather(agent_id, message_count)
                 response.append(gather)
 
         final_twiml = str(response)
@@ -144,4 +261,57 @@ async def call_webhook(
         error_response = VoiceResponse()
         error_response.say("I'm sorry, an unexpected error has occurred. Goodbye.")
         error_response.hangup()
-        return Response(content=str(error_response), media_type="application/xml")
\ No newline at end of file
+        return Response(content=str(error_response), media_type="application/xml")
+
+
+@router.websocket("/media-stream/{agent_id}")
+async def media_stream(websocket: WebSocket, agent_id: int):
+    """
+    Twilio Media Streams endpoint. Receives the caller's audio as base64 u-law frames,
+    transcribes each utterance, and streams the agent's spoken reply back as u-law frames.
+    """
+    await websocket.accept()
+
+    # Short-lived session: a call can last minutes and must not pin a pooled connection
+    async with get_async_sessionmaker()() as db:
+        db_agent = await db.get(agent_model.Agent, agent_id)
+    if not db_agent:
+        print(f"❌ ERROR: Agent with ID {agent_id} not found for media stream.")
+        await websocket.close()
+        return
+
+    services = service_factory.get_services_for_agent(db_agent)
+    agent = AppointmentSetterAgent(
+        llm_service=services.llm, system_prompt=db_agent.system_prompt, response_cache=response_cache_for(db_agent)
+    )
+
+    record_path = None
+    if settings.MEDIA_STREAM_RECORD_DIR:
+        record_path = os.path.join(settings.MEDIA_STREAM_RECORD_DIR, f"media_stream_{agent_id}_{uuid.uuid4().hex}.jsonl")
+
+    greeting = await asyncio.to_thread(greeting_audio.lookup, db_agent)
+
+    session = MediaStreamSession(
+        agent=agent,
+        stt=services.stt,
+        tts=services.tts,
+        greeting=greeting,
+        send=websocket.send_json,
+        record_path=record_path,
+        # Closing the socket ends <Connect><Stream>; nothing follows it, so the call ends
+        hangup=websocket.close,
+        conversation_store=conversation_store,
+    )
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if not await session.handle_message(message):
+                break
+    except WebSocketDisconnect:
+        print(f"Media stream WebSocket disconnected for agent {agent_id}")
+    except Exception as e:
+        print(f"🔥 Error in media stream for agent {agent_id}: {e}")
+        traceback.print_exc()
+    finally:
+        await session.close()
@@ -3,8 +3,10 @@
 # --- ALL NECESSARY IMPORTS ARE NOW INCLUDED ---
 import csv
 import io
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Response
+import json
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 # -----------------------------------------------
 
@@ -12,12 +14,19 @@ from ...core.database import get_db
 from ...models import campaign as campaign_model
 from ...schemas import campaign as campaign_schema
 from ...services.campaign_service import campaign_service
+from ...services.contact_import import import_contacts_csv
 
 router = APIRouter()
 
 @router.post("/", response_model=campaign_schema.Campaign, status_code=status.HTTP_201_CREATED)
 def create_campaign(campaign: campaign_schema.CampaignCreate, db: Session = Depends(get_db)):
-    db_campaign = campaign_model.Campaign(name=campaign.name, agent_id=campaign.agent_id)
+    db_campaign = campaign_model.Campaign(
+        name=campaign.name,
+        agent_id=campaign.agent_id,
+        dialer_mode=campaign.dialer_mode,
+        max_concurrent_calls=campaign.max_concurrent_calls,
+        calls_per_second=campaign.calls_per_second
+    )
     db.add(db_campaign)
     db.commit()
     db.refresh(db_campaign)
@@ -29,12 +38,87 @@ def read_campaigns(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
     campaigns = db.query(campaign_model.Campaign).options(joinedload(campaign_model.Campaign.contacts)).offset(skip).limit(limit).all()
     return campaigns
     
-@router.get("/{campaign_id}", response_model=campaign_schema.Campaign)
-def read_campaign(campaign_id: int, db: Session = Depends(get_db)):
+@router.get("/summary", response_model=List[campaign_schema.CampaignSummary])
+def read_campaign_summaries(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """
+    List campaigns with per-status contact counts. Unlike GET /campaigns/ this never
+    loads contact rows, so it stays cheap for dashboards that poll it.
+    """
+    return campaign_service.list_campaign_summaries(db, skip=skip, limit=limit)
+    
+@router.get("/{campaign_id}", response_model=Union[campaign_schema.Campaign, campaign_schema.CampaignSummary])
+def read_campaign(campaign_id: int, include_contacts: bool = True, db: Session = Depends(get_db)):
+    """
+    Get one campaign. With include_contacts=false the contact list is replaced by
+    per-status counts; page through contacts with GET /campaigns/{id}/contacts instead.
+    """
+    if not include_contacts:
+        db_campaign = db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).first()
+        if db_campaign is None:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+        counts = campaign_service.count_contacts_by_status(db, [campaign_id]).get(campaign_id, {})
+        return campaign_schema.CampaignSummary(
+            id=db_campaign.id,
+            name=db_campaign.name,
+            agent_id=db_campaign.agent_id,
+            status=db_campaign.status,
+            dialer_mode=db_campaign.dialer_mode,
+            max_concurrent_calls=db_campaign.max_concurrent_calls,
+            calls_per_second=db_campaign.calls_per_second,
+            total_contacts=sum(counts.values()),
+            status_breakdown=counts,
+        )
+
     db_campaign = db.query(campaign_model.Campaign).options(joinedload(campaign_model.Campaign.contacts)).filter(campaign_model.Campaign.id == campaign_id).first()
     if db_campaign is None:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return db_campaign
+    return campaign_schema.Campaign.model_validate(db_campaign)
+
+@router.get("/{campaign_id}/contacts", response_model=campaign_schema.ContactPage)
+def list_campaign_contacts(
+    campaign_id: int,
+    after: int = Query(0, ge=0, description="Cursor: return contacts with an id greater than this"),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[str] = Query(None, description="Only contacts with this status"),
+    format: Literal["json", "ndjson", "csv"] = "json",
+    db: Session = Depends(get_db)
+):
+    """
+    List a campaign's contacts with keyset pagination on Contact.id.
+
+    format=json returns one page plus next_cursor. format=ndjson or format=csv streams
+    every matching contact (after the cursor) in batches, so memory stays flat however
+    large the campaign is.
+    """
+    if not db.query(campaign_model.Campaign.id).filter(campaign_model.Campaign.id == campaign_id).first():
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    if format == "json":
+        contacts = campaign_service.get_contacts_page(db, campaign_id, after=after, limit=limit, status=status)
+        next_cursor = contacts[-1].id if len(contacts) == limit else None
+        return campaign_schema.ContactPage(contacts=contacts, next_cursor=next_cursor)
+
+    rows = campaign_service.iter_contacts(campaign_id, status=status, after=after)
+    if format == "ndjson":
+        body = (json.dumps({"id": c.id, "phone_number": c.phone_number, "status": c.status}) + "\n" for c in rows)
+        return StreamingResponse(body, media_type="application/x-ndjson")
+    return StreamingResponse(
+        _csv_lines(rows),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="campaign_{campaign_id}_contacts.csv"'},
+    )
+
+def _csv_lines(contacts):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "phone_number", "status"])
+    for contact in contacts:
+        writer.writerow([contact.id, contact.phone_number, contact.status])
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
 
 @router.get("/{campaign_id}/status")
 def get_campaign_status(campaign_id: int, db: Session = Depends(get_db)):
@@ -46,38 +130,35 @@ def get_campaign_status(campaign_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/{campaign_id}/contacts", status_code=status.HTTP_201_CREATED)
-async def add_contacts_from_csv(campaign_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def add_contacts_from_csv(campaign_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Import contacts from a CSV upload with a 'phone_number' column. The file is streamed,
+    numbers are normalized to E.164 and duplicates are skipped; the response reports
+    per-row errors and import throughput.
+    """
     db_campaign = db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).first()
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    contents = await file.read()
-    file_like_object = io.StringIO(contents.decode())
-    
     try:
-        csv_reader = csv.DictReader(file_like_object)
-        contacts_to_add = []
-        header = [h.lower().strip() for h in csv_reader.fieldnames]
-        if 'phone_number' not in header:
-             raise HTTPException(status_code=400, detail="CSV file must contain a 'phone_number' header.")
-
-        for row in csv_reader:
-            phone_number = next((row[key] for key in row if key.lower().strip() == 'phone_number'), None)
-            if phone_number:
-                contacts_to_add.append(campaign_model.Contact(
-                    phone_number=phone_number.strip(),
-                    campaign_id=campaign_id
-                ))
-    except Exception:
+        report = import_contacts_csv(db, campaign_id, file.file)
+    except ValueError as e:
+        # Missing header or an undecodable (non-UTF-8) file
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Could not process CSV file: {e}")
+    except csv.Error:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Could not process CSV file. Please ensure it is a valid CSV with a 'phone_number' header.")
-        
-    if not contacts_to_add:
-        raise HTTPException(status_code=400, detail="No valid phone numbers found in the 'phone_number' header.")
-    
-    db.add_all(contacts_to_add)
-    db.commit()
 
-    return {"message": f"{len(contacts_to_add)} contacts added to campaign {campaign_id}"}
+    if not report["inserted"] and not report["duplicates_existing"] and not report["duplicates_in_file"]:
+        raise HTTPException(status_code=400, detail={
+            "message": "No valid phone numbers found in the 'phone_number' column.",
+            "errors": report["errors"],
+        })
+
+    print(f"📥 Imported {report['inserted']} contacts into campaign {campaign_id} "
+          f"({report['rows']} rows, {report['rows_per_second']} rows/s via {report['method']})")
+    return {"message": f"{report['inserted']} contacts added to campaign {campaign_id}", **report}
 
 @router.post("/{campaign_id}/start")
 def start_campaign(campaign_id: int, db: Session = Depends(get_db)):
@@ -85,8 +166,9 @@ def start_campaign(campaign_id: int, db: Session = Depends(get_db)):
     if not db_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    # Check if campaign has contacts
-    if not db_campaign.contacts:
+    # Check if campaign has contacts (without loading them)
+    has_contacts = db.query(campaign_model.Contact.id).filter(campaign_model.Contact.campaign_id == campaign_id).first()
+    if not has_contacts:
         raise HTTPException(status_code=400, detail="Cannot start campaign: No contacts found. Please add contacts first.")
     
     try:
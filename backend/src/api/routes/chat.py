@@ -2,22 +2,24 @@
 
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 import json
 import asyncio
+import os
+import time
 
-from ...core.database import get_db
+from ...core.config import settings
+from ...core.database import get_async_sessionmaker
 from ...models import agent as agent_model
 from ...services.service_factory import service_factory
+from ...services.session_store import recent_messages, session_store
+from ...services.response_cache import response_cache_for
 from ...agents.appointment_setter.logic import AppointmentSetterAgent
+from ...utils.text_chunker import ClauseChunker
 
 router = APIRouter()
 
-# Store active chat sessions
-chat_sessions = {}
-
 class ChatMessage(BaseModel):
     agent_id: int
     message: str
@@ -30,38 +32,38 @@ class ChatResponse(BaseModel):
     session_id: str
 
 @router.post("/text", response_model=ChatResponse)
-async def chat_with_agent(chat_msg: ChatMessage, db: Session = Depends(get_db)):
+async def chat_with_agent(chat_msg: ChatMessage):
     """
     Simple text chat with an agent. Send a message, get a response.
     """
-    # Get agent from database
-    agent = db.query(agent_model.Agent).filter(agent_model.Agent.id == chat_msg.agent_id).first()
+    # Get agent from database (short-lived session so the LLM turn does not pin a connection)
+    async with get_async_sessionmaker()() as db:
+        agent = await db.get(agent_model.Agent, chat_msg.agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail=f"Agent with ID {chat_msg.agent_id} not found")
     
-    # Create only LLM service for text chat (no need for TTS/STT)
-    llm_service = service_factory.create_llm_service(
+    # Get only the (cached) LLM service for text chat (no need for TTS/STT)
+    llm_service = service_factory.get_llm_service(
         provider=agent.llm_provider or 'gemini',
         model=agent.llm_model or 'gemini-1.5-flash'
     )
     
     # Initialize the appointment setter agent
-    ai_agent = AppointmentSetterAgent(llm_service=llm_service, system_prompt=agent.system_prompt)
-    
-    # Get or create conversation history for this session
-    session_key = f"{chat_msg.agent_id}_{chat_msg.session_id}"
-    if session_key not in chat_sessions:
-        chat_sessions[session_key] = []
+    ai_agent = AppointmentSetterAgent(
+        llm_service=llm_service, system_prompt=agent.system_prompt, response_cache=response_cache_for(agent)
+    )
     
-    conversation_history = chat_sessions[session_key]
+    # Get conversation history for this session (empty for a new session).
+    # Store calls run in a worker thread: the Redis backend does blocking network I/O
+    conversation_history = await asyncio.to_thread(session_store.get, chat_msg.agent_id, chat_msg.session_id)
     
     # Get AI response
-    ai_response = ai_agent.process_response(chat_msg.message, conversation_history)
+    ai_response = await ai_agent.aprocess_response(chat_msg.message, conversation_history)
     
-    # Update conversation history with proper format
+    # Update conversation history with proper format (the store trims it to the last messages)
     conversation_history.append({"role": "user", "content": chat_msg.message})
     conversation_history.append({"role": "assistant", "content": ai_response})
-    chat_sessions[session_key] = conversation_history[-20:]  # Keep last 20 messages (10 exchanges)
+    await asyncio.to_thread(session_store.save, chat_msg.agent_id, chat_msg.session_id, conversation_history)
     
     return ChatResponse(
         agent_id=chat_msg.agent_id,
@@ -70,36 +72,108 @@ async def chat_with_agent(chat_msg: ChatMessage, db: Session = Depends(get_db)):
         session_id=chat_msg.session_id
     )
 
+async def _synthesize_clause(tts_service, text: str) -> str:
+    """Synthesize one clause into AUDIO_DIR and return its public /audio URL."""
+    # Repeated clauses are served straight from the TTS cache, which lives under AUDIO_DIR
+    path = await asyncio.to_thread(tts_service.synthesize_file, text)
+    return "/audio/" + os.path.relpath(path, settings.AUDIO_DIR).replace(os.sep, "/")
+
+async def _stream_agent_turn(websocket: WebSocket, ai_agent, user_text: str, conversation_history: list, tts_service=None) -> str:
+    """
+    Stream one agent turn over the WebSocket as clause-sized partial frames, then send
+    the full text with per-turn latency metrics. Returns the full response text.
+    """
+    started = time.perf_counter()
+    first_token_ms = None
+    first_clause_ms = None
+    chunker = ClauseChunker()
+    parts = []
+    index = 0
+
+    async def send_clause(clause: str):
+        nonlocal first_clause_ms, index
+        if first_clause_ms is None:
+            first_clause_ms = (time.perf_counter() - started) * 1000
+        await websocket.send_json({"type": "agent_response_partial", "text": clause, "index": index})
+        if tts_service is not None:
+            url = await _synthesize_clause(tts_service, clause)
+            await websocket.send_json({"type": "agent_audio", "url": url, "index": index})
+        index += 1
+
+    async for token in ai_agent.astream_response(user_text, conversation_history):
+        if first_token_ms is None:
+            first_token_ms = (time.perf_counter() - started) * 1000
+        parts.append(token)
+        for clause in chunker.feed(token):
+            await send_clause(clause)
+    for clause in chunker.flush():
+        await send_clause(clause)
+
+    full_text = "".join(parts).strip()
+    metrics = {
+        "first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+        "first_clause_ms": round(first_clause_ms, 1) if first_clause_ms is not None else None,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "clauses": index,
+    }
+    print(f"⏱️  Voice turn: first token {metrics['first_token_ms']}ms, first clause {metrics['first_clause_ms']}ms, total {metrics['total_ms']}ms")
+
+    # The final frame carries the whole text; "streamed" tells the client it was already spoken
+    await websocket.send_json({
+        "type": "agent_response",
+        "text": full_text,
+        "streamed": True,
+        "metrics": metrics
+    })
+    return full_text
+
 @router.websocket("/voice/{agent_id}")
-async def voice_chat_websocket(websocket: WebSocket, agent_id: int, db: Session = Depends(get_db)):
+async def voice_chat_websocket(
+    websocket: WebSocket,
+    agent_id: int,
+    stream: bool = False,
+    tts: str = "browser"
+):
     """
     WebSocket endpoint for real-time voice chat with an agent.
     Receives text from browser (already transcribed by browser), returns text response.
     Browser handles TTS playback using Web Speech API.
+
+    With ?stream=true the response is sent as `agent_response_partial` frames split at
+    sentence/clause boundaries while the LLM is still generating, followed by a final
+    `agent_response` frame with first-token/first-clause latency metrics. Adding
+    ?tts=server also synthesizes each clause with the agent's TTSService and sends
+    `agent_audio` frames pointing at the files under /audio.
     """
     await websocket.accept()
     
     try:
-        # Get agent from database
-        agent = db.query(agent_model.Agent).filter(agent_model.Agent.id == agent_id).first()
+        # Get agent from database (short-lived session so the socket does not pin a connection)
+        async with get_async_sessionmaker()() as db:
+            agent = await db.get(agent_model.Agent, agent_id)
         if not agent:
             await websocket.send_json({"error": f"Agent with ID {agent_id} not found"})
             await websocket.close()
             return
         
-        # Create only LLM service for voice chat (browser handles STT/TTS)
-        llm_service = service_factory.create_llm_service(
+        # Get only the (cached) LLM service for voice chat (browser handles STT/TTS)
+        llm_service = service_factory.get_llm_service(
             provider=agent.llm_provider or 'gemini',
             model=agent.llm_model or 'gemini-1.5-flash'
         )
         
         # Initialize the appointment setter agent
-        ai_agent = AppointmentSetterAgent(llm_service=llm_service, system_prompt=agent.system_prompt)
+        ai_agent = AppointmentSetterAgent(
+            llm_service=llm_service, system_prompt=agent.system_prompt, response_cache=response_cache_for(agent)
+        )
+        
+        # Optional server-side speech for streamed clauses
+        tts_service = service_factory.get_tts_service(voice_id=agent.tts_voice_id) if stream and tts == "server" else None
         
         conversation_history = []
         
         # Send initial greeting
-        greeting = ai_agent.get_initial_greeting()
+        greeting = await ai_agent.aget_initial_greeting()
         
         await websocket.send_json({
             "type": "agent_response",
@@ -117,19 +191,26 @@ async def voice_chat_websocket(websocket: WebSocket, agent_id: int, db: Session
                 if not user_text.strip():
                     continue
                 
-                # Get AI response
-                ai_response_text = ai_agent.process_response(user_text, conversation_history)
-                
-                # Send response back (browser will speak it)
-                await websocket.send_json({
-                    "type": "agent_response",
-                    "text": ai_response_text
-                })
+                if stream:
+                    # Stream clauses as they are generated (browser starts speaking early)
+                    ai_response_text = await _stream_agent_turn(
+                        websocket, ai_agent, user_text, conversation_history, tts_service
+                    )
+                else:
+                    # Get AI response
+                    ai_response_text = await ai_agent.aprocess_response(user_text, conversation_history)
+                    
+                    # Send response back (browser will speak it)
+                    await websocket.send_json({
+                        "type": "agent_response",
+                        "text": ai_response_text
+                    })
                 
                 # Update conversation history
                 conversation_history.append({"role": "user", "content": user_text})
                 conversation_history.append({"role": "assistant", "content": ai_response_text})
-                conversation_history = conversation_history[-20:]  # Keep last 20 messages
+                # Whole exchanges only; the agent windows the prompt to its token budget
+                conversation_history = recent_messages(conversation_history, settings.CHAT_SESSION_MAX_MESSAGES)
             
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for agent {agent_id}")
@@ -143,9 +224,7 @@ async def clear_chat_session(agent_id: int, session_id: str):
     """
     Clear a chat session history.
     """
-    session_key = f"{agent_id}_{session_id}"
-    if session_key in chat_sessions:
-        del chat_sessions[session_key]
+    if await asyncio.to_thread(session_store.delete, agent_id, session_id):
         return {"message": f"Session {session_id} cleared for agent {agent_id}"}
     return {"message": "Session not found"}
 
@@ -154,12 +233,5 @@ async def get_chat_sessions(agent_id: int):
     """
     Get all active sessions for an agent.
     """
-    sessions = []
-    for key in chat_sessions.keys():
-        if key.startswith(f"{agent_id}_"):
-            session_id = key.split("_", 1)[1]
-            sessions.append({
-                "session_id": session_id,
-                "message_count": len(chat_sessions[key])
-            })
+    sessions = await asyncio.to_thread(session_store.list_sessions, agent_id)
     return {"agent_id": agent_id, "sessions": sessions}
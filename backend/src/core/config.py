@@ -1,4 +1,6 @@
 # backend/src/core/config.py
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -10,11 +12,18 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str = ""  # Defaults to DATABASE_URL with its async driver (asyncpg / aiosqlite)
+    DB_POOL_SIZE: int = 10  # Persistent connections per engine (ignored for SQLite)
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed under burst load
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Reconnect connections older than this many seconds
+    DB_POOL_PRE_PING: bool = True  # Check connections on checkout so dropped ones are replaced
 
     # AI Services - Cloud APIs
     # Gemini Configuration
     GEMINI_API_KEY: str
     GEMINI_MODEL: str = "gemini-1.5-flash"  # Default model
+    GEMINI_MODEL_CACHE_SIZE: int = 256  # GenerativeModel objects kept per LLMService, one per system prompt (agent)
     
     # Groq Configuration
     GROQ_API_KEY: str
@@ -22,11 +31,25 @@ class Settings(BaseSettings):
     
     # LLM Provider Selection (gemini or groq)
     LLM_PROVIDER: str = "gemini"
+
+    # Routing across LLM models with hedging and failover (see services/llm_router.py)
+    LLM_ROUTER_ENABLED: bool = False  # Opt in: hedged requests can double provider calls, and every backup needs a valid API key
+    LLM_ROUTER_BACKENDS: str = "gemini,groq"  # Backup models, "provider" or "provider:model", after the agent's own
+    LLM_ROUTER_WINDOW: int = 100  # Recent requests per model behind p50/p95 and the error rate
+    LLM_ROUTER_HEDGE_MS: int = 1500  # Hedge deadline until a model has latency samples, and its upper bound
+    LLM_ROUTER_HEDGE_MIN_MS: int = 300  # Lower bound of the p95-based hedge deadline
+    LLM_ROUTER_BREAKER_FAILURES: int = 3  # Consecutive failures that take a model out of rotation
+    LLM_ROUTER_BREAKER_ERROR_RATE: float = 0.5  # Error rate over the window that does the same
+    LLM_ROUTER_BREAKER_COOLDOWN_SECONDS: float = 30  # Before a failed model gets a trial request
     
     # ElevenLabs Configuration
     ELEVENLABS_API_KEY: str
     ELEVENLABS_VOICE_ID: str = "21m00Tcm4TlvDq8ikWAM"  # Default voice (Rachel)
     ELEVENLABS_MODEL_ID: str = "eleven_monolingual_v1"
+    # Synthesized audio cache under AUDIO_DIR/tts_cache (see services/tts_cache.py)
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # Least recently used files are evicted past this size
+    TTS_CACHE_SWEEP_INTERVAL: float = 300  # Seconds between eviction sweeps
     
     # STT Configuration
     # Gemini Voice API for STT
@@ -35,6 +58,9 @@ class Settings(BaseSettings):
     # Deepgram Configuration
     DEEPGRAM_AUTH_TOKEN: str
     DEEPGRAM_MODEL: str = "nova-2"  # Options: nova-2, nova, enhanced, base
+    # Streaming STT (see services/streaming_stt.py)
+    STT_STREAM_ENDPOINTING_MS: int = 300  # Silence after which Deepgram ends an utterance
+    STT_STREAM_UTTERANCE_END_MS: int = 1000  # Word gap backstop when background noise defeats endpointing
     
     # STT Provider Selection (gemini or deepgram)
     STT_PROVIDER: str = "deepgram"
@@ -45,10 +71,69 @@ class Settings(BaseSettings):
     TWILIO_PHONE_NUMBER: str
     TWILIO_WEBHOOK_URL: str = ""  # Optional webhook URL
     
+    # Twilio Media Streams (real-time audio over WebSocket instead of <Say>/<Gather>)
+    TWILIO_MEDIA_STREAMS: bool = False
+    MEDIA_STREAM_SPEECH_RMS: int = 500  # Frame RMS level treated as caller speech
+    MEDIA_STREAM_END_OF_SPEECH_MS: int = 700  # Trailing silence that ends a caller utterance
+    MEDIA_STREAM_RECORD_DIR: str = ""  # If set, inbound frames are recorded here for offline replay
+    MEDIA_STREAM_STREAMING_STT: bool = False  # Stream caller audio to the STT provider instead of posting each utterance
+    MEDIA_STREAM_BARGE_IN: bool = True  # Stop the agent's audio when the caller talks over it
+
+    # Prompt windowing (see agents/context_builder.py)
+    LLM_CONTEXT_TOKEN_BUDGET: int = 1500  # Estimated prompt tokens per turn, history included
+    LLM_CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {}  # Per-model overrides keyed by "provider:model" or "provider"
+    LLM_CONTEXT_MEMO_TOKENS: int = 200  # Largest summary of turns that no longer fit the budget
+
+    # Speculative LLM generation on interim transcripts (see services/speculative_llm.py)
+    LLM_SPECULATION_ENABLED: bool = False  # Opt in: discarded speculations are paid LLM calls
+    LLM_SPECULATION_DEBOUNCE_MS: int = 150  # Interim text must hold still this long before generation starts
+
+    # Voice activity detection on caller audio (see utils/vad.py)
+    VAD_HANGOVER_MS: int = 200  # Speech decision stays on this long after the last speech frame
+    VAD_SPEECH_START_MS: int = 60  # Speech needed before an utterance starts
+    VAD_BARGE_IN_MS: int = 250  # Speech needed before the caller interrupts the agent
+    VAD_TRIM_SILENCE: bool = True  # Trim leading/trailing silence from WAV clips before transcription
+
+    # Per-call conversation state (see services/conversation_store.py)
+    CONVERSATION_STATE_TTL_SECONDS: int = 1800  # Idle calls drop out of the in-memory hot tier
+    CONVERSATION_STATE_MAX_CALLS: int = 1000
+    CONVERSATION_FLUSH_INTERVAL: float = 0.5  # Seconds between write-behind flushes to call_logs
+    
+    # Text chat sessions (see services/session_store.py)
+    CHAT_SESSION_STORE_URL: str = ""  # "" or memory:// for in-process, redis://host:6379/0 to share across workers
+    CHAT_SESSION_MAX_SESSIONS: int = 10000
+    CHAT_SESSION_IDLE_TTL_SECONDS: int = 3600
+    CHAT_SESSION_MAX_BYTES: int = 64 * 1024 * 1024  # Approximate memory cap for the in-process store
+    CHAT_SESSION_MAX_MESSAGES: int = 200  # Messages kept per session; prompts are windowed separately by token budget
+    
+    # Service client cache (see services/service_factory.py)
+    SERVICE_CACHE_SIZE: int = 32  # Cached clients per service type
+    SERVICE_CACHE_TTL_SECONDS: int = 3600
+    
+    # LLM response cache (see services/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = True  # Agents can also opt out individually
+    RESPONSE_CACHE_SIZE: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: int = 86400
+    RESPONSE_CACHE_HISTORY_MESSAGES: int = 2  # Prior messages that must match besides the latest one
+    RESPONSE_CACHE_SEMANTIC: bool = False  # Also match paraphrases by embedding similarity (Gemini embeddings)
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # Minimum cosine similarity for a paraphrase hit
+    RESPONSE_CACHE_EMBEDDING_MODEL: str = "models/text-embedding-004"
+    
     # App
     SECRET_KEY: str
     AUDIO_DIR: str
     PUBLIC_URL: str
     TEST_MODE: str = "false"  # Set to "true" to simulate calls without Twilio
+    TEST_CALL_SECONDS: float = 3.0  # Simulated call duration in TEST_MODE
+
+    # Contact CSV import (see services/contact_import.py)
+    CONTACT_IMPORT_DEFAULT_COUNTRY_CODE: str = "1"  # Prepended to national numbers without a country code
+    CONTACT_IMPORT_BATCH_SIZE: int = 5000  # Rows per INSERT/COPY batch
+    CONTACT_IMPORT_MAX_ERRORS: int = 1000  # Row errors included in the import report
+
+    # Campaign Dialer
+    DIALER_MAX_CALL_SECONDS: int = 600  # Longest a live call may hold a concurrency slot
+    DIALER_POLL_INTERVAL: float = 2.0  # Seconds between live-call completion checks
+    DIALER_LEASE_SECONDS: int = 60  # Claimed contacts become reclaimable if not renewed within this window
 
 settings = Settings()
\ No newline at end of file
@@ -1,12 +1,44 @@
 # backend/src/core/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+_ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def _engine_options(url: str) -> dict:
+    """Connection pool options from settings. SQLite keeps SQLAlchemy's own pool defaults."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def to_async_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart (postgresql -> asyncpg, sqlite -> aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}' databases; set ASYNC_DATABASE_URL explicitly.")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
 # Create the SQLAlchemy engine
 engine = create_engine(
-    settings.DATABASE_URL
+    settings.DATABASE_URL,
+    **_engine_options(settings.DATABASE_URL)
     # The 'connect_args' is only needed for SQLite, not PostgreSQL
     # connect_args={"check_same_thread": False}
 )
@@ -18,6 +50,36 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+# --- Async engine (created on first use, so the async driver is only needed if used) ---
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **_engine_options(url))
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # expire_on_commit=False: loaded objects stay usable after commit without lazy IO
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def dispose_async_engine():
+    """Close the async engine's pooled connections (called on shutdown)."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
+
+
 # --- Dependency for FastAPI ---
 def get_db():
     """
@@ -28,4 +90,13 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db for `async def` routes. Queries are awaited on the
+    event loop instead of blocking it, and do not take a threadpool slot.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
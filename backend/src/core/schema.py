@@ -0,0 +1,55 @@
+# backend/src/core/schema.py
+"""
+Startup check that the database schema is at the latest Alembic revision.
+
+Schema changes are applied by migrations (`alembic upgrade head`, run once per
+deploy), never by the app itself, so workers start without DDL round trips or
+races. Each worker only reads the alembic_version table and compares it with the
+head revision shipped in backend/migrations.
+"""
+import os
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the schema revision this code expects."""
+
+
+def head_revision() -> str:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(engine: Engine):
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def verify_schema(engine: Engine) -> str:
+    """
+    Raise SchemaVersionError unless the database is at the head migration.
+
+    Returns:
+        str: The current (head) revision.
+    """
+    expected = head_revision()
+    current = current_revision(engine)
+    if current is None and inspect(engine).has_table("agents"):
+        # Tables from before migrations (Base.metadata.create_all) match revision 0001
+        raise SchemaVersionError(
+            "Database has tables but no Alembic revision. Run 'alembic stamp 0001' and then "
+            "'alembic upgrade head' from the backend directory before starting the API."
+        )
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current or 'none'}, expected {expected}. "
+            f"Run 'alembic upgrade head' from the backend directory before starting the API."
+        )
+    return current
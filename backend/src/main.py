@@ -6,12 +6,10 @@ from fastapi.staticfiles import StaticFiles # <-- Import StaticFiles
 from .core.config import settings # <-- Import settings
 from .models import campaign as campaign_model
 from .api.routes import agents, calls, campaigns as campaigns_router, chat
-from .core.database import engine
-from .models import agent as agent_model, call as call_model
-
-agent_model.Base.metadata.create_all(bind=engine)
-call_model.Base.metadata.create_all(bind=engine)
-
+from .core.database import engine, dispose_async_engine
+from .core.schema import verify_schema
+from .services.campaign_service import campaign_service
+from .services.conversation_store import conversation_store
 
 app = FastAPI(
     title="VoiceGenie API",
@@ -38,6 +36,31 @@ app.include_router(campaigns_router.router, prefix="/api/v1/campaigns", tags=["C
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"]) 
 
 
+@app.on_event("startup")
+def check_database_schema():
+    # Tables are managed by Alembic migrations (alembic upgrade head); just make sure they ran
+    revision = verify_schema(engine)
+    print(f"🗃️  Database schema at revision {revision}")
+
+
+@app.on_event("startup")
+def resume_campaigns():
+    # Campaign progress is persisted per contact, so pick up any campaign that was
+    # still running when this worker (or a previous one) went down.
+    campaign_service.resume_running_campaigns()
+
+
+@app.on_event("shutdown")
+def flush_conversations():
+    # Write out conversation turns still waiting in the write-behind buffer
+    conversation_store.close()
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
+
 @app.get("/", tags=["Health Check"])
 def read_root():
     return {"status": "ok", "message": "Welcome to VoiceGenie API"}
\ No newline at end of file
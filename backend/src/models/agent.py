@@ -1,5 +1,5 @@
 # backend/src/models/agent.py
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Boolean, Column, Integer, String, Text, true
 from ..core.database import Base
 
 class Agent(Base):
@@ -19,5 +19,8 @@ class Agent(Base):
     # STT Configuration
     stt_provider = Column(String, default="deepgram", nullable=False)  # deepgram or gemini
     
+    # Reuse cached LLM replies for repeated turns (see services/response_cache.py)
+    response_cache_enabled = Column(Boolean, default=True, server_default=true(), nullable=False)
+    
     # Legacy field (kept for backward compatibility)
     voice_id = Column(String, default="default_voice")
\ No newline at end of file
@@ -1,5 +1,5 @@
 # backend/src/models/call.py
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
 from sqlalchemy.sql import func
 from ..core.database import Base
 
@@ -11,4 +11,12 @@ class CallLog(Base):
     from_number = Column(String, index=True)
     start_time = Column(DateTime(timezone=True), server_default=func.now())
     end_time = Column(DateTime(timezone=True), onupdate=func.now())
-    full_transcript = Column(Text)
\ No newline at end of file
+    full_transcript = Column(Text)
+
+    # Set when we originate the call (see services/call_tracking.py)
+    to_number = Column(String, nullable=True)
+    status = Column(String, nullable=True)  # Latest Twilio CallStatus
+    duration_seconds = Column(Integer, nullable=True)
+    agent_id = Column(Integer, ForeignKey("agents.id"), nullable=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=True, index=True)
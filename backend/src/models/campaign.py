@@ -1,5 +1,5 @@
 # backend/src/models/campaign.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
@@ -8,7 +8,12 @@ class Campaign(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
-    status = Column(String, default="draft", nullable=False) # e.g., "draft", "running", "paused", "completed"
+    status = Column(String, default="draft", nullable=False, index=True) # e.g., "draft", "running", "paused", "completed"
+    
+    # Dialer configuration
+    dialer_mode = Column(String, default="sequential", nullable=False)  # sequential or concurrent
+    max_concurrent_calls = Column(Integer, default=5, nullable=False)  # Cap on simultaneous live calls
+    calls_per_second = Column(Float, default=1.0, nullable=False)  # Token-bucket cap on call origination rate
     
     agent_id = Column(Integer, ForeignKey("agents.id"))
     agent = relationship("Agent")
@@ -22,5 +27,18 @@ class Contact(Base):
     phone_number = Column(String, index=True, nullable=False)
     status = Column(String, default="pending", nullable=False) # e.g., "pending", "calling", "completed", "failed"
     
+    # Dialer work-item lease (see services/campaign_queue.py)
+    lease_owner = Column(String, nullable=True)  # Worker currently holding this contact
+    lease_expires_at = Column(DateTime, nullable=True)  # Naive UTC; reclaimable once passed
+    dialed_at = Column(DateTime, nullable=True)  # Set once a call was originated; never re-dialed
+    attempts = Column(Integer, default=0, nullable=False)
+    
     campaign_id = Column(Integer, ForeignKey("campaigns.id"))
-    campaign = relationship("Campaign", back_populates="contacts")
\ No newline at end of file
+    campaign = relationship("Campaign", back_populates="contacts")
+
+    __table_args__ = (
+        # Backs per-campaign status counts and the dialer's pending/calling lookups
+        Index("ix_contacts_campaign_id_status", "campaign_id", "status"),
+        # Keyset pagination of a campaign's contacts (WHERE campaign_id = ? AND id > ? ORDER BY id)
+        Index("ix_contacts_campaign_id_id", "campaign_id", "id"),
+    )
\ No newline at end of file
@@ -12,6 +12,7 @@ class AgentBase(BaseModel):
     llm_model: str = "gemini-1.5-flash"
     tts_voice_id: str = "21m00Tcm4TlvDq8ikWAM"  # ElevenLabs voice ID
     stt_provider: str = "deepgram"  # deepgram or gemini
+    response_cache_enabled: bool = True  # Reuse cached LLM replies for repeated turns
 
 class AgentCreate(AgentBase):
     pass
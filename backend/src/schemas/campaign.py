@@ -1,6 +1,6 @@
 # backend/src/schemas/campaign.py
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 
 class ContactBase(BaseModel):
     phone_number: str
@@ -15,9 +15,19 @@ class Contact(ContactBase):
     class Config:
         from_attributes = True
 
+class ContactPage(BaseModel):
+    """One page of a campaign's contacts. Pass next_cursor as `after` to get the next page."""
+    contacts: List[Contact]
+    next_cursor: Optional[int] = None
+
 class CampaignBase(BaseModel):
     name: str
     agent_id: int
+    
+    # Dialer configuration
+    dialer_mode: Literal["sequential", "concurrent"] = "sequential"
+    max_concurrent_calls: int = Field(default=5, ge=1, le=500)
+    calls_per_second: float = Field(default=1.0, gt=0, le=100)
 
 class CampaignCreate(CampaignBase):
     pass
@@ -28,4 +38,14 @@ class Campaign(CampaignBase):
     contacts: List[Contact] = []
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CampaignSummary(CampaignBase):
+    """A campaign with per-status contact counts instead of the embedded contact list."""
+    id: int
+    status: str
+    total_contacts: int = 0
+    status_breakdown: Dict[str, int] = {}
+
+    class Config:
+        from_attributes = True
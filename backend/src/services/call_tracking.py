@@ -0,0 +1,119 @@
+# backend/src/services/call_tracking.py
+"""
+Links Twilio calls to the contacts and campaigns that placed them.
+
+Every originated call gets a CallLog row keyed by its CallSid (unique index) that
+records the contact, campaign and agent. Twilio's status callbacks then update the
+call and its contact with a single keyed lookup, instead of guessing the contact
+from the dialed phone number. A callback can arrive before the call is recorded; its
+status is stored under the SID and merged in when the call is recorded.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models import call as call_model
+from .campaign_queue import campaign_queue
+
+CallLog = call_model.CallLog
+
+# Twilio CallStatus values that end a call, mapped to the contact's final status
+TERMINAL_CONTACT_STATUS = {
+    "completed": "completed",
+    "busy": "failed",
+    "failed": "failed",
+    "no-answer": "failed",
+    "canceled": "failed",
+}
+
+
+class CallTrackingService:
+    """Records originated calls and applies Twilio status callbacks to them."""
+
+    def record_originated_call(
+        self,
+        db: Session,
+        call_sid: str,
+        to_number: str,
+        agent_id: int,
+        contact_id: Optional[int] = None,
+        campaign_id: Optional[int] = None,
+    ) -> CallLog:
+        """Store a freshly originated call. Safe if a row for the SID already exists."""
+        fields = dict(to_number=to_number, agent_id=agent_id, contact_id=contact_id, campaign_id=campaign_id)
+        try:
+            call_log = CallLog(call_sid=call_sid, status="initiated", **fields)
+            db.add(call_log)
+            db.commit()
+            return call_log
+        except IntegrityError:
+            # The conversation store (or an early status callback) created the row first
+            db.rollback()
+            call_log = db.query(CallLog).filter(CallLog.call_sid == call_sid).one()
+            for name, value in fields.items():
+                if value is not None:
+                    setattr(call_log, name, value)
+            db.commit()
+            # The call may already have ended before we got to record it
+            contact_status = TERMINAL_CONTACT_STATUS.get(call_log.status)
+            if contact_status and call_log.contact_id is not None:
+                campaign_queue.complete(db, call_log.contact_id, contact_status)
+            return call_log
+
+    def apply_status(self, db: Session, call_sid: str, call_status: str, duration: Optional[int] = None) -> CallLog:
+        """
+        Apply one Twilio status callback. Terminal statuses finish the linked contact's
+        work item so the campaign dialer frees its slot. A callback for a SID that has
+        not been recorded yet is stored, and record_originated_call() picks it up.
+
+        Returns:
+            CallLog: The call.
+        """
+        call_log = db.query(CallLog).filter(CallLog.call_sid == call_sid).first()
+        if call_log is None:
+            call_log = CallLog(call_sid=call_sid)
+            db.add(call_log)
+
+        contact_status = self._update_call(call_log, call_status, duration)
+        try:
+            db.commit()
+        except IntegrityError:
+            # The call was recorded meanwhile; apply the callback to that row
+            db.rollback()
+            return self.apply_status(db, call_sid, call_status, duration)
+        if contact_status and call_log.contact_id is not None:
+            campaign_queue.complete(db, call_log.contact_id, contact_status)
+        return call_log
+
+    async def aapply_status(self, db: AsyncSession, call_sid: str, call_status: str, duration: Optional[int] = None) -> CallLog:
+        """apply_status() for an AsyncSession."""
+        call_log = (await db.execute(select(CallLog).where(CallLog.call_sid == call_sid))).scalar_one_or_none()
+        if call_log is None:
+            call_log = CallLog(call_sid=call_sid)
+            db.add(call_log)
+
+        contact_status = self._update_call(call_log, call_status, duration)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            return await self.aapply_status(db, call_sid, call_status, duration)
+        if contact_status and call_log.contact_id is not None:
+            await campaign_queue.acomplete(db, call_log.contact_id, contact_status)
+        return call_log
+
+    @staticmethod
+    def _update_call(call_log: CallLog, call_status: str, duration: Optional[int]) -> Optional[str]:
+        """Copy the callback onto the call. Returns the contact's final status for terminal callbacks."""
+        call_log.status = call_status
+        if duration is not None:
+            call_log.duration_seconds = duration
+        contact_status = TERMINAL_CONTACT_STATUS.get(call_status)
+        if contact_status:
+            call_log.end_time = datetime.now(timezone.utc)
+        return contact_status
+
+
+call_tracking = CallTrackingService()
@@ -0,0 +1,208 @@
+# backend/src/services/campaign_queue.py
+"""
+Durable, database-backed work queue for campaign dialing.
+
+Every Contact row is a work item. A dialer claims a contact by atomically moving it
+from "pending" to "calling" and stamping it with a lease (owner + expiry). A background
+heartbeat keeps the leases of live workers fresh; if a worker dies before it dials,
+its lease expires and any other worker may reclaim the contact. Once a call has been
+originated the contact is marked as dialed and is never handed out again, so several
+processes can drain one campaign without dialing anyone twice.
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import and_, or_, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models import campaign as campaign_model
+
+Contact = campaign_model.Contact
+
+
+def _utcnow() -> datetime:
+    # Lease timestamps are stored as naive UTC so comparisons behave the same on SQLite and PostgreSQL
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class CampaignJobQueue:
+    """Leases Contact rows to dialer workers."""
+
+    def __init__(self, lease_seconds: int = None, worker_id: str = None):
+        """
+        Args:
+            lease_seconds: How long a claim stays valid without a heartbeat.
+                           Defaults to settings.DIALER_LEASE_SECONDS.
+            worker_id: Unique name of this worker. Defaults to host:pid:random.
+        """
+        self.lease_seconds = lease_seconds or settings.DIALER_LEASE_SECONDS
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat_thread = None
+        self._heartbeat_lock = threading.Lock()
+
+    def _lease_expiry(self) -> datetime:
+        return _utcnow() + timedelta(seconds=self.lease_seconds)
+
+    @staticmethod
+    def _claimable(now: datetime):
+        """Pending contacts, or claimed-but-never-dialed contacts whose lease has expired."""
+        return or_(
+            Contact.status == "pending",
+            and_(
+                Contact.status == "calling",
+                Contact.dialed_at.is_(None),
+                or_(Contact.lease_expires_at.is_(None), Contact.lease_expires_at < now)
+            )
+        )
+
+    def claim(self, db: Session, campaign_id: int, limit: int = 1) -> List[int]:
+        """
+        Lease up to `limit` contacts of a campaign to this worker.
+
+        Each row is claimed with a conditional UPDATE, so when several workers race for
+        the same contact exactly one of them sees rowcount == 1.
+
+        Returns:
+            List of claimed contact IDs, in ID order.
+        """
+        self._ensure_heartbeat()
+        now = _utcnow()
+        candidates = [
+            contact_id for (contact_id,) in db.query(Contact.id).filter(
+                Contact.campaign_id == campaign_id,
+                self._claimable(now)
+            ).order_by(Contact.id).limit(limit)
+        ]
+
+        claimed = []
+        for contact_id in candidates:
+            result = db.execute(
+                update(Contact)
+                .where(Contact.id == contact_id, self._claimable(now))
+                .values(
+                    status="calling",
+                    lease_owner=self.worker_id,
+                    lease_expires_at=self._lease_expiry(),
+                    attempts=Contact.attempts + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(contact_id)
+        db.commit()
+        return claimed
+
+    def mark_dialed(self, db: Session, contact_id: int):
+        """Record that a call was originated; the contact can no longer be reclaimed."""
+        db.execute(
+            update(Contact)
+            .where(Contact.id == contact_id, Contact.lease_owner == self.worker_id)
+            .values(dialed_at=_utcnow(), lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    @staticmethod
+    def _complete_statement(contact_id: int, status: str):
+        return (
+            update(Contact)
+            .where(Contact.id == contact_id)
+            .values(status=status, lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def complete(self, db: Session, contact_id: int, status: str):
+        """Finish a work item with a terminal status ("completed" or "failed")."""
+        db.execute(self._complete_statement(contact_id, status))
+        db.commit()
+
+    async def acomplete(self, db: AsyncSession, contact_id: int, status: str):
+        """complete() for an AsyncSession."""
+        await db.execute(self._complete_statement(contact_id, status))
+        await db.commit()
+
+    def held(self, db: Session, campaign_id: int) -> List[int]:
+        """IDs of a campaign's contacts this worker has claimed but not dialed."""
+        return [
+            contact_id for (contact_id,) in db.query(Contact.id).filter(
+                Contact.campaign_id == campaign_id,
+                Contact.lease_owner == self.worker_id,
+                Contact.dialed_at.is_(None)
+            )
+        ]
+
+    def release(self, db: Session, contact_ids: List[int]):
+        """Hand undialed claims back to the queue, e.g. when a campaign is paused."""
+        if not contact_ids:
+            return
+        db.execute(
+            update(Contact)
+            .where(
+                Contact.id.in_(contact_ids),
+                Contact.lease_owner == self.worker_id,
+                Contact.dialed_at.is_(None)
+            )
+            .values(status="pending", lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def heartbeat(self, db: Session) -> int:
+        """Extend every lease held by this worker. Returns the number of leases renewed."""
+        result = db.execute(
+            update(Contact)
+            .where(Contact.lease_owner == self.worker_id, Contact.status == "calling")
+            .values(lease_expires_at=self._lease_expiry())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    def count_live(self, db: Session, campaign_id: int) -> int:
+        """
+        Number of calls of a campaign that are in flight across all workers: claimed
+        contacts plus dialed calls younger than DIALER_MAX_CALL_SECONDS.
+        """
+        stale_before = _utcnow() - timedelta(seconds=settings.DIALER_MAX_CALL_SECONDS)
+        return db.query(func.count(Contact.id)).filter(
+            Contact.campaign_id == campaign_id,
+            Contact.status == "calling",
+            or_(Contact.dialed_at.is_(None), Contact.dialed_at > stale_before)
+        ).scalar()
+
+    def count_remaining(self, db: Session, campaign_id: int) -> int:
+        """Number of contacts that still have to be (re)claimed."""
+        return db.query(func.count(Contact.id)).filter(
+            Contact.campaign_id == campaign_id,
+            self._claimable(_utcnow())
+        ).scalar()
+
+    def _ensure_heartbeat(self):
+        with self._heartbeat_lock:
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_loop, name="campaign-queue-heartbeat", daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        from ..core.database import SessionLocal
+
+        interval = max(1.0, self.lease_seconds / 3)
+        while True:
+            time.sleep(interval)
+            db = SessionLocal()
+            try:
+                self.heartbeat(db)
+            except Exception as e:
+                print(f"❌ Campaign queue heartbeat failed: {e}")
+            finally:
+                db.close()
+
+
+campaign_queue = CampaignJobQueue()
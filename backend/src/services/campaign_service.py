@@ -3,16 +3,38 @@ import asyncio
 import threading
 import time
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from sqlalchemy import func
 from sqlalchemy.orm import Session
+from ..core.config import settings
 from ..models import campaign as campaign_model
 from ..schemas import campaign as campaign_schema
+from ..utils.rate_limit import TokenBucket
 from .telephony_service import twilio_service
 from .service_factory import service_factory
+from .campaign_queue import CampaignJobQueue, campaign_queue
+from .call_tracking import call_tracking
+from .greeting_audio import greeting_audio
 
 class CampaignService:
-    def __init__(self):
+    def __init__(self, telephony=None, test_mode: bool = None, queue: CampaignJobQueue = None):
+        """
+        Args:
+            telephony: Object exposing originate_call(to_number, agent_id). Defaults to
+                       the shared TwilioService; pass a stub to benchmark offline.
+            test_mode: Simulate calls instead of dialing. Defaults to the TEST_MODE env var.
+            queue: Work queue that leases contacts to this process. Defaults to the shared one.
+        """
+        self.telephony = telephony or twilio_service
+        self.queue = queue or campaign_queue
+        self._dialers = {}
+        self._dialers_lock = threading.Lock()
         # Check if we're in test mode (for development)
-        self.test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+        if test_mode is None:
+            test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+        self.test_mode = test_mode
         if self.test_mode:
             print("🧪 Running in TEST MODE - calls will be simulated")
         else:
@@ -20,8 +42,10 @@ class CampaignService:
 
     def run_campaign(self, db: Session, campaign_id: int):
         """
-        Start a campaign by initiating calls to all contacts.
-        This runs in a separate thread to avoid blocking the API response.
+        Start a campaign by initiating calls to its pending contacts.
+        Progress lives in the database (see CampaignJobQueue), so a restarted
+        worker resumes where the previous one stopped. Dialing runs in a separate
+        thread to avoid blocking the API response.
         """
         campaign = db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).first()
         if not campaign:
@@ -31,28 +55,63 @@ class CampaignService:
         campaign.status = "running"
         db.commit()
 
-        # Start calling in a separate thread to avoid blocking
-        thread = threading.Thread(target=self._make_calls_sequentially, args=(campaign_id,))
-        thread.daemon = True
-        thread.start()
+        if campaign.dialer_mode == "concurrent":
+            dial_text = f"concurrently (max {campaign.max_concurrent_calls} live calls, {campaign.calls_per_second} calls/sec)"
+        else:
+            dial_text = "sequentially"
+
+        self._start_dialer(campaign_id)
 
+        pending = self.queue.count_remaining(db, campaign_id)
         mode_text = "TEST MODE (simulated)" if self.test_mode else "LIVE MODE"
-        return {"message": f"Campaign {campaign_id} started in {mode_text}. Initiating calls to {len(campaign.contacts)} contacts sequentially."}
+        return {"message": f"Campaign {campaign_id} started in {mode_text}. Initiating calls to {pending} contacts {dial_text}."}
 
-    def _make_calls_sequentially(self, campaign_id: int):
+    def resume_running_campaigns(self):
+        """
+        Restart dialers for every campaign left in the "running" state, e.g. after a
+        server restart. Safe to call from several worker processes at once.
         """
-        Internal method to make calls to all contacts in a campaign sequentially.
-        This runs in a separate thread and calls contacts one by one with delays.
+        from ..core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            campaign_ids = [
+                campaign_id for (campaign_id,) in db.query(campaign_model.Campaign.id).filter(
+                    campaign_model.Campaign.status == "running"
+                )
+            ]
+        finally:
+            db.close()
+
+        for campaign_id in campaign_ids:
+            print(f"🔁 Resuming campaign {campaign_id} after restart")
+            self._start_dialer(campaign_id)
+        return campaign_ids
+
+    def _start_dialer(self, campaign_id: int):
+        """Start a dialer thread for a campaign unless this process already runs one."""
+        with self._dialers_lock:
+            thread = self._dialers.get(campaign_id)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=self._run_dialer, args=(campaign_id,), name=f"campaign-{campaign_id}")
+            thread.daemon = True
+            self._dialers[campaign_id] = thread
+            thread.start()
+
+    def _run_dialer(self, campaign_id: int):
+        """
+        Internal method that drains a campaign's work queue with its configured dialer.
         Uses agent-specific service configurations for each campaign.
         """
         from ..core.database import SessionLocal
         from ..models import agent as agent_model
-        
+
         db = SessionLocal()
         try:
             campaign = db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).first()
             if not campaign:
-                print(f"Campaign {campaign_id} not found in _make_calls_sequentially")
+                print(f"Campaign {campaign_id} not found in _run_dialer")
                 return
 
             # Get agent configuration for this campaign
@@ -60,93 +119,294 @@ class CampaignService:
             if not agent:
                 print(f"❌ Agent {campaign.agent_id} not found for campaign {campaign_id}")
                 return
-            
-            print(f"Starting sequential calls to {len(campaign.contacts)} contacts for campaign {campaign_id}")
+
             print(f"Mode: {'TEST (simulated)' if self.test_mode else 'LIVE'}")
             print(f"🔧 Agent Configuration:")
             print(f"   LLM: {agent.llm_provider} ({agent.llm_model})")
             print(f"   TTS Voice: {agent.tts_voice_id}")
             print(f"   STT: {agent.stt_provider}")
-            
-            for i, contact in enumerate(campaign.contacts):
-                try:
-                    print(f"Calling contact {i+1}/{len(campaign.contacts)}: {contact.phone_number}")
-                    
-                    # Update contact status to calling
-                    contact.status = "calling"
-                    db.commit()
-                    
-                    if self.test_mode:
-                        # TEST MODE: Simulate successful calls
-                        print(f"🧪 TEST MODE: Simulating call to {contact.phone_number}")
-                        time.sleep(3)  # Simulate call processing time
-                        
-                        # Simulate 80% success rate for testing
-                        import random
-                        if random.random() < 0.8:
-                            contact.status = "completed"
-                            print(f"✅ TEST MODE: Call completed successfully for {contact.phone_number}")
-                        else:
-                            contact.status = "failed"
-                            print(f"❌ TEST MODE: Call failed for {contact.phone_number}")
-                        
-                        db.commit()
-                    else:
-                        # LIVE MODE: Make actual Twilio calls with agent-specific settings
-                        try:
-                            result = twilio_service.originate_call(
-                                to_number=contact.phone_number, 
-                                agent_id=campaign.agent_id  # Twilio will use agent config via webhook
-                            )
-                            print(f"📞 LIVE MODE: Call initiated for {contact.phone_number} with agent config")
-                            print(f"   Using: {agent.llm_provider}/{agent.llm_model}, Voice: {agent.tts_voice_id[:8]}..., STT: {agent.stt_provider}")
-                        except Exception as e:
-                            print(f"❌ LIVE MODE: Failed to call {contact.phone_number}: {e}")
-                            contact.status = "failed"
-                            db.commit()
-                    
-                    # Wait between calls to ensure sequential calling
-                    if i < len(campaign.contacts) - 1:  # Don't wait after the last call
-                        wait_time = 5 if self.test_mode else 10  # Shorter wait in test mode
-                        print(f"⏳ Waiting {wait_time} seconds before next call...")
-                        time.sleep(wait_time)
-                    
-                except Exception as e:
-                    print(f"❌ Error processing call for {contact.phone_number}: {e}")
-                    contact.status = "failed"
-                    db.commit()
-                    
-                    # Still wait before next call even if this one failed
-                    if i < len(campaign.contacts) - 1:
-                        wait_time = 5 if self.test_mode else 10
-                        print(f"⏳ Waiting {wait_time} seconds before next call...")
-                        time.sleep(wait_time)
-                    
+
+            if not self.test_mode:
+                self._prepare_greeting(agent)
+
+            if campaign.dialer_mode == "concurrent":
+                self._make_calls_concurrently(db, campaign)
+            else:
+                self._make_calls_sequentially(db, campaign)
+
+            self._finish_if_done(db, campaign)
+
+        except Exception as e:
+            print(f"Error in _run_dialer for campaign {campaign_id}: {e}")
+        finally:
+            self._release_undialed(db, campaign_id)
+            db.close()
+
+    def _release_undialed(self, db: Session, campaign_id: int):
+        """
+        Hand back contacts this run claimed but never dialed (the campaign was paused
+        between claim and dial, or the dialer failed). The heartbeat would otherwise keep
+        renewing their leases, and no other worker could pick them up.
+        """
+        try:
+            db.rollback()
+            held = self.queue.held(db, campaign_id)
+            if held:
+                self.queue.release(db, held)
+                print(f"↩️  Released {len(held)} undialed contacts of campaign {campaign_id}")
+        except Exception as e:
+            print(f"❌ Could not release undialed contacts of campaign {campaign_id}: {e}")
+
+    @staticmethod
+    def _prepare_greeting(agent):
+        """Pre-render the agent's greeting so answered calls start with a static file."""
+        try:
+            greeting_audio.prepare(agent)
+        except Exception as e:
+            # Calls still work; the webhook falls back to generating the greeting live
+            print(f"⚠️ Could not prepare greeting audio for agent {agent.id}: {e}")
+
+    def _is_running(self, db: Session, campaign: campaign_model.Campaign) -> bool:
+        """Re-read the campaign status so a stop request is honoured promptly."""
+        db.expire(campaign)
+        running = campaign.status == "running"
+        db.rollback()
+        return running
+
+    def _finish_if_done(self, db: Session, campaign: campaign_model.Campaign):
+        """Mark the campaign completed once no contact is pending or in flight."""
+        if not self._is_running(db, campaign):
+            return
+        if self.queue.count_remaining(db, campaign.id) == 0 and self.queue.count_live(db, campaign.id) == 0:
+            campaign.status = "completed"
+            db.commit()
+            print(f"🏁 Campaign {campaign.id} completed")
+
+    def _make_calls_sequentially(self, db: Session, campaign: campaign_model.Campaign):
+        """
+        Claim and call contacts one by one with a fixed delay between calls.
+        Each call is held until it hangs up, so calls never overlap and the campaign
+        can be marked completed once the last one ends.
+        """
+        print(f"Starting sequential calls for campaign {campaign.id}")
+        i = 0
+        while self._is_running(db, campaign):
+            claimed = self.queue.claim(db, campaign.id, limit=1)
+            if not claimed:
+                break
+
+            if i > 0:
+                # Wait between calls to ensure sequential calling
+                wait_time = 5 if self.test_mode else 10  # Shorter wait in test mode
+                print(f"⏳ Waiting {wait_time} seconds before next call...")
+                time.sleep(wait_time)
+                if not self._is_running(db, campaign):
+                    break  # Stopped during the wait; the claim is released on exit
+
+            i += 1
+            print(f"Calling contact #{i} (ID {claimed[0]}) for campaign {campaign.id}")
+            self._dial_contact(claimed[0], campaign.agent_id)
+
+    def _make_calls_concurrently(self, db: Session, campaign: campaign_model.Campaign):
+        """
+        Dial a campaign's contacts in parallel.
+        A token bucket caps the origination rate at campaign.calls_per_second, and the
+        number of in-flight calls across all workers is capped at campaign.max_concurrent_calls.
+        A slot is held until the call leaves the "calling" state (or times out).
+        """
+        max_live_calls = max(1, campaign.max_concurrent_calls)
+        print(f"Starting concurrent calls for campaign {campaign.id}")
+        print(f"⚙️  Dialer: max {max_live_calls} live calls, {campaign.calls_per_second} calls/sec")
+
+        bucket = TokenBucket(rate=campaign.calls_per_second)
+        in_flight = set()
+        in_flight_lock = threading.Lock()
+        started_at = time.monotonic()
+        dispatched = 0
+
+        def _done(future):
+            with in_flight_lock:
+                in_flight.discard(future)
+
+        with ThreadPoolExecutor(max_workers=max_live_calls, thread_name_prefix=f"dialer-{campaign.id}") as executor:
+            while self._is_running(db, campaign):
+                free_slots = max_live_calls - self.queue.count_live(db, campaign.id)
+                claimed = self.queue.claim(db, campaign.id, limit=free_slots) if free_slots > 0 else []
+
+                if not claimed:
+                    with in_flight_lock:
+                        idle = not in_flight
+                    if idle and self.queue.count_remaining(db, campaign.id) == 0:
+                        break
+                    time.sleep(settings.DIALER_POLL_INTERVAL)
+                    continue
+
+                for contact_id in claimed:
+                    bucket.acquire()
+                    future = executor.submit(self._dial_contact, contact_id, campaign.agent_id)
+                    with in_flight_lock:
+                        in_flight.add(future)
+                    future.add_done_callback(_done)
+                    dispatched += 1
+
+        elapsed = time.monotonic() - started_at
+        print(f"🏁 Concurrent dialing dispatched {dispatched} calls for campaign {campaign.id} in {elapsed:.1f}s")
+
+    def _dial_contact(self, contact_id: int, agent_id: int):
+        """
+        Dial a single claimed contact and block until the call is over.
+        Runs on a dialer thread, so it uses its own database session.
+        """
+        from ..core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            contact = db.query(campaign_model.Contact).filter(campaign_model.Contact.id == contact_id).first()
+            if not contact:
+                return
+            phone_number, campaign_id = contact.phone_number, contact.campaign_id
+            db.rollback()
+
+            if self.test_mode:
+                # TEST MODE: Simulate successful calls
+                print(f"🧪 TEST MODE: Simulating call to {phone_number}")
+                time.sleep(settings.TEST_CALL_SECONDS)  # Simulate call processing time
+
+                # Simulate 80% success rate for testing
+                outcome = "completed" if random.random() < 0.8 else "failed"
+                self.queue.complete(db, contact_id, outcome)
+                print(f"{'✅' if outcome == 'completed' else '❌'} TEST MODE: Call {outcome} for {phone_number}")
+                return
+
+            # LIVE MODE: Make actual Twilio calls; Twilio will use agent config via webhook
+            try:
+                result = self.telephony.originate_call(to_number=phone_number, agent_id=agent_id)
+                self.queue.mark_dialed(db, contact_id)
+                # Status callbacks find the contact through this record
+                call_tracking.record_originated_call(
+                    db, result["call_sid"], phone_number, agent_id, contact_id=contact_id, campaign_id=campaign_id
+                )
+                print(f"📞 LIVE MODE: Call initiated for {phone_number}")
+            except Exception as e:
+                print(f"❌ LIVE MODE: Failed to call {phone_number}: {e}")
+                self.queue.complete(db, contact_id, "failed")
+                return
+
+            # Hold the live-call slot until the status callback moves the contact out of "calling"
+            deadline = time.monotonic() + settings.DIALER_MAX_CALL_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(settings.DIALER_POLL_INTERVAL)
+                status = db.query(campaign_model.Contact.status).filter(campaign_model.Contact.id == contact_id).scalar()
+                # End the read transaction so idle waiters don't pin pooled connections
+                db.rollback()
+                if status != "calling":
+                    return
+            print(f"⌛ Call to {phone_number} exceeded {settings.DIALER_MAX_CALL_SECONDS}s; releasing its slot.")
+
         except Exception as e:
-            print(f"Error in _make_calls_sequentially for campaign {campaign_id}: {e}")
+            print(f"❌ Error processing call for contact {contact_id}: {e}")
+            db.rollback()
+            self.queue.complete(db, contact_id, "failed")
         finally:
             db.close()
 
     def get_campaign_status(self, db: Session, campaign_id: int):
         """
         Get detailed status of a campaign including contact call statuses.
+        Counts come from one GROUP BY query; contacts are never loaded.
         """
         campaign = db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).first()
         if not campaign:
             raise Exception("Campaign not found")
         
-        # Count contacts by status
-        status_counts = {}
-        for contact in campaign.contacts:
-            status = contact.status
-            status_counts[status] = status_counts.get(status, 0) + 1
+        status_counts = self.count_contacts_by_status(db, [campaign_id]).get(campaign_id, {})
         
         return {
             "campaign_id": campaign_id,
             "campaign_status": campaign.status,
-            "total_contacts": len(campaign.contacts),
+            "total_contacts": sum(status_counts.values()),
             "status_breakdown": status_counts,
             "mode": "TEST" if self.test_mode else "LIVE"
         }
 
+    @staticmethod
+    def count_contacts_by_status(db: Session, campaign_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Contact counts per status for several campaigns in a single query
+        (served by the (campaign_id, status) index).
+
+        Returns:
+            dict: {campaign_id: {status: count}}; campaigns without contacts are absent.
+        """
+        if not campaign_ids:
+            return {}
+        Contact = campaign_model.Contact
+        rows = (
+            db.query(Contact.campaign_id, Contact.status, func.count(Contact.id))
+            .filter(Contact.campaign_id.in_(campaign_ids))
+            .group_by(Contact.campaign_id, Contact.status)
+            .all()
+        )
+        counts: Dict[int, Dict[str, int]] = {}
+        for campaign_id, status, count in rows:
+            counts.setdefault(campaign_id, {})[status] = count
+        return counts
+
+    def list_campaign_summaries(self, db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+        """Campaigns with their contact counts, without loading any contact rows."""
+        campaigns = (
+            db.query(campaign_model.Campaign)
+            .order_by(campaign_model.Campaign.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        counts = self.count_contacts_by_status(db, [campaign.id for campaign in campaigns])
+        summaries = []
+        for campaign in campaigns:
+            status_counts = counts.get(campaign.id, {})
+            summaries.append({
+                "id": campaign.id,
+                "name": campaign.name,
+                "agent_id": campaign.agent_id,
+                "status": campaign.status,
+                "dialer_mode": campaign.dialer_mode,
+                "max_concurrent_calls": campaign.max_concurrent_calls,
+                "calls_per_second": campaign.calls_per_second,
+                "total_contacts": sum(status_counts.values()),
+                "status_breakdown": status_counts,
+            })
+        return summaries
+
+    @staticmethod
+    def get_contacts_page(db: Session, campaign_id: int, after: int = 0, limit: int = 100, status: str = None) -> List:
+        """
+        One keyset page of a campaign's contacts: the first `limit` contacts with id > after,
+        in id order. Served by the (campaign_id, id) index, so deep pages cost the same as the first.
+        """
+        Contact = campaign_model.Contact
+        query = db.query(Contact).filter(Contact.campaign_id == campaign_id, Contact.id > after)
+        if status:
+            query = query.filter(Contact.status == status)
+        return query.order_by(Contact.id).limit(limit).all()
+
+    def iter_contacts(self, campaign_id: int, status: str = None, after: int = 0, batch_size: int = 1000):
+        """
+        Yield every contact of a campaign, page by page, on a session of its own
+        (safe to consume from a streaming response after the request's session is closed).
+        """
+        from ..core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            while True:
+                page = self.get_contacts_page(db, campaign_id, after=after, limit=batch_size, status=status)
+                if not page:
+                    return
+                yield from page
+                after = page[-1].id
+                db.expunge_all()  # Keep the identity map from growing with the export
+        finally:
+            db.close()
+
 campaign_service = CampaignService()
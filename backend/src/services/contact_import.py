@@ -0,0 +1,207 @@
+# backend/src/services/contact_import.py
+"""
+Streaming CSV import of campaign contacts.
+
+The upload is parsed row by row from its (spooled) file, so memory stays flat no
+matter how large the list is. Every number is normalized to E.164, duplicates are
+dropped both within the file and against contacts the campaign already has, and
+rows are written in batches with one Core INSERT per batch, or with COPY when the
+database is PostgreSQL via psycopg2. Invalid rows do not abort the import; they are
+reported individually (up to CONTACT_IMPORT_MAX_ERRORS of them).
+"""
+import csv
+import io
+import re
+import time
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models import campaign as campaign_model
+
+Contact = campaign_model.Contact
+
+_SEPARATORS = re.compile(r"[\s\-().\/]")
+
+
+def normalize_phone_number(raw: str, default_country_code: str = None) -> str:
+    """
+    Normalize a phone number to E.164 (+<country code><number>).
+
+    Accepts common separators (spaces, dashes, dots, parentheses), a leading "00"
+    international prefix, and national numbers, which get default_country_code
+    (settings.CONTACT_IMPORT_DEFAULT_COUNTRY_CODE) prepended.
+
+    Raises:
+        ValueError: If the value cannot be a valid E.164 number.
+    """
+    default_country_code = default_country_code or settings.CONTACT_IMPORT_DEFAULT_COUNTRY_CODE
+    number = _SEPARATORS.sub("", raw or "")
+    if not number:
+        raise ValueError("empty phone number")
+
+    if number.startswith("+"):
+        digits = number[1:]
+    elif number.startswith("00"):
+        digits = number[2:]
+    elif number.startswith(default_country_code) and len(number) > 10:
+        digits = number  # National number already carrying the country code, e.g. 1415...
+    else:
+        digits = default_country_code + number.lstrip("0")
+
+    if not digits.isdigit():
+        raise ValueError("phone number contains invalid characters")
+    if digits.startswith("0") or not 8 <= len(digits) <= 15:
+        raise ValueError("phone number is not a valid E.164 number")
+    return "+" + digits
+
+
+class ContactImporter:
+    """Imports one CSV upload into a campaign's contact list."""
+
+    def __init__(self, db: Session, campaign_id: int, batch_size: int = None, max_errors: int = None):
+        """
+        Args:
+            db: Database session; the import is committed as one transaction
+            campaign_id: Campaign that receives the contacts
+            batch_size: Rows per INSERT/COPY batch. Defaults to settings.CONTACT_IMPORT_BATCH_SIZE.
+            max_errors: Row errors included in the report. Defaults to settings.CONTACT_IMPORT_MAX_ERRORS.
+        """
+        self.db = db
+        self.campaign_id = campaign_id
+        self.batch_size = batch_size or settings.CONTACT_IMPORT_BATCH_SIZE
+        self.max_errors = max_errors or settings.CONTACT_IMPORT_MAX_ERRORS
+        self.method = "copy" if self._can_copy() else "insert"
+
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates_in_file = 0
+        self.duplicates_existing = 0
+        self.invalid = 0
+        self.errors: List[dict] = []
+        self._seen: Set[str] = set()
+        self._batch: List[str] = []
+
+    def _can_copy(self) -> bool:
+        bind = self.db.get_bind()
+        return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+    # --- Parsing ------------------------------------------------------------
+
+    def import_csv(self, lines: Iterable[str]) -> dict:
+        """
+        Parse CSV text (any iterable of lines, e.g. a text file) and import it.
+
+        Returns:
+            dict: Counts, row-level errors and throughput of the import.
+
+        Raises:
+            ValueError: If the CSV has no 'phone_number' header.
+        """
+        started = time.perf_counter()
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        columns = [h.lower().strip() for h in header or []]
+        if "phone_number" not in columns:
+            raise ValueError("CSV file must contain a 'phone_number' header.")
+        phone_column = columns.index("phone_number")
+
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue  # Blank line
+            self.rows += 1
+            raw = row[phone_column] if phone_column < len(row) else ""
+            try:
+                number = normalize_phone_number(raw)
+            except ValueError as e:
+                self._error(reader.line_num, raw, str(e))
+                continue
+
+            if number in self._seen:
+                self.duplicates_in_file += 1
+                continue
+            self._seen.add(number)
+            self._batch.append(number)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+        self._flush()
+        self.db.commit()
+        return self._report(time.perf_counter() - started)
+
+    def _error(self, line: int, value: str, message: str):
+        self.invalid += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "value": value, "error": message})
+
+    # --- Writing ------------------------------------------------------------
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        existing = self._existing(batch)
+        if existing:
+            self.duplicates_existing += len(existing)
+            batch = [number for number in batch if number not in existing]
+        if not batch:
+            return
+        if self.method == "copy":
+            self._copy(batch)
+        else:
+            self.db.execute(
+                insert(Contact.__table__),
+                [{"phone_number": number, "status": "pending", "attempts": 0, "campaign_id": self.campaign_id} for number in batch],
+            )
+        self.inserted += len(batch)
+
+    def _existing(self, batch: List[str]) -> Set[str]:
+        rows = self.db.execute(
+            select(Contact.phone_number).where(
+                Contact.campaign_id == self.campaign_id,
+                Contact.phone_number.in_(batch),
+            )
+        )
+        return {phone_number for (phone_number,) in rows}
+
+    def _copy(self, batch: List[str]):
+        buffer = io.StringIO()
+        for number in batch:
+            buffer.write(f"{number},pending,0,{self.campaign_id}\n")
+        buffer.seek(0)
+        # Runs on the session's own connection, so it shares the import transaction
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY contacts (phone_number, status, attempts, campaign_id) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def _report(self, elapsed: float) -> dict:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "duplicates_in_file": self.duplicates_in_file,
+            "duplicates_existing": self.duplicates_existing,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "errors_truncated": self.invalid > len(self.errors),
+            "method": self.method,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+def import_contacts_csv(db: Session, campaign_id: int, binary_file, encoding: str = "utf-8-sig", batch_size: Optional[int] = None) -> dict:
+    """
+    Import contacts from a binary file object (e.g. UploadFile.file) without reading it into memory.
+    The default encoding also strips the byte-order mark Excel puts in front of CSV exports.
+    """
+    text = io.TextIOWrapper(binary_file, encoding=encoding, newline="")
+    try:
+        return ContactImporter(db, campaign_id, batch_size=batch_size).import_csv(text)
+    finally:
+        # Leave the underlying upload open; FastAPI closes it
+        text.detach()
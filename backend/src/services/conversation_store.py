@@ -0,0 +1,196 @@
+# backend/src/services/conversation_store.py
+"""
+Per-call conversation state, keyed by Twilio CallSid.
+
+The hot tier is an in-process TTL/LRU cache, so a webhook turn reads and appends to
+the history without touching the database. Changed conversations are flushed to
+call_logs.full_transcript (as JSON) by a background write-behind thread.
+
+Twilio may deliver consecutive webhooks of one call to different workers. Each
+worker loads a call it has not seen from call_logs, and callers pass the number of
+messages they expect (the webhook carries it in the <Gather> action URL); a hot
+entry that is shorter than that was updated elsewhere and is reloaded.
+"""
+import json
+import threading
+from typing import Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from ..core.config import settings
+from ..models import call as call_model
+from ..utils.cache import TTLCache
+
+CallLog = call_model.CallLog
+
+
+class ConversationStore:
+    """Hot in-memory conversation histories with write-behind persistence to CallLog."""
+
+    def __init__(self, ttl: float = None, maxsize: int = None, flush_interval: float = None, session_factory=None):
+        """
+        Args:
+            ttl: Seconds a conversation stays in the hot tier after its last write.
+                 Defaults to settings.CONVERSATION_STATE_TTL_SECONDS.
+            maxsize: Conversations kept in the hot tier. Defaults to settings.CONVERSATION_STATE_MAX_CALLS.
+            flush_interval: Seconds between write-behind flushes. Defaults to settings.CONVERSATION_FLUSH_INTERVAL.
+            session_factory: Callable returning a DB session. Defaults to SessionLocal.
+        """
+        self.flush_interval = flush_interval or settings.CONVERSATION_FLUSH_INTERVAL
+        self._hot = TTLCache(
+            maxsize=maxsize or settings.CONVERSATION_STATE_MAX_CALLS,
+            ttl=ttl or settings.CONVERSATION_STATE_TTL_SECONDS,
+        )
+        self._session_factory = session_factory
+        self._dirty: Dict[str, dict] = {}  # call_sid -> {"messages": [...], "from_number": str}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._flush_thread = None
+        self._stop = threading.Event()
+
+    def _session(self):
+        if self._session_factory is None:
+            from ..core.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # --- Reads --------------------------------------------------------------
+
+    def get_history(self, call_sid: str, min_messages: int = 0) -> List[Dict[str, str]]:
+        """
+        Return a copy of the conversation so far.
+
+        Args:
+            call_sid: Twilio CallSid
+            min_messages: Messages the caller knows the call already has. A shorter hot
+                          entry is stale (another worker handled a turn) and is reloaded.
+        """
+        with self._lock:
+            messages = self._hot.get(call_sid)
+            if messages is not None and len(messages) >= min_messages:
+                return list(messages)
+
+        loaded = self._load(call_sid)
+        with self._lock:
+            # Keep whichever copy is longer: an unflushed local append beats the DB
+            current = self._hot.get(call_sid) or []
+            messages = loaded if len(loaded) > len(current) else current
+            if len(messages) < min_messages:
+                print(f"⚠️ Conversation {call_sid} has {len(messages)} messages, expected {min_messages}")
+            self._hot.set(call_sid, messages)
+            return list(messages)
+
+    def _load(self, call_sid: str) -> List[Dict[str, str]]:
+        db = self._session()
+        try:
+            transcript = db.query(CallLog.full_transcript).filter(CallLog.call_sid == call_sid).scalar()
+        finally:
+            db.close()
+        if not transcript:
+            return []
+        try:
+            messages = json.loads(transcript)
+        except ValueError:
+            print(f"⚠️ Ignoring non-JSON transcript stored for call {call_sid}")
+            return []
+        return messages if isinstance(messages, list) else []
+
+    # --- Writes -------------------------------------------------------------
+
+    def append(self, call_sid: str, *messages: Dict[str, str], from_number: Optional[str] = None) -> int:
+        """
+        Append messages to a call's history and schedule it for persistence.
+
+        Returns:
+            int: The number of messages the conversation now has.
+        """
+        with self._lock:
+            history = self._hot.get(call_sid)
+            if history is None:
+                history = []
+            history = history + list(messages)
+            self._hot.set(call_sid, history)
+
+            pending = self._dirty.get(call_sid, {})
+            self._dirty[call_sid] = {"messages": history, "from_number": from_number or pending.get("from_number")}
+        self._ensure_flusher()
+        return len(history)
+
+    def discard(self, call_sid: str):
+        """Drop a call from the hot tier (its pending writes are still flushed)."""
+        with self._lock:
+            self._hot.pop(call_sid)
+
+    def flush(self) -> int:
+        """Write every changed conversation to call_logs. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return 0
+
+            db = self._session()
+            try:
+                for call_sid, state in batch.items():
+                    self._write(db, call_sid, state)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                # Put the batch back unless a newer version was queued meanwhile
+                with self._lock:
+                    for call_sid, state in batch.items():
+                        self._dirty.setdefault(call_sid, state)
+                print(f"❌ Conversation flush failed, will retry: {e}")
+                return 0
+            finally:
+                db.close()
+            return len(batch)
+
+    @staticmethod
+    def _write(db, call_sid: str, state: dict):
+        transcript = json.dumps(state["messages"])
+        call_log = db.query(CallLog).filter(CallLog.call_sid == call_sid).first()
+        if call_log is None:
+            try:
+                with db.begin_nested():
+                    db.add(CallLog(call_sid=call_sid, from_number=state["from_number"], full_transcript=transcript))
+                return
+            except IntegrityError:
+                # Another worker created the row first
+                call_log = db.query(CallLog).filter(CallLog.call_sid == call_sid).first()
+        call_log.full_transcript = transcript
+        if state["from_number"] and not call_log.from_number:
+            call_log.from_number = state["from_number"]
+
+    # --- Background flushing ----------------------------------------------
+
+    def _ensure_flusher(self):
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._flush_thread is None or not self._flush_thread.is_alive():
+                self._stop.clear()
+                self._flush_thread = threading.Thread(
+                    target=self._flush_loop, name="conversation-store-flush", daemon=True
+                )
+                self._flush_thread.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+            self._hot.purge_expired()
+
+    def close(self):
+        """Stop the background flusher and write out everything still pending."""
+        self._stop.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=self.flush_interval + 5)
+            self._flush_thread = None
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._dirty)
+        return dict(self._hot.stats(), pending_writes=pending)
+
+
+conversation_store = ConversationStore()
@@ -0,0 +1,96 @@
+# backend/src/services/gemini_backend.py
+"""
+Gemini request building for LLMService.
+
+Chat-format messages are turned into one generate_content request in a single pass,
+and whatever does not change between turns is built once and reused:
+
+  - the leading system message becomes the model's system_instruction instead of a
+    fake "model" turn. There is one GenerativeModel per distinct system prompt (in
+    practice one per agent), kept in a bounded LRU.
+  - each turn is converted to a protos.Content once, so the history is not put
+    through the SDK's dict-to-proto conversion again on every later turn
+  - one GenerationConfig, shared by every call
+
+Gemini has no system role inside the conversation, so later system messages (such as
+the history memo from agents/context_builder.py) are sent as user context. Adjacent
+messages with the same role are merged into one content with several parts.
+"""
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+from google.generativeai import protos
+
+from ..core.config import settings
+from ..utils.cache import TTLCache
+
+# Very short responses for voice chat (40-50 words max); shared by every request
+GENERATION_CONFIG = genai.types.GenerationConfig(max_output_tokens=60, temperature=0.7)
+
+
+@lru_cache(maxsize=8192)
+def _content(role: str, texts: Tuple[str, ...]) -> protos.Content:
+    # The SDK copies contents into each request, so one cached proto can be shared
+    return protos.Content(role=role, parts=[protos.Part(text=text) for text in texts])
+
+
+def to_gemini_request(messages: List[Dict[str, str]]) -> Tuple[Optional[str], List[protos.Content]]:
+    """
+    Split OpenAI-style messages into a Gemini system instruction and contents.
+
+    Args:
+        messages: List of message dicts with 'role' and 'content' keys
+
+    Returns:
+        (system_instruction or None, contents for generate_content)
+    """
+    system_instruction = None
+    turns: List[Tuple[str, List[str]]] = []
+    for msg in messages:
+        role = msg["role"]
+        if role == "system" and system_instruction is None and not turns:
+            system_instruction = msg["content"]
+            continue
+        role = "model" if role == "assistant" else "user"
+        if turns and turns[-1][0] == role:
+            turns[-1][1].append(msg["content"])
+        else:
+            turns.append((role, [msg["content"]]))
+    return system_instruction, [_content(role, tuple(texts)) for role, texts in turns]
+
+
+class GeminiBackend:
+    """Sends chat-format messages to one Gemini model."""
+
+    def __init__(self, model_name: str, max_models: int = None):
+        """
+        Args:
+            model_name: Gemini model name (e.g. 'gemini-2.0-flash-exp')
+            max_models: GenerativeModel objects kept, one per system prompt.
+                        Defaults to settings.GEMINI_MODEL_CACHE_SIZE
+        """
+        self.model_name = model_name
+        self._models = TTLCache(maxsize=max_models or settings.GEMINI_MODEL_CACHE_SIZE)
+
+    def model_for(self, system_instruction: Optional[str]) -> genai.GenerativeModel:
+        """The GenerativeModel for a system prompt, created on first use."""
+        return self._models.get_or_create(
+            system_instruction,
+            lambda: genai.GenerativeModel(self.model_name, system_instruction=system_instruction),
+        )
+
+    def generate(self, messages: List[Dict[str, str]]) -> str:
+        """Blocking completion."""
+        system_instruction, contents = to_gemini_request(messages)
+        response = self.model_for(system_instruction).generate_content(contents, generation_config=GENERATION_CONFIG)
+        return response.text
+
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Streams a completion from Gemini's async API."""
+        system_instruction, contents = to_gemini_request(messages)
+        response = await self.model_for(system_instruction).generate_content_async(
+            contents, generation_config=GENERATION_CONFIG, stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
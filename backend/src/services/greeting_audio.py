@@ -0,0 +1,158 @@
+# backend/src/services/greeting_audio.py
+"""
+Greeting audio prepared ahead of time, once per agent configuration.
+
+Every answered call starts with the agent's greeting. Instead of generating the text
+with the LLM and synthesizing it at pickup, the dialer prepares it when a campaign
+starts and the call webhook answers with a TwiML <Play> of a static file under
+AUDIO_DIR (served by the /audio mount), so the first word only costs a file fetch.
+
+Files are named after a fingerprint of everything that shapes the greeting (prompt,
+LLM, voice, TTS model), so editing the agent can never serve a stale greeting; the
+old files are removed when the agent is updated:
+    AUDIO_DIR/greetings/agent_<id>_<fingerprint>.txt    greeting text
+    AUDIO_DIR/greetings/agent_<id>_<fingerprint>.mp3    <Play> audio (TwiML webhook)
+    AUDIO_DIR/greetings/agent_<id>_<fingerprint>.ulaw   8 kHz u-law (Media Streams)
+"""
+import glob
+import hashlib
+import os
+import threading
+import uuid
+from typing import NamedTuple, Optional
+
+from ..core.config import settings
+from .service_factory import service_factory
+from .response_cache import response_cache_for
+from .llm_service import FALLBACK_RESPONSE
+
+GREETING_SUBDIR = "greetings"
+
+
+class PreparedGreeting(NamedTuple):
+    text: str
+    audio_url: str
+    ulaw_path: Optional[str]
+
+    def read_ulaw(self) -> Optional[bytes]:
+        if not self.ulaw_path:
+            return None
+        try:
+            with open(self.ulaw_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def greeting_fingerprint(agent) -> str:
+    """Hash of the agent settings that determine the greeting's words and sound."""
+    parts = (
+        agent.system_prompt,
+        agent.llm_provider,
+        agent.llm_model,
+        agent.tts_voice_id,
+        settings.ELEVENLABS_MODEL_ID,
+    )
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _write_atomic(path: str, data: bytes):
+    # Write next to the target and rename, so readers never see a partial file
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class GreetingAudioService:
+    """Prepares, looks up and invalidates per-agent greeting audio files."""
+
+    def __init__(self, audio_dir: str = None, public_url: str = None):
+        """
+        Args:
+            audio_dir: Directory served at /audio. Defaults to settings.AUDIO_DIR
+            public_url: Base URL Twilio fetches audio from. Defaults to settings.PUBLIC_URL
+        """
+        self.directory = os.path.join(audio_dir or settings.AUDIO_DIR, GREETING_SUBDIR)
+        self.public_url = (public_url or settings.PUBLIC_URL).rstrip("/")
+        self._lock = threading.Lock()
+
+    def _base_path(self, agent) -> str:
+        return os.path.join(self.directory, f"agent_{agent.id}_{greeting_fingerprint(agent)}")
+
+    def lookup(self, agent) -> Optional[PreparedGreeting]:
+        """Return the prepared greeting for the agent's current configuration, if any."""
+        base = self._base_path(agent)
+        try:
+            with open(f"{base}.txt", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        if not os.path.exists(f"{base}.mp3"):
+            return None
+        ulaw_path = f"{base}.ulaw" if os.path.exists(f"{base}.ulaw") else None
+        name = os.path.basename(base)
+        return PreparedGreeting(text, f"{self.public_url}/audio/{GREETING_SUBDIR}/{name}.mp3", ulaw_path)
+
+    def prepare(self, agent) -> PreparedGreeting:
+        """
+        Generate and store the greeting for the agent's current configuration.
+        Does nothing if it is already prepared.
+
+        Returns:
+            PreparedGreeting: The greeting text and where its audio is served from
+
+        Raises:
+            RuntimeError: The LLM produced no usable greeting. Nothing is stored, so
+                          calls keep generating the greeting live.
+        """
+        from ..agents.appointment_setter.logic import AppointmentSetterAgent
+
+        with self._lock:
+            prepared = self.lookup(agent)
+            if prepared is not None:
+                return prepared
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_files(agent, keep=self._base_path(agent))
+
+            services = service_factory.get_services_for_agent(agent)
+            ai_agent = AppointmentSetterAgent(
+                llm_service=services.llm, system_prompt=agent.system_prompt, response_cache=response_cache_for(agent)
+            )
+            text = ai_agent.get_initial_greeting()
+            # LLM errors come back as the canned fallback; stored, every call would open with it
+            if not text or not text.strip() or text == FALLBACK_RESPONSE:
+                raise RuntimeError("the LLM did not produce a greeting")
+
+            base = self._base_path(agent)
+            tmp_mp3 = f"{base}.{uuid.uuid4().hex}.tmp"
+            services.tts.synthesize(text, tmp_mp3)
+            os.replace(tmp_mp3, f"{base}.mp3")
+            if settings.TWILIO_MEDIA_STREAMS:
+                _write_atomic(f"{base}.ulaw", services.tts.synthesize_ulaw(text))
+            # The text goes last: lookup() treats it as the marker of a complete greeting
+            _write_atomic(f"{base}.txt", text.encode("utf-8"))
+
+            print(f"✅ Prepared greeting audio for agent {agent.id}: '{text}'")
+            return self.lookup(agent)
+
+    def invalidate(self, agent) -> int:
+        """Delete every prepared greeting of the agent. Returns how many files were removed."""
+        with self._lock:
+            return self._remove_files(agent)
+
+    def _remove_files(self, agent, keep: str = None) -> int:
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, f"agent_{agent.id}_*")):
+            if keep and path.startswith(keep + "."):
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+greeting_audio = GreetingAudioService()
@@ -0,0 +1,418 @@
+# backend/src/services/llm_router.py
+"""
+Latency-aware routing over several LLM models (Gemini and Groq backends).
+
+An LLMService is bound to one model, and when that model fails the caller hears
+FALLBACK_RESPONSE. LLMRouter puts several of them behind the same interface
+(model_id, get_response, agenerate, astream, astream_raw) and:
+
+  - tracks each model's recent latency (p50/p95) and error rate over a rolling
+    window. Latency is kept separately for full completions (agenerate,
+    get_response) and first tokens (astream), and each request is routed and hedged
+    on the kind it waits for. ModelHealth is shared process-wide through
+    `llm_health`, so every agent using a model learns from its requests.
+  - sends each request to the fastest healthy model. A model without measurements
+    keeps its configured place behind the measured ones, so the agent's own model
+    goes first until a backup has shown it is faster.
+  - hedges: once the primary runs past its deadline, the same request goes to the
+    next model. The deadline is the primary's own p95, clamped to
+    LLM_ROUTER_HEDGE_MIN_MS..LLM_ROUTER_HEDGE_MS. A failure moves on at once. The
+    first answer wins and the others are cancelled. A cancelled request's elapsed
+    time still counts as a latency sample, so a slow model cannot look fast by
+    always losing the race.
+  - has a circuit breaker: after LLM_ROUTER_BREAKER_FAILURES consecutive failures,
+    or an error rate above LLM_ROUTER_BREAKER_ERROR_RATE, a model gets no traffic
+    for LLM_ROUTER_BREAKER_COOLDOWN_SECONDS. Then it gets one trial request
+    (half-open), whose outcome closes or reopens the circuit.
+
+FALLBACK_RESPONSE is returned only after every model has failed. Models with an open
+circuit are tried as a last resort before that.
+
+Streaming hedges on the first token. After that the winning stream is committed,
+because the caller may already be hearing it. The blocking get_response (used to
+pre-render greetings in a worker thread) fails over in order without hedging.
+
+A backend is anything with `model_id`, `complete(messages)` and
+`astream_raw(messages)` that raises on failure, like LLMService.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from ..core.config import settings
+from .llm_service import FALLBACK_RESPONSE
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# What a latency sample measures: the whole reply, or the first streamed token
+COMPLETION, FIRST_TOKEN = "completion", "first_token"
+
+# Outcomes needed in the window before the error rate can open a circuit
+MIN_SAMPLES = 10
+
+
+class ModelHealth:
+    """Rolling latency and error statistics, and the circuit breaker, for one model."""
+
+    def __init__(self, model_id: str, window: int = None, failures_to_open: int = None,
+                 error_rate_to_open: float = None, cooldown: float = None):
+        """
+        Args:
+            model_id: Model these statistics belong to ("provider:model")
+            window: Recent requests kept. Defaults to settings.LLM_ROUTER_WINDOW
+            failures_to_open: Consecutive failures that open the circuit.
+                              Defaults to settings.LLM_ROUTER_BREAKER_FAILURES
+            error_rate_to_open: Error rate over the window that opens the circuit.
+                                Defaults to settings.LLM_ROUTER_BREAKER_ERROR_RATE
+            cooldown: Seconds an open circuit waits before a trial request.
+                      Defaults to settings.LLM_ROUTER_BREAKER_COOLDOWN_SECONDS
+        """
+        window = window or settings.LLM_ROUTER_WINDOW
+        self.model_id = model_id
+        self.failures_to_open = failures_to_open or settings.LLM_ROUTER_BREAKER_FAILURES
+        self.error_rate_to_open = error_rate_to_open or settings.LLM_ROUTER_BREAKER_ERROR_RATE
+        self.cooldown = settings.LLM_ROUTER_BREAKER_COOLDOWN_SECONDS if cooldown is None else cooldown
+        self._lock = threading.Lock()
+        # Seconds until the full reply, and until the first token of a stream
+        self._latencies = {COMPLETION: deque(maxlen=window), FIRST_TOKEN: deque(maxlen=window)}
+        self._outcomes = deque(maxlen=window)  # True for success
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def percentile(self, q: float, kind: str = COMPLETION) -> Optional[float]:
+        """Latency percentile (0-100) in seconds of one kind, or None before its first sample."""
+        with self._lock:
+            samples = sorted(self._latencies[kind])
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    def p50(self, kind: str = COMPLETION) -> Optional[float]:
+        return self.percentile(50, kind)
+
+    def p95(self, kind: str = COMPLETION) -> Optional[float]:
+        return self.percentile(95, kind)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._error_rate()
+
+    def _error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def allow(self) -> bool:
+        """Whether a request may go to this model now (claims the trial when half-open)."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return self.state != OPEN
+
+    def record_success(self, seconds: float, kind: str = COMPLETION):
+        with self._lock:
+            self._latencies[kind].append(seconds)
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                # Start the error rate afresh, or the failures that opened the circuit reopen it
+                self._outcomes.clear()
+                self._outcomes.append(True)
+                self.state = CLOSED
+                print(f"✅ LLM router: {self.model_id} recovered, circuit closed")
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            tripped = (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= self.failures_to_open
+                or (len(self._outcomes) >= MIN_SAMPLES and self._error_rate() >= self.error_rate_to_open)
+            )
+            if tripped:
+                if self.state != OPEN:
+                    print(f"🔌 LLM router: circuit opened for {self.model_id} "
+                          f"({self.consecutive_failures} consecutive failures, {self._error_rate():.0%} errors)")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+    def record_cancelled(self, seconds: float, kind: str = COMPLETION):
+        """A request lost the race: its elapsed time is a lower bound on this model's latency."""
+        with self._lock:
+            self._latencies[kind].append(seconds)
+            # A cancelled trial proved nothing; let the next request try again
+            self._trial_running = False
+
+    def stats(self) -> dict:
+        latency = {}
+        for kind in (COMPLETION, FIRST_TOKEN):
+            for q in (50, 95):
+                value = self.percentile(q, kind)
+                latency[f"{kind}_p{q}_ms"] = round(value * 1000, 1) if value is not None else None
+        with self._lock:
+            return {
+                "state": self.state,
+                "requests": len(self._outcomes),
+                "error_rate": round(self._error_rate(), 4),
+                "consecutive_failures": self.consecutive_failures,
+                **latency,
+            }
+
+
+class LLMHealthRegistry:
+    """Process-wide ModelHealth per model_id, plus router-level counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, ModelHealth] = {}
+        self.requests = 0  # Requests routed
+        self.hedges = 0  # Backup requests started because the primary was slow
+        self.hedge_wins = 0  # Requests answered by a hedged backup
+        self.failovers = 0  # Requests answered after another model failed
+        self.fallbacks = 0  # Requests where every model failed
+
+    def get(self, model_id: str) -> ModelHealth:
+        with self._lock:
+            health = self._models.get(model_id)
+            if health is None:
+                health = self._models[model_id] = ModelHealth(model_id)
+            return health
+
+    def record(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = dict(self._models)
+            counters = {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "failovers": self.failovers,
+                "fallbacks": self.fallbacks,
+            }
+        return {**counters, "models": {model_id: health.stats() for model_id, health in models.items()}}
+
+
+llm_health = LLMHealthRegistry()
+
+
+class _Attempt:
+    def __init__(self, backend, health: ModelHealth, hedged: bool, kind: str):
+        self.backend = backend
+        self.health = health
+        self.hedged = hedged
+        self.kind = kind
+        self.started = time.monotonic()
+        self.stream = None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class LLMRouter:
+    """Routes chat completions across several LLM backends. Same interface as LLMService."""
+
+    def __init__(self, backends: List, health: LLMHealthRegistry = None, hedge_ms: int = None, hedge_min_ms: int = None):
+        """
+        Args:
+            backends: LLM backends in order of preference, the agent's own model first
+            health: Shared statistics. Defaults to the process-wide llm_health
+            hedge_ms: Hedge deadline before the primary has latency samples, and the
+                      upper bound afterwards. Defaults to settings.LLM_ROUTER_HEDGE_MS
+            hedge_min_ms: Lower bound of the hedge deadline. Defaults to settings.LLM_ROUTER_HEDGE_MIN_MS
+        """
+        unique = {}
+        for backend in backends:
+            unique.setdefault(backend.model_id, backend)
+        self.backends = list(unique.values())
+        if not self.backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.health = health or llm_health
+        self.hedge_max = (hedge_ms or settings.LLM_ROUTER_HEDGE_MS) / 1000
+        self.hedge_min = min(self.hedge_max, (settings.LLM_ROUTER_HEDGE_MIN_MS if hedge_min_ms is None else hedge_min_ms) / 1000)
+        # Replies are keyed (response cache, token budget) under the agent's own model
+        self.model_id = self.backends[0].model_id
+
+    def ranked(self, kind: str = COMPLETION) -> List:
+        """
+        Backends by preference: measured models fastest first (p50 of `kind`), then
+        unmeasured in configured order.
+        """
+        def key(item):
+            index, backend = item
+            p50 = self.health.get(backend.model_id).p50(kind)
+            return (p50 is None, p50 or 0.0, index)
+
+        return [backend for _, backend in sorted(enumerate(self.backends), key=key)]
+
+    def _healthy(self, skipped: List, kind: str) -> Iterator:
+        """Backends by preference whose circuit allows a request; the others are added to `skipped`."""
+        # Lazy, so a half-open trial is only claimed when the request really goes there
+        for backend in self.ranked(kind):
+            if self.health.get(backend.model_id).allow():
+                yield backend
+            else:
+                skipped.append(backend)
+
+    def hedge_delay(self, backend, kind: str = COMPLETION) -> float:
+        """Seconds to wait on a backend before hedging to the next one (p95 of `kind`)."""
+        p95 = self.health.get(backend.model_id).p95(kind)
+        if p95 is None:
+            return self.hedge_max
+        return min(self.hedge_max, max(self.hedge_min, p95))
+
+    def _failed(self, attempt: _Attempt, error: Exception):
+        attempt.health.record_failure()
+        print(f"⚠️ LLM router: {attempt.backend.model_id} failed after {attempt.elapsed() * 1000:.0f} ms: {error}")
+
+    def _succeeded(self, attempt: _Attempt, first: _Attempt):
+        attempt.health.record_success(attempt.elapsed(), attempt.kind)
+        if attempt is not first:
+            self.health.record(hedge_wins=1 if attempt.hedged else 0, failovers=0 if attempt.hedged else 1)
+
+    async def _race(self, start, messages, kind: str) -> Tuple[Optional[_Attempt], object]:
+        """
+        Runs `start(backend, messages)` coroutines with hedging and failover until one
+        succeeds; `kind` is the latency they wait for. Returns (winning attempt, its
+        result), or (None, None) if all failed.
+        """
+        self.health.record(requests=1)
+        skipped = []
+        healthy = self._healthy(skipped, kind)
+        running: Dict[asyncio.Task, _Attempt] = {}
+        first = None
+        hedge_at = None
+
+        def launch(hedged: bool) -> bool:
+            nonlocal hedge_at, first
+            backend = next(healthy, None)
+            if backend is None and not hedged and skipped:
+                # Every healthy model failed: an open circuit is still better than the canned reply
+                backend = skipped.pop(0)
+            if backend is None:
+                hedge_at = None
+                return False
+            attempt = _Attempt(backend, self.health.get(backend.model_id), hedged, kind)
+            running[asyncio.create_task(start(attempt, messages))] = attempt
+            first = first or attempt
+            hedge_at = attempt.started + self.hedge_delay(backend, kind)
+            return True
+
+        launch(hedged=False)
+        try:
+            while running:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The newest attempt ran past its deadline: race it against the next model
+                    if launch(hedged=True):
+                        self.health.record(hedges=1)
+                    continue
+                for task in done:
+                    attempt = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        self._failed(attempt, e)
+                        if not running:
+                            launch(hedged=False)
+                        continue
+                    self._succeeded(attempt, first)
+                    return attempt, result
+            self.health.record(fallbacks=1)
+            print("❌ LLM router: every model failed, using the fallback response")
+            return None, None
+        finally:
+            for task, attempt in running.items():
+                task.cancel()
+                attempt.health.record_cancelled(attempt.elapsed(), kind)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+                for attempt in running.values():
+                    if attempt.stream is not None:
+                        await attempt.stream.aclose()
+
+    @staticmethod
+    async def _complete(attempt: _Attempt, messages) -> str:
+        reply = "".join([token async for token in attempt.backend.astream_raw(messages)])
+        if not reply.strip():
+            raise ValueError("empty reply")
+        return reply
+
+    @staticmethod
+    async def _first_token(attempt: _Attempt, messages) -> str:
+        attempt.stream = attempt.backend.astream_raw(messages)
+        try:
+            return await attempt.stream.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("empty reply")
+
+    async def agenerate(self, messages) -> str:
+        """Full completion from the fastest model that answers, hedged and with failover."""
+        _, reply = await self._race(self._complete, messages, COMPLETION)
+        return reply if reply is not None else FALLBACK_RESPONSE
+
+    async def astream(self, messages) -> AsyncIterator[str]:
+        """Streams a completion; hedging and failover apply until the first token arrives."""
+        stream = self.astream_raw(messages)
+        produced = False
+        try:
+            async for token in stream:
+                produced = True
+                yield token
+        except Exception:
+            # The caller has heard part of this reply already; end it here rather than start over
+            if not produced:
+                yield FALLBACK_RESPONSE
+        finally:
+            await stream.aclose()
+
+    async def astream_raw(self, messages) -> AsyncIterator[str]:
+        """Like astream, but raises when every model fails or the winning stream breaks."""
+        attempt, token = await self._race(self._first_token, messages, FIRST_TOKEN)
+        if attempt is None:
+            raise RuntimeError("every LLM model failed")
+        try:
+            yield token
+            async for token in attempt.stream:
+                yield token
+        except Exception as e:
+            print(f"⚠️ LLM router: {attempt.backend.model_id} failed mid-stream: {e}")
+            attempt.health.record_failure()
+            raise
+        finally:
+            await attempt.stream.aclose()
+
+    def get_response(self, messages) -> str:
+        """Blocking completion: tries models in order of preference until one answers."""
+        self.health.record(requests=1)
+        first = None
+        skipped = []
+        for backend in itertools.chain(self._healthy(skipped, COMPLETION), skipped):
+            attempt = _Attempt(backend, self.health.get(backend.model_id), hedged=False, kind=COMPLETION)
+            first = first or attempt
+            try:
+                reply = backend.complete(messages)
+                if not reply or not reply.strip():
+                    raise ValueError("empty reply")
+            except Exception as e:
+                self._failed(attempt, e)
+                continue
+            self._succeeded(attempt, first)
+            return reply
+        self.health.record(fallbacks=1)
+        return FALLBACK_RESPONSE
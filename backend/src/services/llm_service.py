@@ -1,9 +1,15 @@
 """
 LLM Service supporting both Gemini and Groq APIs for conversational AI.
+Offers a blocking API (get_response) and an async API (agenerate/astream) that
+uses the providers' async clients so it never blocks the event loop.
 """
+from typing import AsyncIterator
 import google.generativeai as genai
-from groq import Groq
+from groq import Groq, AsyncGroq
 from ..core.config import settings
+from .gemini_backend import GeminiBackend
+
+FALLBACK_RESPONSE = "I'm sorry, I'm having trouble thinking right now."
 
 
 class LLMService:
@@ -49,7 +55,8 @@ class LLMService:
             # Use mapped name if available, otherwise use as-is
             actual_model = model_mapping.get(model_name, model_name)
             
-            self.model = genai.GenerativeModel(actual_model)
+            self.gemini = GeminiBackend(actual_model)
+            self.model_id = f"gemini:{actual_model}"
             print(f"✅ LLMService: Successfully initialized Gemini with model '{actual_model}'.")
         except Exception as e:
             print(f"❌ Failed to initialize Gemini: {e}")
@@ -59,7 +66,9 @@ class LLMService:
         """Initialize Groq API client."""
         try:
             self.client = Groq(api_key=settings.GROQ_API_KEY)
+            self.async_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
             self.model_name = self.custom_model or settings.GROQ_MODEL
+            self.model_id = f"groq:{self.model_name}"
             print(f"✅ LLMService: Successfully initialized Groq with model '{self.model_name}'.")
         except Exception as e:
             print(f"❌ Failed to initialize Groq: {e}")
@@ -77,38 +86,83 @@ class LLMService:
             str: The model's response text
         """
         try:
-            if self.provider == "gemini":
-                return self._get_gemini_response(messages)
-            elif self.provider == "groq":
-                return self._get_groq_response(messages)
+            return self.complete(messages)
+        except Exception as e:
+            print(f"Error getting LLM response: {e}")
+            return FALLBACK_RESPONSE
+
+    def complete(self, messages) -> str:
+        """Like get_response, but raises on provider errors instead of returning FALLBACK_RESPONSE."""
+        if self.provider == "gemini":
+            return self._get_gemini_response(messages)
+        return self._get_groq_response(messages)
+
+    async def agenerate(self, messages) -> str:
+        """
+        Async version of get_response: returns the full completion without
+        blocking the event loop.
+        """
+        try:
+            return "".join([token async for token in self.astream_raw(messages)])
         except Exception as e:
+            # Nobody has heard any of it yet, so a reply cut off mid-stream is not returned either
             print(f"Error getting LLM response: {e}")
-            return "I'm sorry, I'm having trouble thinking right now."
+            return FALLBACK_RESPONSE
+
+    async def astream(self, messages) -> AsyncIterator[str]:
+        """
+        Streams a chat completion from the configured LLM provider, yielding text
+        fragments as they arrive.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content' keys
+
+        Yields:
+            str: Successive pieces of the model's response text
+        """
+        produced = False
+        try:
+            async for token in self.astream_raw(messages):
+                produced = True
+                yield token
+        except Exception as e:
+            print(f"Error streaming LLM response: {e}")
+            # Only fall back if the caller has not heard anything yet
+            if not produced:
+                yield FALLBACK_RESPONSE
+
+    async def astream_raw(self, messages) -> AsyncIterator[str]:
+        """Like astream, but raises on provider errors instead of yielding FALLBACK_RESPONSE."""
+        if self.provider == "gemini":
+            stream = self._stream_gemini_response(messages)
+        else:
+            stream = self._stream_groq_response(messages)
+        async for token in stream:
+            if token:
+                yield token
+
+    async def _stream_gemini_response(self, messages) -> AsyncIterator[str]:
+        """Stream a response from Gemini's async API."""
+        async for token in self.gemini.astream(messages):
+            yield token
+
+    async def _stream_groq_response(self, messages) -> AsyncIterator[str]:
+        """Stream a response from Groq's async API."""
+        stream = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=60,  # Very short responses for voice chat (40-50 words max)
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
     
     def _get_gemini_response(self, messages):
         """Get response from Gemini API."""
-        # Convert OpenAI format to Gemini format
-        # Gemini uses a chat session with history
-        chat = self.model.start_chat(history=[])
-        
-        # Build conversation history
-        for msg in messages[:-1]:  # All but last message
-            role = "user" if msg["role"] == "user" else "model"
-            chat.history.append({
-                "role": role,
-                "parts": [msg["content"]]
-            })
-        
-        # Send the last message and get response
-        last_message = messages[-1]["content"]
-        response = chat.send_message(
-            last_message,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=60,  # Very short responses for voice chat (40-50 words max)
-                temperature=0.7,
-            )
-        )
-        return response.text
+        # One request per turn; system prompt sent as the model's system instruction
+        return self.gemini.generate(messages)
     
     def _get_groq_response(self, messages):
         """Get response from Groq API."""
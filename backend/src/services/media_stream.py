@@ -0,0 +1,387 @@
+# backend/src/services/media_stream.py
+"""
+Twilio Media Streams session: real-time, bidirectional call audio over a WebSocket.
+
+Twilio sends JSON messages ("connected", "start", "media", "mark", "stop") whose media
+payloads are base64 8 kHz G.711 u-law. The session decodes the caller's audio, detects
+the end of each utterance with the voice activity detector (utils/vad.py), transcribes
+it with the STT service, asks the agent for a reply and streams the TTS audio back as
+u-law "media" messages, skipping the TwiML <Say>/<Gather> webhook round trip entirely.
+
+With streaming STT, the reply is generated speculatively from the interim transcript
+while the caller is still finishing (see speculative_llm.py) and committed at the endpoint.
+
+Barge-in: while the agent's audio is still playing (Twilio has not echoed its mark yet),
+caller speech that lasts VAD_BARGE_IN_MS sends a "clear" message, which drops the audio
+Twilio has buffered, so the agent stops talking and listens.
+
+Like the TwiML webhook, the session keeps the conversation in conversation_store
+(persisted to call_logs.full_transcript) and ends the call once the agent has said
+goodbye: when Twilio echoes the mark after that reply, the WebSocket is closed, which
+ends the <Connect><Stream> and, with no TwiML after it, the call.
+
+The session only talks to its collaborators through small interfaces, so stub STT,
+LLM and TTS providers can drive it offline (see scripts/replay_media_stream.py):
+  - agent: aget_initial_greeting() and aprocess_response(text, history)
+  - stt:   transcribe_buffer(wav_bytes, mimetype) -> str, or with streaming_stt
+           open_stream(sample_rate, encoding) -> StreamingSTTSession, which gets the
+           raw frames and decides where utterances end (see streaming_stt.py)
+  - tts:   astream(text, ulaw=True) yielding u-law chunks as they are synthesized,
+           or synthesize_ulaw(text) -> bytes
+  - send:  async callable taking the JSON-serialisable dict to send to Twilio
+  - hangup: optional async callable that ends the call (closes the WebSocket)
+  - conversation_store: optional store the turns are appended to, keyed by CallSid
+"""
+import asyncio
+import base64
+import json
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..utils.audio_helpers import TELEPHONY_SAMPLE_RATE, pcm16_to_wav_bytes, ulaw_to_pcm16
+from ..utils.vad import BARGE_IN, SPEECH_END, StreamingVAD, VoiceActivityDetector
+from .speculative_llm import SpeculativeResponder
+from .streaming_stt import ENDPOINT, INTERIM
+
+# Outbound audio is sent in chunks of this many milliseconds
+OUTBOUND_CHUNK_MS = 200
+
+# Recorded messages are written in batches of this many (50 media frames per second)
+RECORD_BATCH_MESSAGES = 50
+
+
+class MediaStreamSession:
+    """Drives one phone call carried over a Twilio Media Stream."""
+
+    def __init__(
+        self,
+        agent,
+        stt,
+        tts,
+        send: Callable[[dict], Awaitable[None]],
+        speech_threshold: int = None,
+        end_of_speech_ms: int = None,
+        min_speech_ms: int = 200,
+        record_path: Optional[str] = None,
+        greeting=None,
+        streaming_stt: bool = None,
+        barge_in: bool = None,
+        speculative: bool = None,
+        hangup: Optional[Callable[[], Awaitable[None]]] = None,
+        conversation_store=None,
+    ):
+        """
+        Args:
+            agent: Conversational agent (see module docstring)
+            stt: Speech-to-text service with transcribe_buffer()
+            tts: Text-to-speech service with astream() or synthesize_ulaw()
+            send: Coroutine function used to send messages back to Twilio
+            speech_threshold: Minimum RMS level of caller speech.
+                              Defaults to settings.MEDIA_STREAM_SPEECH_RMS
+            end_of_speech_ms: Trailing silence that ends an utterance.
+                              Defaults to settings.MEDIA_STREAM_END_OF_SPEECH_MS
+            min_speech_ms: Utterances with less speech than this are ignored as noise
+            record_path: If set, every inbound Twilio message is appended there as JSON lines,
+                         in batches written from a worker thread
+            greeting: Optional prepared greeting (see services/greeting_audio.py) played
+                      instead of generating and synthesizing one when the stream starts
+            streaming_stt: Stream the caller's audio to stt.open_stream() instead of cutting
+                           utterances locally. Defaults to settings.MEDIA_STREAM_STREAMING_STT
+            barge_in: Stop the agent's audio when the caller talks over it.
+                      Defaults to settings.MEDIA_STREAM_BARGE_IN
+            speculative: Start the LLM on interim transcripts (streaming STT only).
+                         Defaults to settings.LLM_SPECULATION_ENABLED
+            hangup: Coroutine function that ends the call, awaited after the agent's goodbye
+            conversation_store: Store each turn is appended to under the call's CallSid
+                                (see services/conversation_store.py)
+        """
+        self.agent = agent
+        self.stt = stt
+        self.tts = tts
+        self.send = send
+        self.record_path = record_path
+        self.greeting = greeting
+        self.hangup = hangup
+        self.conversation_store = conversation_store
+        if streaming_stt is None:
+            streaming_stt = settings.MEDIA_STREAM_STREAMING_STT
+        self.streaming_stt = streaming_stt and hasattr(stt, "open_stream")
+        self.barge_in = settings.MEDIA_STREAM_BARGE_IN if barge_in is None else barge_in
+        if speculative is None:
+            speculative = settings.LLM_SPECULATION_ENABLED
+        # Only streaming STT produces interim transcripts to speculate on
+        self.speculator = SpeculativeResponder() if speculative and self.streaming_stt else None
+        # With streaming STT the provider finds utterances; the VAD is then only needed for barge-in
+        self.vad = StreamingVAD(
+            VoiceActivityDetector(sample_rate=TELEPHONY_SAMPLE_RATE, speech_rms=speech_threshold),
+            end_of_utterance_ms=end_of_speech_ms,
+            min_speech_ms=min_speech_ms,
+            collect_audio=not self.streaming_stt,
+        )
+
+        self.stream_sid: Optional[str] = None
+        self.call_sid: Optional[str] = None
+        self.conversation_history: List[Dict[str, str]] = []
+        self.turn_metrics: List[dict] = []
+
+        self._turn_lock = asyncio.Lock()
+        self._tasks = set()
+        self._turn_index = 0
+        self._record_buffer: List[str] = []
+        self._record_writer: Optional[asyncio.Task] = None
+        self._stt_stream = None
+        self._stt_consumer = None
+        # Marks sent after agent audio that Twilio has not echoed back yet, i.e. audio still playing
+        self._pending_marks = set()
+        # Mark after the agent's goodbye; the call ends when Twilio echoes it
+        self._hangup_mark: Optional[str] = None
+        self.ended = False
+        self.barge_ins = 0
+        # Latest interim transcript of the utterance in progress (streaming STT only)
+        self.interim_transcript = ""
+
+    # --- Inbound messages -------------------------------------------------
+
+    async def handle_message(self, message: dict) -> bool:
+        """
+        Process one message from Twilio.
+
+        Returns:
+            bool: False once the stream has stopped or the call was ended, True otherwise.
+        """
+        if self.record_path:
+            self._record(message)
+
+        event = message.get("event")
+        if event == "start":
+            start = message.get("start", {})
+            self.stream_sid = message.get("streamSid") or start.get("streamSid")
+            self.call_sid = start.get("callSid")
+            print(f"📡 Media stream started: stream {self.stream_sid}, call {self.call_sid}")
+            if self.streaming_stt:
+                await self._open_stt_stream()
+            self._spawn(self._greet())
+        elif event == "media":
+            frame = base64.b64decode(message["media"]["payload"])
+            if self._stt_stream is not None:
+                await self._stt_stream.send_audio(frame)
+            await self._on_audio(frame)
+        elif event == "mark":
+            name = message.get("mark", {}).get("name")
+            self._pending_marks.discard(name)
+            if name is not None and name == self._hangup_mark:
+                await self._end_call()
+                return False
+        elif event == "stop":
+            print(f"📴 Media stream stopped for call {self.call_sid}")
+            await self.close()
+            return False
+        # "connected" needs no action
+        return True
+
+    async def _open_stt_stream(self):
+        self._stt_stream = self.stt.open_stream(sample_rate=TELEPHONY_SAMPLE_RATE, encoding="mulaw")
+        await self._stt_stream.start()
+        # Runs for the whole call, so it is kept out of the per-turn tasks wait_idle() waits for
+        self._stt_consumer = asyncio.create_task(self._consume_transcripts(self._stt_stream))
+
+    async def _consume_transcripts(self, stream):
+        async for event in stream.events():
+            if event.type == INTERIM:
+                self.interim_transcript = event.text
+                # While a turn is in flight the history is about to change, so wait for it
+                if self.speculator is not None and not self._turn_lock.locked():
+                    self.speculator.update(event.text, self.conversation_history, self.agent.aprocess_response)
+            elif event.type == ENDPOINT:
+                self.interim_transcript = ""
+                self._spawn(self._respond_to_transcript(event.text, end_of_speech=time.perf_counter()))
+
+    async def _on_audio(self, ulaw_frame: bytes):
+        for event in self.vad.process(ulaw_to_pcm16(ulaw_frame)):
+            if event.type == BARGE_IN:
+                await self._barge_in()
+            elif event.type == SPEECH_END and not self.streaming_stt:
+                self._spawn(self._respond(event.audio, end_of_speech=time.perf_counter()))
+
+    @property
+    def agent_speaking(self) -> bool:
+        """True while agent audio sent to Twilio has not finished playing."""
+        return bool(self._pending_marks)
+
+    async def _barge_in(self):
+        if not self.barge_in or not self.agent_speaking:
+            return
+        # "clear" drops the audio Twilio has buffered; it echoes the pending marks right away
+        self._pending_marks.clear()
+        # A caller who talks over the goodbye gets an answer instead of a hang-up
+        self._hangup_mark = None
+        self.barge_ins += 1
+        print(f"✋ Caller barged in on call {self.call_sid}; stopping agent audio")
+        await self.send({"event": "clear", "streamSid": self.stream_sid})
+
+    # --- Conversation turns ------------------------------------------------
+
+    async def _greet(self):
+        async with self._turn_lock:
+            ulaw = await asyncio.to_thread(self.greeting.read_ulaw) if self.greeting else None
+            if ulaw:
+                self._add_messages({"role": "assistant", "content": self.greeting.text})
+                await self._send_audio(_as_chunks(ulaw))
+                return
+            greeting = await self.agent.aget_initial_greeting()
+            self._add_messages({"role": "assistant", "content": greeting})
+            await self._speak(greeting)
+
+    async def _respond(self, pcm_utterance: bytes, end_of_speech: float):
+        async with self._turn_lock:
+            turn_started = time.perf_counter()
+            wav = pcm16_to_wav_bytes(pcm_utterance, TELEPHONY_SAMPLE_RATE)
+            transcript = await asyncio.to_thread(self.stt.transcribe_buffer, wav, "audio/wav")
+            stt_done = time.perf_counter()
+            if not transcript or not transcript.strip():
+                return
+            await self._reply(transcript, end_of_speech, turn_started, stt_done)
+
+    async def _respond_to_transcript(self, transcript: str, end_of_speech: float):
+        """Answer an utterance the streaming STT session already transcribed."""
+        async with self._turn_lock:
+            turn_started = time.perf_counter()
+            await self._reply(transcript, end_of_speech, turn_started, turn_started)
+
+    async def _reply(self, transcript: str, end_of_speech: float, turn_started: float, stt_done: float):
+        """Generate, record and speak the reply to one utterance. The caller holds the turn lock."""
+        print(f"🎤 Caller said: '{transcript}'")
+        if self.speculator is not None:
+            reply = await self.speculator.commit(transcript, self.conversation_history, self.agent.aprocess_response)
+        else:
+            reply = await self.agent.aprocess_response(transcript, self.conversation_history)
+        llm_done = time.perf_counter()
+        self._add_messages({"role": "user", "content": transcript}, {"role": "assistant", "content": reply})
+        print(f"🤖 Agent replies: '{reply}'")
+
+        first_audio = await self._speak(reply, hang_up="goodbye" in reply.lower())
+        metrics = {
+            "queued_ms": round((turn_started - end_of_speech) * 1000, 1),
+            "stt_ms": round((stt_done - turn_started) * 1000, 1),
+            "llm_ms": round((llm_done - stt_done) * 1000, 1),
+            "first_audio_ms": round(((first_audio or llm_done) - end_of_speech) * 1000, 1),
+        }
+        self.turn_metrics.append(metrics)
+        print(f"⏱️  Media stream turn: {metrics}")
+
+    def _add_messages(self, *messages: Dict[str, str]):
+        self.conversation_history.extend(messages)
+        if self.conversation_store is not None and self.call_sid:
+            self.conversation_store.append(self.call_sid, *messages)
+
+    async def _speak(self, text: str, hang_up: bool = False) -> Optional[float]:
+        """
+        Synthesize text and stream it to Twilio. Returns when the first chunk was sent.
+        With hang_up, the call ends once the audio has finished playing.
+        """
+        if not text:
+            return None
+        if hasattr(self.tts, "astream"):
+            # Playback starts with the first synthesized chunk rather than the whole reply
+            return await self._send_audio(self.tts.astream(text, ulaw=True), hang_up)
+        ulaw = await asyncio.to_thread(self.tts.synthesize_ulaw, text)
+        return await self._send_audio(_as_chunks(ulaw), hang_up)
+
+    async def _send_audio(self, chunks: AsyncIterator[bytes], hang_up: bool = False) -> Optional[float]:
+        """Stream u-law audio to Twilio followed by a mark. Returns when the first chunk was sent."""
+        chunk_size = TELEPHONY_SAMPLE_RATE * OUTBOUND_CHUNK_MS // 1000
+        # A mark is echoed back by Twilio once playback reaches this point
+        self._turn_index += 1
+        mark = f"turn-{self._turn_index}"
+        self._pending_marks.add(mark)
+        first_sent = None
+        try:
+            async for ulaw in chunks:
+                for offset in range(0, len(ulaw), chunk_size):
+                    if mark not in self._pending_marks:
+                        return first_sent  # The caller barged in; the rest is not wanted
+                    await self.send({
+                        "event": "media",
+                        "streamSid": self.stream_sid,
+                        "media": {"payload": base64.b64encode(ulaw[offset:offset + chunk_size]).decode("ascii")},
+                    })
+                    if first_sent is None:
+                        first_sent = time.perf_counter()
+        finally:
+            # Stops the synthesis if the caller barged in
+            await chunks.aclose()
+
+        if mark not in self._pending_marks:
+            return first_sent
+        if hang_up:
+            self._hangup_mark = mark
+        await self.send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": mark}})
+        return first_sent
+
+    async def _end_call(self):
+        print(f"🏁 Agent said goodbye, ending call {self.call_sid}")
+        self.ended = True
+        await self.close()
+        if self.hangup is not None:
+            await self.hangup()
+
+    # --- Housekeeping -----------------------------------------------------
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Media stream turn failed: {task.exception()}")
+
+    async def wait_idle(self):
+        """Wait for in-flight turns to finish (used by the offline replayer)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self):
+        if self.speculator is not None:
+            self.speculator.cancel()
+        if self._stt_stream is not None:
+            stream, self._stt_stream = self._stt_stream, None
+            await stream.aclose()
+            self._stt_consumer.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._record_buffer:
+            self._flush_record()
+        if self._record_writer is not None:
+            await self._record_writer
+
+    def _record(self, message: dict):
+        self._record_buffer.append(json.dumps(dict(message, _received_at=time.time())))
+        if len(self._record_buffer) >= RECORD_BATCH_MESSAGES:
+            self._flush_record()
+
+    def _flush_record(self):
+        lines, self._record_buffer = self._record_buffer, []
+        self._record_writer = asyncio.create_task(self._write_record(lines, self._record_writer))
+
+    async def _write_record(self, lines: List[str], previous: Optional[asyncio.Task]):
+        # Chained on the previous batch so the recording stays in order
+        if previous is not None:
+            await previous
+        try:
+            await asyncio.to_thread(self._append_record, lines)
+        except Exception as e:
+            print(f"⚠️ Could not write media stream recording {self.record_path}: {e}")
+
+    def _append_record(self, lines: List[str]):
+        os.makedirs(os.path.dirname(self.record_path) or ".", exist_ok=True)
+        with open(self.record_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+async def _as_chunks(ulaw: bytes) -> AsyncIterator[bytes]:
+    """Audio synthesized (or loaded) in one piece, as a one-chunk stream."""
+    yield ulaw
@@ -0,0 +1,207 @@
+# backend/src/services/response_cache.py
+"""
+Cache of LLM replies for repeated conversational turns.
+
+Campaign calls run one system prompt against thousands of people who mostly say the
+same few things, and the greeting is identical for every call of an agent. A reply
+is keyed by the model, a hash of the system prompt, the last few history messages
+and the caller's latest message, all normalized (case, punctuation, whitespace), so
+"Who is this?" and "who is this" share an entry.
+
+Two tiers:
+  - exact: a TTL/LRU map from that key to the reply
+  - semantic (optional): when an embedding function is configured, a miss is
+    compared by cosine similarity with cached replies that share the same prompt and
+    history, so "not interested" can reuse the reply to "I'm not interested".
+
+Agents opt out with Agent.response_cache_enabled = False.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from ..utils.cache import TTLCache
+from .llm_service import FALLBACK_RESPONSE
+
+Messages = List[Dict[str, str]]
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", (text or "").lower())).strip()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match plus optional embedding-similarity cache of LLM replies."""
+
+    def __init__(
+        self,
+        maxsize: int = None,
+        ttl: float = None,
+        history_messages: int = None,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        similarity_threshold: float = None,
+        max_semantic_entries: int = 256,
+    ):
+        """
+        Args:
+            maxsize: Exact-match entries kept. Defaults to settings.RESPONSE_CACHE_SIZE.
+            ttl: Seconds an entry stays valid. Defaults to settings.RESPONSE_CACHE_TTL_SECONDS.
+            history_messages: Prior messages (besides the latest user message) that are part
+                              of the key. Defaults to settings.RESPONSE_CACHE_HISTORY_MESSAGES.
+            embed: Optional text -> vector function enabling the semantic tier
+            similarity_threshold: Minimum cosine similarity for a semantic hit.
+                                  Defaults to settings.RESPONSE_CACHE_SIMILARITY.
+            max_semantic_entries: Embeddings kept per prompt/history context
+        """
+        self.history_messages = settings.RESPONSE_CACHE_HISTORY_MESSAGES if history_messages is None else history_messages
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold or settings.RESPONSE_CACHE_SIMILARITY
+        self.max_semantic_entries = max_semantic_entries
+        self._exact = TTLCache(
+            maxsize=maxsize or settings.RESPONSE_CACHE_SIZE,
+            ttl=ttl or settings.RESPONSE_CACHE_TTL_SECONDS,
+        )
+        # context key -> OrderedDict(exact key -> unit vector); replies themselves live in _exact
+        self._semantic: "OrderedDict[str, OrderedDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    # --- Keys ---------------------------------------------------------------
+
+    def _keys(self, model_id: str, messages: Messages):
+        """Return (context_key, exact_key, latest_text) for a prompt in chat format."""
+        system = "".join(m["content"] for m in messages if m["role"] == "system")
+        dialogue = [m for m in messages if m["role"] != "system"]
+        latest = dialogue[-1]["content"] if dialogue else ""
+        history = dialogue[:-1][-self.history_messages:] if self.history_messages else []
+        context_key = _digest(
+            model_id,
+            hashlib.sha256(system.encode("utf-8")).hexdigest(),
+            *(f"{m['role']}:{normalize_text(m['content'])}" for m in history),
+        )
+        return context_key, _digest(context_key, normalize_text(latest)), latest
+
+    # --- Lookup / store -----------------------------------------------------
+
+    def get(self, model_id: str, messages: Messages) -> Optional[str]:
+        """Return a cached reply for this prompt, or None."""
+        context_key, exact_key, latest = self._keys(model_id, messages)
+        reply = self._exact.get(exact_key)
+        if reply is not None:
+            with self._lock:
+                self.exact_hits += 1
+            return reply
+
+        if self.embed is not None:
+            reply = self._semantic_lookup(context_key, latest)
+            if reply is not None:
+                with self._lock:
+                    self.semantic_hits += 1
+                return reply
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, model_id: str, messages: Messages, reply: str):
+        """Cache a reply. Empty replies and the provider-failure fallback are never cached."""
+        if not reply or not reply.strip() or reply == FALLBACK_RESPONSE:
+            return
+        context_key, exact_key, latest = self._keys(model_id, messages)
+        self._exact.set(exact_key, reply)
+        if self.embed is not None:
+            vector = self._embed(latest)
+            if vector is not None:
+                with self._lock:
+                    entries = self._semantic.setdefault(context_key, OrderedDict())
+                    self._semantic.move_to_end(context_key)
+                    entries[exact_key] = vector
+                    entries.move_to_end(exact_key)
+                    while len(entries) > self.max_semantic_entries:
+                        entries.popitem(last=False)
+                    while len(self._semantic) > self._exact.maxsize:
+                        self._semantic.popitem(last=False)
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(self.embed(normalize_text(text)), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Response cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, context_key: str, latest: str) -> Optional[str]:
+        with self._lock:
+            entries = self._semantic.get(context_key)
+            if not entries:
+                return None
+            keys = list(entries.keys())
+            matrix = np.stack(list(entries.values()))
+        vector = self._embed(latest)
+        if vector is None:
+            return None
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        # The reply may have expired from the exact tier since it was embedded
+        return self._exact.get(keys[best])
+
+    # --- Housekeeping -------------------------------------------------------
+
+    def clear(self):
+        self._exact.clear()
+        with self._lock:
+            self._semantic.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._exact),
+                "maxsize": self._exact.maxsize,
+                "semantic_contexts": len(self._semantic),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def gemini_embedder(model: str = None) -> Callable[[str], Sequence[float]]:
+    """Embedding function for the semantic tier backed by the Gemini embeddings API."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    model = model or settings.RESPONSE_CACHE_EMBEDDING_MODEL
+
+    def embed(text: str) -> Sequence[float]:
+        return genai.embed_content(model=model, content=text)["embedding"]
+
+    return embed
+
+
+response_cache = ResponseCache(embed=gemini_embedder() if settings.RESPONSE_CACHE_SEMANTIC else None)
+
+
+def response_cache_for(db_agent) -> Optional[ResponseCache]:
+    """The shared response cache, or None if caching is off globally or for this agent."""
+    if not settings.RESPONSE_CACHE_ENABLED or not getattr(db_agent, "response_cache_enabled", True):
+        return None
+    return response_cache
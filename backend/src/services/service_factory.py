@@ -2,18 +2,86 @@
 """
 Service Factory for creating agent-specific service instances.
 Allows each agent to use different LLM providers, TTS voices, and STT providers.
+
+Service clients are expensive to build (SDK setup, new HTTP/TLS connections), so the
+get_* methods hand out shared instances from a thread-safe LRU/TTL cache keyed by
+configuration. The create_* methods still build fresh, uncached instances.
+
+With LLM_ROUTER_ENABLED (off by default), get_llm_service returns an LLMRouter that puts the agent's
+model first and the LLM_ROUTER_BACKENDS models behind it.
 """
 
-from typing import Optional
+from typing import List, Optional, Union
 from .llm_service import LLMService
+from .llm_router import LLMRouter
 from .tts_service import TTSService
 from .stt_service import STTService
 from ..models.agent import Agent
 from ..core.config import settings
+from ..utils.cache import TTLCache
+
+
+class AgentServices:
+    """
+    Lazily resolved services for one agent. A service is only fetched (and, on a
+    cache miss, constructed) the first time a route accesses it.
+    """
+
+    def __init__(self, factory: "ServiceFactory", agent: Agent):
+        self._factory = factory
+        self._llm_provider = agent.llm_provider
+        self._llm_model = agent.llm_model
+        self._tts_voice_id = agent.tts_voice_id
+        self._stt_provider = agent.stt_provider
+
+    @property
+    def llm(self) -> Union[LLMService, LLMRouter]:
+        return self._factory.get_llm_service(provider=self._llm_provider, model=self._llm_model)
+
+    @property
+    def tts(self) -> TTSService:
+        return self._factory.get_tts_service(voice_id=self._tts_voice_id)
+
+    @property
+    def stt(self) -> STTService:
+        return self._factory.get_stt_service(provider=self._stt_provider)
+
+    def __getitem__(self, name: str):
+        # Allows dict-style access (services['llm']) like create_services_for_agent
+        if name not in ("llm", "tts", "stt"):
+            raise KeyError(name)
+        return getattr(self, name)
 
 
 class ServiceFactory:
     """Factory for creating service instances with agent-specific configurations."""
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        """
+        Args:
+            maxsize: Entries kept per service type. Defaults to settings.SERVICE_CACHE_SIZE
+            ttl: Seconds before a cached client is rebuilt. Defaults to settings.SERVICE_CACHE_TTL_SECONDS
+        """
+        maxsize = maxsize or settings.SERVICE_CACHE_SIZE
+        ttl = ttl or settings.SERVICE_CACHE_TTL_SECONDS
+        self._llm_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tts_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stt_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _llm_key(provider: Optional[str], model: Optional[str]) -> tuple:
+        provider = (provider or settings.LLM_PROVIDER).lower()
+        if model is None:
+            model = settings.GROQ_MODEL if provider == "groq" else settings.GEMINI_MODEL
+        return (provider, model)
+
+    @staticmethod
+    def _tts_key(voice_id: Optional[str]) -> tuple:
+        return (voice_id or settings.ELEVENLABS_VOICE_ID, settings.ELEVENLABS_MODEL_ID)
+
+    @staticmethod
+    def _stt_key(provider: Optional[str]) -> tuple:
+        return ((provider or settings.STT_PROVIDER).lower(),)
     
     @staticmethod
     def create_llm_service(
@@ -94,5 +162,76 @@ class ServiceFactory:
         }
 
 
+    def get_llm_service(self, provider: Optional[str] = None, model: Optional[str] = None) -> Union[LLMService, LLMRouter]:
+        """
+        Return a shared LLM service for (provider, model), creating it on first use.
+        With LLM_ROUTER_ENABLED this is a router with that model first.
+        """
+        key = self._llm_key(provider, model)
+        if settings.LLM_ROUTER_ENABLED:
+            return self._llm_cache.get_or_create(("router",) + key, lambda: LLMRouter(self._router_backends(key)))
+        return self._llm_backend(key)
+
+    def _llm_backend(self, key: tuple) -> LLMService:
+        return self._llm_cache.get_or_create(key, lambda: self.create_llm_service(*key))
+
+    def _router_backends(self, key: tuple) -> List[LLMService]:
+        backends = [self._llm_backend(key)]
+        for entry in settings.LLM_ROUTER_BACKENDS.split(","):
+            provider, _, model = entry.strip().partition(":")
+            if not provider:
+                continue
+            backup_key = self._llm_key(provider, model or None)
+            if backup_key == key:
+                continue
+            try:
+                backends.append(self._llm_backend(backup_key))
+            except Exception as e:
+                # A misconfigured backup must not take the agent's own model down with it
+                print(f"⚠️ Skipping LLM router backup {entry.strip()}: {e}")
+        return backends
+
+    def get_tts_service(self, voice_id: Optional[str] = None) -> TTSService:
+        """Return a shared TTS service for (voice, model), creating it on first use."""
+        key = self._tts_key(voice_id)
+        return self._tts_cache.get_or_create(key, lambda: self.create_tts_service(voice_id=key[0]))
+
+    def get_stt_service(self, provider: Optional[str] = None) -> STTService:
+        """Return a shared STT service for a provider, creating it on first use."""
+        key = self._stt_key(provider)
+        return self._stt_cache.get_or_create(key, lambda: self.create_stt_service(provider=key[0]))
+
+    def get_services_for_agent(self, agent: Agent) -> AgentServices:
+        """
+        Return the agent's services as a lazy bundle backed by the shared cache.
+        Only the services a route touches are ever constructed.
+        """
+        return AgentServices(self, agent)
+
+    def invalidate_agent(self, agent: Agent):
+        """
+        Drop cached services built for an agent's configuration, e.g. after the agent
+        is updated. Call this with the configuration as it was before the change.
+        """
+        llm_key = self._llm_key(agent.llm_provider, agent.llm_model)
+        self._llm_cache.pop(llm_key)
+        self._llm_cache.pop(("router",) + llm_key)
+        self._tts_cache.pop(self._tts_key(agent.tts_voice_id))
+        self._stt_cache.pop(self._stt_key(agent.stt_provider))
+
+    def clear_cache(self):
+        """Drop every cached service instance."""
+        self._llm_cache.clear()
+        self._tts_cache.clear()
+        self._stt_cache.clear()
+
+    def cache_stats(self) -> dict:
+        return {
+            "llm": self._llm_cache.stats(),
+            "tts": self._tts_cache.stats(),
+            "stt": self._stt_cache.stats(),
+        }
+
+
 # Convenience instance for direct usage
 service_factory = ServiceFactory()
@@ -0,0 +1,249 @@
+# backend/src/services/session_store.py
+"""
+Storage for text-chat conversation histories, keyed by (agent_id, session_id).
+
+Two backends share one small interface:
+  - InMemorySessionStore: per-process LRU with idle-TTL eviction, a session count
+    cap and an approximate memory cap. Fine for a single worker.
+  - RedisSessionStore: sessions live in Redis (or anything speaking its protocol),
+    so several workers behind a load balancer see the same sessions. Eviction is
+    Redis key expiry plus the server's maxmemory policy.
+
+Both keep a per-agent index so listing an agent's sessions never scans every key.
+Pick the backend with CHAT_SESSION_STORE_URL ("" / "memory://" or "redis://...").
+"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from ..core.config import settings
+
+Messages = List[Dict[str, str]]
+
+
+def recent_messages(messages: Messages, max_messages: int) -> Messages:
+    """The last max_messages messages, starting at a user message so no reply loses its question."""
+    recent = list(messages[-max_messages:])
+    if len(recent) < len(messages):
+        while recent and recent[0]["role"] != "user":
+            recent.pop(0)
+    return recent
+
+
+class SessionStore(ABC):
+    """Interface shared by the session store backends."""
+
+    @abstractmethod
+    def get(self, agent_id: int, session_id: str) -> Messages:
+        """Return a copy of the session's messages ([] if it does not exist)."""
+        pass
+
+    @abstractmethod
+    def save(self, agent_id: int, session_id: str, messages: Messages):
+        """Replace the session's messages, keeping only the most recent max_messages (whole exchanges)."""
+        pass
+
+    @abstractmethod
+    def delete(self, agent_id: int, session_id: str) -> bool:
+        """Remove a session. Returns False if it did not exist."""
+        pass
+
+    @abstractmethod
+    def list_sessions(self, agent_id: int) -> List[dict]:
+        """Return [{"session_id", "message_count"}] for the agent's live sessions."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Return backend-specific counters for monitoring."""
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU session store with idle expiry and a memory cap."""
+
+    def __init__(self, max_sessions: int = None, idle_ttl: float = None, max_bytes: int = None, max_messages: int = None):
+        """
+        Args:
+            max_sessions: Sessions kept before the least recently used is evicted.
+                          Defaults to settings.CHAT_SESSION_MAX_SESSIONS.
+            idle_ttl: Seconds without access after which a session expires.
+                      Defaults to settings.CHAT_SESSION_IDLE_TTL_SECONDS.
+            max_bytes: Approximate cap on the serialized size of all sessions.
+                       Defaults to settings.CHAT_SESSION_MAX_BYTES.
+            max_messages: Messages kept per session. Defaults to settings.CHAT_SESSION_MAX_MESSAGES.
+        """
+        self.max_sessions = max_sessions or settings.CHAT_SESSION_MAX_SESSIONS
+        self.idle_ttl = idle_ttl or settings.CHAT_SESSION_IDLE_TTL_SECONDS
+        self.max_bytes = max_bytes or settings.CHAT_SESSION_MAX_BYTES
+        self.max_messages = max_messages or settings.CHAT_SESSION_MAX_MESSAGES
+        # (agent_id, session_id) -> (messages, size_bytes, last_access), least recently used first
+        self._sessions: "OrderedDict[Tuple[int, str], tuple]" = OrderedDict()
+        self._by_agent: Dict[int, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: Tuple[int, str]):
+        _, size, _ = self._sessions.pop(key)
+        self._bytes -= size
+        agent_sessions = self._by_agent.get(key[0])
+        if agent_sessions is not None:
+            agent_sessions.discard(key[1])
+            if not agent_sessions:
+                del self._by_agent[key[0]]
+
+    def _expire_idle(self, now: float):
+        # The dict is ordered by last access, so expired sessions are all at the front
+        while self._sessions:
+            key, (_, _, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.idle_ttl:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def get(self, agent_id: int, session_id: str) -> Messages:
+        key = (agent_id, session_id)
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._sessions.get(key)
+            if entry is None:
+                return []
+            messages, size, _ = entry
+            self._sessions[key] = (messages, size, now)
+            self._sessions.move_to_end(key)
+            return list(messages)
+
+    def save(self, agent_id: int, session_id: str, messages: Messages):
+        key = (agent_id, session_id)
+        messages = recent_messages(messages, self.max_messages)
+        size = len(json.dumps(messages))
+        now = time.monotonic()
+        with self._lock:
+            if key in self._sessions:
+                self._remove(key)
+            self._sessions[key] = (messages, size, now)
+            self._bytes += size
+            self._by_agent.setdefault(agent_id, set()).add(session_id)
+
+            self._expire_idle(now)
+            while len(self._sessions) > self.max_sessions or (self._bytes > self.max_bytes and len(self._sessions) > 1):
+                self._remove(next(iter(self._sessions)))
+                self.evictions += 1
+
+    def delete(self, agent_id: int, session_id: str) -> bool:
+        with self._lock:
+            if (agent_id, session_id) not in self._sessions:
+                return False
+            self._remove((agent_id, session_id))
+            return True
+
+    def list_sessions(self, agent_id: int) -> List[dict]:
+        with self._lock:
+            self._expire_idle(time.monotonic())
+            return [
+                {"session_id": session_id, "message_count": len(self._sessions[(agent_id, session_id)][0])}
+                for session_id in sorted(self._by_agent.get(agent_id, ()))
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store backed by a Redis-compatible client (redis.Redis with
+    decode_responses=True, or any object with the same get/set/delete/exists/
+    zadd/zrem/zrangebyscore/zremrangebyscore methods).
+
+    Each session is a JSON string that expires after idle_ttl seconds without access.
+    Each agent has a sorted set of its session ids scored by last access, which is
+    pruned of expired members whenever it is listed.
+    """
+
+    def __init__(self, client, idle_ttl: float = None, max_messages: int = None, key_prefix: str = "chat"):
+        """
+        Args:
+            client: Redis-compatible client returning str values
+            idle_ttl: Seconds without access after which a session expires.
+                      Defaults to settings.CHAT_SESSION_IDLE_TTL_SECONDS.
+            max_messages: Messages kept per session. Defaults to settings.CHAT_SESSION_MAX_MESSAGES.
+            key_prefix: Namespace for every key this store writes
+        """
+        self.client = client
+        self.idle_ttl = int(idle_ttl or settings.CHAT_SESSION_IDLE_TTL_SECONDS)
+        self.max_messages = max_messages or settings.CHAT_SESSION_MAX_MESSAGES
+        self.key_prefix = key_prefix
+
+    def _session_key(self, agent_id: int, session_id: str) -> str:
+        return f"{self.key_prefix}:session:{agent_id}:{session_id}"
+
+    def _index_key(self, agent_id: int) -> str:
+        return f"{self.key_prefix}:agent:{agent_id}"
+
+    def _touch(self, agent_id: int, session_id: str, payload: str):
+        self.client.set(self._session_key(agent_id, session_id), payload, ex=self.idle_ttl)
+        self.client.zadd(self._index_key(agent_id), {session_id: time.time()})
+
+    def get(self, agent_id: int, session_id: str) -> Messages:
+        payload = self.client.get(self._session_key(agent_id, session_id))
+        if payload is None:
+            return []
+        # Reading counts as activity, so refresh the idle expiry
+        self._touch(agent_id, session_id, payload)
+        return json.loads(payload)
+
+    def save(self, agent_id: int, session_id: str, messages: Messages):
+        self._touch(agent_id, session_id, json.dumps(recent_messages(messages, self.max_messages)))
+
+    def delete(self, agent_id: int, session_id: str) -> bool:
+        self.client.zrem(self._index_key(agent_id), session_id)
+        return bool(self.client.delete(self._session_key(agent_id, session_id)))
+
+    def list_sessions(self, agent_id: int) -> List[dict]:
+        index_key = self._index_key(agent_id)
+        self.client.zremrangebyscore(index_key, "-inf", time.time() - self.idle_ttl)
+        sessions = []
+        for session_id in self.client.zrangebyscore(index_key, "-inf", "+inf"):
+            payload = self.client.get(self._session_key(agent_id, session_id))
+            if payload is None:
+                self.client.zrem(index_key, session_id)  # Expired or evicted by Redis
+                continue
+            sessions.append({"session_id": session_id, "message_count": len(json.loads(payload))})
+        return sorted(sessions, key=lambda s: s["session_id"])
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "idle_ttl": self.idle_ttl}
+
+
+def create_session_store(url: Optional[str] = None) -> SessionStore:
+    """
+    Build the session store configured by `url` (defaults to settings.CHAT_SESSION_STORE_URL).
+    An empty URL or "memory://" gives the in-process store; "redis://" / "rediss://" URLs
+    need the optional `redis` package.
+    """
+    url = settings.CHAT_SESSION_STORE_URL if url is None else url
+    if not url or url.startswith("memory://"):
+        return InMemorySessionStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CHAT_SESSION_STORE_URL points at Redis but the 'redis' package is not installed.") from e
+        print(f"🗄️  Using Redis chat session store at {url.split('@')[-1]}")
+        return RedisSessionStore(redis.Redis.from_url(url, decode_responses=True))
+    raise ValueError(f"Unsupported CHAT_SESSION_STORE_URL: {url}")
+
+
+session_store = create_session_store()
@@ -0,0 +1,191 @@
+# backend/src/services/speculative_llm.py
+"""
+Speculative LLM generation on interim transcripts.
+
+A turn is normally serial: the caller stops talking, recognition finishes, and only
+then does the LLM start. With streaming recognition the words are known well before
+the endpoint, so SpeculativeResponder starts generating the reply as soon as the
+interim transcript has held still for LLM_SPECULATION_DEBOUNCE_MS:
+
+  - update(text, ...)  on every interim result. If the text changed materially
+                       (anything beyond case, punctuation or fillers like "um"), the
+                       running speculation is cancelled and a new one scheduled.
+  - commit(text, ...)  at the endpoint. If the final transcript matches the
+                       speculation (and the history has not moved on), its reply is
+                       used, often already finished; otherwise it is discarded and
+                       the reply is generated as usual.
+
+SpeculationStats counts both sides of the trade: hits and the LLM time they had
+already done when the endpoint arrived (latency saved), against discarded
+speculations and the LLM time they burned (work wasted). Because that waste is paid
+for, speculation is off unless LLM_SPECULATION_ENABLED is set.
+
+Media-stream calls keep one responder per session. The <Gather> webhook path keeps
+them in `speculative_responses`, keyed by CallSid, fed by Twilio's
+partialResultCallback. That registry is per process: a final result landing on
+another worker simply misses.
+"""
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.cache import TTLCache
+from .response_cache import normalize_text
+
+Generate = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+# Words whose appearance or disappearance in an interim result changes nothing
+FILLER_WORDS = {"um", "uh", "er", "ah", "hmm", "mm", "erm"}
+
+
+def speculation_text_key(text: str) -> str:
+    """Normalized transcript: two transcripts with equal keys get the same reply."""
+    return " ".join(word for word in normalize_text(text).split() if word not in FILLER_WORDS)
+
+
+class SpeculationStats:
+    """Process-wide hit/waste counters for speculative generation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0  # LLM calls started speculatively
+        self.hits = 0  # Endpoints answered by a speculation
+        self.misses = 0  # Endpoints that had to generate from scratch
+        self.discarded = 0  # Speculations cancelled or not matching the final transcript
+        self.saved_ms = 0.0  # LLM time already done when hits were committed
+        self.wasted_ms = 0.0  # LLM time spent on discarded speculations
+
+    def record(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = self.hits + self.misses
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "hit_rate": round(self.hits / endpoints, 4) if endpoints else 0.0,
+                "waste_rate": round(self.discarded / self.started, 4) if self.started else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+                "wasted_ms": round(self.wasted_ms, 1),
+            }
+
+
+speculation_stats = SpeculationStats()
+
+
+class _Speculation:
+    def __init__(self, key: Tuple):
+        self.key = key
+        self.task: Optional[asyncio.Task] = None
+        self.llm_started: Optional[float] = None
+        self.llm_finished: Optional[float] = None
+
+    def llm_ms(self, until: float) -> float:
+        if self.llm_started is None:
+            return 0.0
+        return (min(self.llm_finished or until, until) - self.llm_started) * 1000
+
+
+class SpeculativeResponder:
+    """Speculative reply generation for one call. Must be used from the event loop."""
+
+    def __init__(self, debounce_ms: int = None, stats: SpeculationStats = None):
+        """
+        Args:
+            debounce_ms: How long an interim transcript must stay unchanged before
+                         generation starts. Defaults to settings.LLM_SPECULATION_DEBOUNCE_MS
+            stats: Counters to update. Defaults to the process-wide speculation_stats
+        """
+        self.debounce = (settings.LLM_SPECULATION_DEBOUNCE_MS if debounce_ms is None else debounce_ms) / 1000
+        self.stats = stats or speculation_stats
+        self._current: Optional[_Speculation] = None
+
+    @staticmethod
+    def _key(text: str, history: List[Dict[str, str]]) -> Tuple:
+        # The reply also depends on the history; a turn added in between invalidates it
+        last = history[-1]["content"] if history else ""
+        return speculation_text_key(text), len(history), last
+
+    def speculating_on(self, text: str) -> bool:
+        """True if the current speculation is on an equivalent transcript."""
+        return self._current is not None and self._current.key[0] == speculation_text_key(text)
+
+    def update(self, text: str, history: List[Dict[str, str]], generate: Generate):
+        """Speculate on an interim transcript (no-op if it did not change materially)."""
+        key = self._key(text, history)
+        if not key[0] or (self._current is not None and self._current.key == key):
+            return
+        self._discard()
+        speculation = _Speculation(key)
+        # The history is copied: the caller keeps appending to its list
+        speculation.task = asyncio.create_task(self._run(speculation, text, list(history), generate))
+        self._current = speculation
+
+    async def _run(self, speculation: _Speculation, text: str, history: List[Dict[str, str]], generate: Generate) -> str:
+        if self.debounce:
+            await asyncio.sleep(self.debounce)
+        speculation.llm_started = time.monotonic()
+        self.stats.record(started=1)
+        try:
+            return await generate(text, history)
+        finally:
+            speculation.llm_finished = time.monotonic()
+
+    async def commit(self, text: str, history: List[Dict[str, str]], generate: Generate) -> str:
+        """Return the reply to the final transcript, reusing the speculation when it matches."""
+        speculation, self._current = self._current, None
+        if speculation is not None and speculation.key == self._key(text, history) and speculation.llm_started is not None:
+            committed = time.monotonic()
+            try:
+                reply = await speculation.task
+            except Exception as e:
+                print(f"⚠️ Speculative generation failed, generating again: {e}")
+                reply = None
+            if reply:
+                self.stats.record(hits=1, saved_ms=speculation.llm_ms(committed))
+                return reply
+            self.stats.record(discarded=1, wasted_ms=speculation.llm_ms(time.monotonic()))
+        elif speculation is not None:
+            self._discard(speculation)
+        self.stats.record(misses=1)
+        return await generate(text, history)
+
+    def cancel(self):
+        """Drop any running speculation (call hung up, or the session closed)."""
+        self._discard()
+
+    def _discard(self, speculation: _Speculation = None):
+        if speculation is None:
+            speculation, self._current = self._current, None
+        if speculation is None:
+            return
+        speculation.task.cancel()
+        if speculation.llm_started is not None:
+            self.stats.record(discarded=1, wasted_ms=speculation.llm_ms(time.monotonic()))
+
+
+class SpeculationRegistry:
+    """Per-call responders for the <Gather> webhook path, keyed by CallSid."""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 60):
+        # A responder whose call never reached its final result is cancelled on eviction
+        self._responders = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=lambda _, responder: responder.cancel())
+
+    def get(self, call_sid: str) -> SpeculativeResponder:
+        responder = self._responders.get(call_sid) or SpeculativeResponder()
+        # Re-set on every partial result so the TTL counts from the call's latest activity
+        self._responders.set(call_sid, responder)
+        return responder
+
+    def pop(self, call_sid: str) -> Optional[SpeculativeResponder]:
+        return self._responders.pop(call_sid)
+
+
+speculative_responses = SpeculationRegistry()
@@ -0,0 +1,273 @@
+# backend/src/services/streaming_stt.py
+"""
+Streaming speech-to-text sessions.
+
+A session accepts audio chunks as they arrive from the caller and produces
+TranscriptEvents while the caller is still speaking:
+  - "interim":  the provider's current guess for the words so far (may still change)
+  - "final":    a stretch of speech the provider will no longer revise
+  - "endpoint": the caller finished an utterance; text is the whole utterance
+
+Providers sit behind the StreamingSTTSession interface, so the media-stream call
+path works the same with Deepgram's live API, a buffered fallback for providers
+without streaming recognition (Gemini) and the fake provider used by
+scripts/check_streaming_stt.py. STTService.open_stream() picks one for its provider.
+
+    session = stt.open_stream(sample_rate=8000, encoding="mulaw")
+    await session.start()
+    await session.send_audio(chunk)          # as often as audio arrives
+    async for event in session.events():     # usually in a separate task
+        ...
+    await session.finish()                   # flush, then events() ends
+"""
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from ..core.config import settings
+from ..utils.audio_helpers import TELEPHONY_SAMPLE_RATE, pcm16_to_wav_bytes, ulaw_to_pcm16
+from ..utils.vad import SPEECH_END, StreamingVAD, VoiceActivityDetector
+
+INTERIM, FINAL, ENDPOINT = "interim", "final", "endpoint"
+
+
+class TranscriptEvent(NamedTuple):
+    type: str  # INTERIM, FINAL or ENDPOINT
+    text: str
+    # time.monotonic() when the session produced the event
+    at: float = 0.0
+
+
+class StreamingSTTSession(ABC):
+    """
+    Base class for streaming sessions. Subclasses implement _send(), _finish() and
+    _close() and report results with _emit().
+    """
+
+    def __init__(self):
+        self._events: "asyncio.Queue[Optional[TranscriptEvent]]" = asyncio.Queue()
+        self._finals = []
+        self._closed = False
+        self.audio_bytes = 0
+
+    async def start(self):
+        """Open the connection to the provider (no-op for in-process providers)."""
+
+    async def send_audio(self, chunk: bytes):
+        if self._closed or not chunk:
+            return
+        self.audio_bytes += len(chunk)
+        await self._send(chunk)
+
+    async def finish(self):
+        """Signal the end of the audio. Pending results are still delivered before events() ends."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._finish()
+        finally:
+            self._events.put_nowait(None)
+
+    async def aclose(self):
+        """Abort the session without waiting for pending results."""
+        self._closed = True
+        await self._close()
+        self._events.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[TranscriptEvent]:
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+
+    def _emit(self, event_type: str, text: str):
+        text = (text or "").strip()
+        if event_type == FINAL:
+            if not text:
+                return
+            self._finals.append(text)
+        elif event_type == ENDPOINT:
+            # An endpoint carries every final since the previous one
+            text = " ".join(self._finals) or text
+            self._finals = []
+            if not text:
+                return
+        self._events.put_nowait(TranscriptEvent(event_type, text, time.monotonic()))
+
+    @abstractmethod
+    async def _send(self, chunk: bytes):
+        """Deliver one chunk of caller audio to the provider."""
+
+    async def _finish(self):
+        pass
+
+    async def _close(self):
+        pass
+
+
+class DeepgramStreamingSession(StreamingSTTSession):
+    """Deepgram live transcription over its WebSocket API (interim results + endpointing)."""
+
+    URL = "wss://api.deepgram.com/v1/listen"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        encoding: str = "mulaw",
+        sample_rate: int = TELEPHONY_SAMPLE_RATE,
+        endpointing_ms: int = None,
+        utterance_end_ms: int = None,
+        connect: Callable = None,
+    ):
+        """
+        Args:
+            api_key: Deepgram API key
+            model: Deepgram model, e.g. nova-2
+            encoding: Audio encoding of the chunks ("mulaw" or "linear16")
+            sample_rate: Sample rate of the chunks in Hz
+            endpointing_ms: Silence after which Deepgram marks speech_final.
+                            Defaults to settings.STT_STREAM_ENDPOINTING_MS
+            utterance_end_ms: Word gap after which Deepgram sends UtteranceEnd (a backstop when
+                              noise keeps endpointing from firing). Defaults to settings.STT_STREAM_UTTERANCE_END_MS
+            connect: WebSocket connect function; defaults to websockets' asyncio client
+        """
+        super().__init__()
+        self.api_key = api_key
+        self.params = {
+            "model": model,
+            "encoding": encoding,
+            "sample_rate": sample_rate,
+            "channels": 1,
+            "punctuate": "true",
+            "smart_format": "true",
+            "interim_results": "true",
+            "endpointing": endpointing_ms or settings.STT_STREAM_ENDPOINTING_MS,
+            "utterance_end_ms": utterance_end_ms or settings.STT_STREAM_UTTERANCE_END_MS,
+        }
+        self._connect = connect
+        self._socket = None
+        self._receiver = None
+
+    async def start(self):
+        connect = self._connect
+        if connect is None:
+            from websockets.asyncio.client import connect
+        self._socket = await connect(
+            f"{self.URL}?{urlencode(self.params)}",
+            additional_headers={"Authorization": f"Token {self.api_key}"},
+        )
+        self._receiver = asyncio.create_task(self._receive())
+
+    async def _send(self, chunk: bytes):
+        await self._socket.send(chunk)
+
+    async def _finish(self):
+        # Deepgram flushes what it has, sends the last results and closes the socket
+        await self._socket.send(json.dumps({"type": "CloseStream"}))
+        await self._receiver
+
+    async def _close(self):
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self._socket is not None:
+            await self._socket.close()
+
+    async def _receive(self):
+        try:
+            async for message in self._socket:
+                if isinstance(message, str):
+                    self.handle_message(json.loads(message))
+        except Exception as e:
+            print(f"❌ Deepgram stream error: {e}")
+        finally:
+            # Whatever was final but never endpointed still belongs to the caller
+            self._emit(ENDPOINT, "")
+
+    def handle_message(self, message: dict):
+        """Turn one Deepgram message into transcript events."""
+        kind = message.get("type")
+        if kind == "Results":
+            alternatives = message.get("channel", {}).get("alternatives") or [{}]
+            text = alternatives[0].get("transcript", "")
+            if message.get("is_final"):
+                self._emit(FINAL, text)
+                if message.get("speech_final"):
+                    self._emit(ENDPOINT, "")
+            elif text:
+                self._emit(INTERIM, " ".join(self._finals + [text]))
+        elif kind == "UtteranceEnd":
+            self._emit(ENDPOINT, "")
+
+
+class BufferedStreamingSession(StreamingSTTSession):
+    """
+    Streaming interface for providers that only transcribe whole clips (Gemini).
+    Buffers the caller's audio in memory, finds the end of each utterance with the
+    voice activity detector (utils/vad.py) and transcribes just that utterance.
+    Produces no interim results.
+    """
+
+    def __init__(
+        self,
+        transcribe_buffer: Callable[[bytes, str], str],
+        encoding: str = "mulaw",
+        sample_rate: int = TELEPHONY_SAMPLE_RATE,
+        speech_threshold: int = None,
+        end_of_speech_ms: int = None,
+        min_speech_ms: int = 200,
+    ):
+        """
+        Args:
+            transcribe_buffer: Blocking function (wav_bytes, mimetype) -> text
+            encoding: Audio encoding of the chunks ("mulaw" or "linear16")
+            sample_rate: Sample rate of the chunks in Hz
+            speech_threshold: Minimum RMS level of speech.
+                              Defaults to settings.MEDIA_STREAM_SPEECH_RMS
+            end_of_speech_ms: Trailing silence that ends an utterance.
+                              Defaults to settings.MEDIA_STREAM_END_OF_SPEECH_MS
+            min_speech_ms: Utterances with less speech than this are ignored as noise
+        """
+        super().__init__()
+        self.transcribe_buffer = transcribe_buffer
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.vad = StreamingVAD(
+            VoiceActivityDetector(sample_rate=sample_rate, speech_rms=speech_threshold),
+            end_of_utterance_ms=end_of_speech_ms,
+            min_speech_ms=min_speech_ms,
+        )
+        self._pending = set()
+
+    async def _send(self, chunk: bytes):
+        pcm = ulaw_to_pcm16(chunk) if self.encoding == "mulaw" else chunk
+        for event in self.vad.process(pcm):
+            if event.type == SPEECH_END:
+                self._transcribe_later(event.audio)
+
+    def _transcribe_later(self, utterance: bytes):
+        task = asyncio.create_task(self._transcribe(utterance))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _transcribe(self, pcm: bytes):
+        wav = pcm16_to_wav_bytes(pcm, self.sample_rate)
+        text = await asyncio.to_thread(self.transcribe_buffer, wav, "audio/wav")
+        self._emit(FINAL, text)
+        self._emit(ENDPOINT, "")
+
+    async def _finish(self):
+        event = self.vad.flush()
+        if event is not None:
+            self._transcribe_later(event.audio)
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def _close(self):
+        for task in list(self._pending):
+            task.cancel()
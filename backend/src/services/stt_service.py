@@ -1,9 +1,19 @@
 """
 STT Service supporting both Gemini and Deepgram APIs for audio transcription.
+Whole clips are transcribed with transcribe()/transcribe_buffer(); live audio goes
+through a streaming session from open_stream() (see streaming_stt.py).
 """
+import mimetypes
+import os
 import google.generativeai as genai
 from deepgram import DeepgramClient
 from ..core.config import settings
+from ..utils.audio_helpers import TELEPHONY_SAMPLE_RATE
+from ..utils.vad import trim_wav_silence
+from .streaming_stt import BufferedStreamingSession, DeepgramStreamingSession, StreamingSTTSession
+
+# Gemini accepts inline audio up to ~20 MB per request; larger files are uploaded
+GEMINI_INLINE_AUDIO_LIMIT = 18 * 1024 * 1024
 
 
 class STTService:
@@ -66,8 +76,60 @@ class STTService:
             print(f"❌ Error during transcription: {e}")
             return ""
 
+    def transcribe_buffer(self, audio_data: bytes, mimetype: str = "audio/wav") -> str:
+        """
+        Transcribes in-memory audio using the configured STT provider.
+        
+        Args:
+            audio_data: Encoded audio bytes (e.g. a WAV file's contents)
+            mimetype: MIME type of audio_data
+            
+        Returns:
+            str: Transcribed text from the audio ("" without a provider call if it holds no speech)
+        """
+        try:
+            if settings.VAD_TRIM_SILENCE and mimetype in ("audio/wav", "audio/x-wav"):
+                # Silence costs upload time and provider processing but carries no words
+                audio_data = trim_wav_silence(audio_data)
+                if not audio_data:
+                    return ""
+            if self.provider == "gemini":
+                return self._transcribe_gemini_buffer(audio_data, mimetype)
+            elif self.provider == "deepgram":
+                return self._transcribe_deepgram_buffer(audio_data, mimetype)
+        except Exception as e:
+            print(f"❌ Error during transcription: {e}")
+            return ""
+
+    def open_stream(self, sample_rate: int = TELEPHONY_SAMPLE_RATE, encoding: str = "mulaw") -> StreamingSTTSession:
+        """
+        Open a streaming transcription session for live audio.
+        
+        Args:
+            sample_rate: Sample rate of the audio chunks in Hz
+            encoding: "mulaw" (Twilio Media Streams) or "linear16"
+            
+        Returns:
+            StreamingSTTSession: Deepgram's live API, or a buffered session that
+            transcribes each utterance with transcribe_buffer() for Gemini
+        """
+        if self.provider == "deepgram":
+            return DeepgramStreamingSession(
+                api_key=settings.DEEPGRAM_AUTH_TOKEN,
+                model=self.model,
+                encoding=encoding,
+                sample_rate=sample_rate,
+            )
+        return BufferedStreamingSession(self.transcribe_buffer, encoding=encoding, sample_rate=sample_rate)
+
     def _transcribe_gemini(self, audio_file_path: str) -> str:
         """Transcribe using Gemini API."""
+        # Small files go inline with the request, skipping the upload/delete round trips
+        if os.path.getsize(audio_file_path) <= GEMINI_INLINE_AUDIO_LIMIT:
+            with open(audio_file_path, "rb") as audio:
+                mimetype = mimetypes.guess_type(audio_file_path)[0] or "audio/wav"
+                return self._transcribe_gemini_buffer(audio.read(), mimetype)
+
         try:
             # Upload the audio file
             print(f"Uploading audio file to Gemini: {audio_file_path}")
@@ -91,15 +153,30 @@ class STTService:
             print(f"❌ Error during Gemini transcription: {e}")
             return ""
 
+    def _transcribe_gemini_buffer(self, audio_data: bytes, mimetype: str) -> str:
+        """Transcribe in-memory audio with Gemini, sent inline instead of uploaded."""
+        try:
+            prompt = "Please transcribe the speech in this audio file accurately. Only return the transcribed text without any additional comments or formatting."
+            response = self.model.generate_content([prompt, {"mime_type": mimetype, "data": audio_data}])
+            transcribed_text = response.text.strip()
+            print(f"✅ Gemini transcription completed: {transcribed_text[:50]}...")
+            return transcribed_text
+        except Exception as e:
+            print(f"❌ Error during Gemini transcription: {e}")
+            return ""
+
     def _transcribe_deepgram(self, audio_file_path: str) -> str:
         """Transcribe using Deepgram API."""
-        try:
-            print(f"Transcribing audio file with Deepgram: {audio_file_path}")
-            
-            # Read the audio file
-            with open(audio_file_path, "rb") as audio:
-                buffer_data = audio.read()
+        print(f"Transcribing audio file with Deepgram: {audio_file_path}")
+        
+        # Read the audio file
+        with open(audio_file_path, "rb") as audio:
+            buffer_data = audio.read()
+        return self._transcribe_deepgram_buffer(buffer_data)
 
+    def _transcribe_deepgram_buffer(self, buffer_data: bytes, mimetype: str = None) -> str:
+        """Transcribe in-memory audio using Deepgram API."""
+        try:
             # Configure Deepgram options
             options = {
                 "model": self.model,
@@ -110,8 +187,11 @@ class STTService:
             }
 
             # Call the transcribe method with the audio buffer and options
+            source = {"buffer": buffer_data}
+            if mimetype:
+                source["mimetype"] = mimetype
             response = self.client.listen.prerecorded.v("1").transcribe_file(
-                {"buffer": buffer_data},
+                source,
                 options
             )
 
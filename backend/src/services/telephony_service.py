@@ -48,6 +48,10 @@ class TwilioService:
                 from_=settings.TWILIO_PHONE_NUMBER,
                 # This is the URL Twilio will call back to our webhook when the user answers.
                 url=f"{public_url}/api/v1/calls/webhook?agent_id={agent_id}",
+                # Call progress goes to a separate endpoint that looks the call up by its SID
+                status_callback=f"{public_url}/api/v1/calls/status",
+                status_callback_event=["initiated", "ringing", "answered", "completed"],
+                status_callback_method="POST",
                 # Send digits to skip trial message (press any key to continue)
                 send_digits="w"
             )
@@ -0,0 +1,241 @@
+# backend/src/services/tts_cache.py
+"""
+Content-addressed cache of synthesized speech on disk.
+
+Stock phrases ("Perfect, you're booked", "I'll have someone call you back") are
+spoken thousands of times a day. Each synthesis result is stored under a key
+derived from everything that determines the audio, i.e.
+sha256(voice_id, model_id, voice settings, output format, text), so the same
+request is paid for once and later served from disk:
+    AUDIO_DIR/tts_cache/<first 2 hex chars>/<key>.<ext>
+
+Files are written to a temporary name and renamed into place, so readers (and the
+/audio static mount) never see a partial file. Each hit touches the file's mtime; a
+background sweeper deletes the least recently used files once the directory grows
+past TTS_CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Iterable, Iterator, Optional
+
+from ..core.config import settings
+
+CACHE_SUBDIR = "tts_cache"
+# Temporary files older than this are leftovers of crashed writes
+STALE_TMP_SECONDS = 3600
+
+
+def tts_cache_key(voice_id: str, model_id: str, voice_settings: dict, text: str, output_format: str = "mp3") -> str:
+    """Key identifying one synthesis request. Equal keys always produce equal audio."""
+    payload = json.dumps(
+        [voice_id, model_id, voice_settings, output_format, text],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """Size-bounded, content-addressed audio file cache shared by every TTSService."""
+
+    def __init__(self, directory: str = None, max_bytes: int = None, sweep_interval: float = None):
+        """
+        Args:
+            directory: Cache root. Defaults to AUDIO_DIR/tts_cache (served at /audio/tts_cache)
+            max_bytes: Total size kept on disk. Defaults to settings.TTS_CACHE_MAX_BYTES
+            sweep_interval: Seconds between eviction sweeps. Defaults to settings.TTS_CACHE_SWEEP_INTERVAL
+        """
+        self.directory = directory or os.path.join(settings.AUDIO_DIR, CACHE_SUBDIR)
+        self.max_bytes = max_bytes or settings.TTS_CACHE_MAX_BYTES
+        self.sweep_interval = sweep_interval or settings.TTS_CACHE_SWEEP_INTERVAL
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._sweeper = None
+        self._stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.bytes_written = 0
+
+    def path_for(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{ext}")
+
+    # --- Lookup / store -----------------------------------------------------
+
+    def get(self, key: str, ext: str) -> Optional[str]:
+        """Return the cached file's path, or None on a miss."""
+        path = self.path_for(key, ext)
+        try:
+            # Touching the file marks it as recently used for the sweeper
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put(self, key: str, ext: str, chunks: Iterable[bytes]) -> str:
+        """Write audio chunks atomically under the key. Returns the final path."""
+        path = self.path_for(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += size
+        self.start()
+        return path
+
+    def tee(self, key: str, ext: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Yield audio chunks to a streaming consumer while writing them to the cache. The
+        file is only published if the stream runs to the end; an abandoned or failed
+        stream leaves nothing behind.
+        """
+        path = self.path_for(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        size = 0
+        completed = False
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            os.replace(tmp_path, path)
+            completed = True
+        finally:
+            if not completed:
+                self._remove(tmp_path)
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += size
+        self.start()
+
+    def get_or_create(self, key: str, ext: str, synthesize: Callable[[], Iterable[bytes]]) -> str:
+        """
+        Return the cached file for `key`, calling `synthesize()` for its audio chunks on a
+        miss. Concurrent requests for the same key synthesize it only once; if that
+        fails, the waiting requests retry one at a time.
+        """
+        path = self.get(key, ext)
+        if path is not None:
+            return path
+
+        with self._lock:
+            # [lock, holders]: the lock is shared until the last thread waiting on it is done
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                # Another thread may have written it while we waited for the key lock
+                path = self.path_for(key, ext)
+                if os.path.exists(path):
+                    return path
+                return self.put(key, ext, synthesize())
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._key_locks.pop(key, None)
+
+    # --- Eviction -----------------------------------------------------------
+
+    def sweep(self) -> int:
+        """
+        Delete least recently used files until the cache fits in max_bytes, plus any
+        abandoned temporary files. Returns how many files were removed.
+        """
+        now = time.time()
+        files, total, removed = [], 0, 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if name.endswith(".tmp"):
+                    if now - stat.st_mtime > STALE_TMP_SECONDS:
+                        removed += self._remove(path)
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+                    with self._lock:
+                        self.evictions += 1
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def start(self):
+        """Start the background sweeper (idempotent; called on the first write)."""
+        if self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="tts-cache-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ TTS cache sweep failed: {e}")
+
+    def close(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "bytes_written": self.bytes_written,
+                "evictions": self.evictions,
+            }
+
+
+tts_cache = TTSAudioCache()
@@ -1,9 +1,31 @@
 """
 TTS Service using ElevenLabs API for high-quality voice synthesis.
+Results are stored in a content-addressed disk cache (see tts_cache.py), so each
+distinct phrase is synthesized once per voice and model.
 """
+import asyncio
+import os
+import shutil
+import uuid
+from typing import AsyncIterator, Iterator, Optional
 from elevenlabs import VoiceSettings
 from elevenlabs.client import ElevenLabs
 from ..core.config import settings
+from .tts_cache import TTSAudioCache, tts_cache, tts_cache_key
+from ..utils.audio_helpers import pcm16_stream_to_ulaw
+
+# Bytes read per chunk when a cached file is streamed back
+FILE_CHUNK_BYTES = 8192
+# PCM rate requested from ElevenLabs when the stream is converted to u-law here
+ULAW_SOURCE_FORMAT, ULAW_SOURCE_RATE = "pcm_16000", 16000
+
+# Voice settings used for every request; part of the cache key
+DEFAULT_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75,
+    "style": 0.0,
+    "use_speaker_boost": True,
+}
 
 
 class TTSService:
@@ -12,26 +34,72 @@ class TTSService:
     Provides high-quality, natural-sounding voice synthesis.
     """
 
-    def __init__(self, voice_id: str = None):
+    def __init__(self, voice_id: str = None, client=None, cache: Optional[TTSAudioCache] = None):
         """
         Initialize TTS service with specified voice.
         
         Args:
             voice_id: ElevenLabs voice ID. Defaults to settings.ELEVENLABS_VOICE_ID
+            client: ElevenLabs client. Defaults to one built from settings.ELEVENLABS_API_KEY
+            cache: Audio cache. Defaults to the shared one, or none if TTS_CACHE_ENABLED is off
         """
         try:
             print(f"Initializing ElevenLabs TTS service...")
             
             # Initialize ElevenLabs client with API key
-            self.client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+            self.client = client or ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
             self.voice_id = voice_id or settings.ELEVENLABS_VOICE_ID
             self.model_id = settings.ELEVENLABS_MODEL_ID
+            self.voice_settings = dict(DEFAULT_VOICE_SETTINGS)
+            if cache is None and settings.TTS_CACHE_ENABLED:
+                cache = tts_cache
+            self.cache = cache
 
             print(f"✅ TTS service initialized successfully with voice ID: {self.voice_id}")
         except Exception as e:
             print(f"❌ Error initializing ElevenLabs TTS: {e}")
             raise
 
+    def _convert(self, text: str, output_format: str = None):
+        """Start an ElevenLabs synthesis and return its chunk iterator."""
+        options = {"output_format": output_format} if output_format else {}
+        return self.client.text_to_speech.convert(
+            voice_id=self.voice_id,
+            model_id=self.model_id,
+            text=text,
+            voice_settings=VoiceSettings(**self.voice_settings),
+            **options
+        )
+
+    def _cache_key(self, text: str, output_format: str) -> str:
+        return tts_cache_key(self.voice_id, self.model_id, self.voice_settings, text, output_format)
+
+    def synthesize_file(self, text: str) -> str:
+        """
+        Synthesizes text to an MP3 file and returns its path. With the cache enabled this
+        is the shared content-addressed file (under AUDIO_DIR), so callers must not modify it.
+        
+        Args:
+            text: The text to convert to speech
+            
+        Returns:
+            str: Path of the audio file
+        """
+        try:
+            if self.cache is not None:
+                return self.cache.get_or_create(
+                    self._cache_key(text, "mp3"), "mp3", lambda: self._convert(text)
+                )
+            output_path = os.path.join(settings.AUDIO_DIR, f"tts_{uuid.uuid4().hex}.mp3")
+            with open(output_path, 'wb') as audio_file:
+                for chunk in self._convert(text):
+                    audio_file.write(chunk)
+            print(f"✅ Synthesized audio with ElevenLabs and saved to {output_path}")
+            return output_path
+        except Exception as e:
+            print(f"❌ Error during ElevenLabs TTS synthesis: {e}")
+            raise
+
     def synthesize(self, text: str, output_path: str):
         """
         Synthesizes text and saves it to an audio file using ElevenLabs API.
@@ -40,27 +108,114 @@ class TTSService:
             text: The text to convert to speech
             output_path: Path where the audio file will be saved
         """
+        if self.cache is None:
+            try:
+                with open(output_path, 'wb') as audio_file:
+                    for chunk in self._convert(text):
+                        audio_file.write(chunk)
+                print(f"✅ Synthesized audio with ElevenLabs and saved to {output_path}")
+                return
+            except Exception as e:
+                print(f"❌ Error during ElevenLabs TTS synthesis: {e}")
+                raise
+
+        shutil.copyfile(self.synthesize_file(text), output_path)
+
+    def synthesize_ulaw(self, text: str) -> bytes:
+        """
+        Synthesizes text straight to 8 kHz G.711 u-law, the format Twilio Media
+        Streams expect, without touching the filesystem.
+        
+        Args:
+            text: The text to convert to speech
+            
+        Returns:
+            bytes: Raw u-law audio
+        """
         try:
-            # Generate audio using ElevenLabs API
-            audio_generator = self.client.text_to_speech.convert(
+            if self.cache is None:
+                return b"".join(self._convert(text, output_format="ulaw_8000"))
+            path = self.cache.get_or_create(
+                self._cache_key(text, "ulaw_8000"), "ulaw", lambda: self._convert(text, output_format="ulaw_8000")
+            )
+            with open(path, "rb") as f:
+                return f.read()
+        except Exception as e:
+            print(f"❌ Error during ElevenLabs u-law synthesis: {e}")
+            raise
+
+    def stream(self, text: str, ulaw: bool = False) -> Iterator[bytes]:
+        """
+        Synthesizes text and yields the audio in chunks as ElevenLabs produces them, so
+        playback can start after the first chunk instead of after the whole phrase.
+        
+        Args:
+            text: The text to convert to speech
+            ulaw: Convert the audio to 8 kHz G.711 u-law on the fly (for telephony)
+                  instead of returning MP3
+            
+        Yields:
+            bytes: Successive MP3 (or raw u-law) chunks
+        """
+        if ulaw:
+            # ElevenLabs streams 16 kHz PCM, converted here chunk by chunk
+            output_format, ext = f"{ULAW_SOURCE_FORMAT}>ulaw_8000", "ulaw"
+            produce = lambda: pcm16_stream_to_ulaw(self._stream(text, ULAW_SOURCE_FORMAT), ULAW_SOURCE_RATE)
+        else:
+            output_format, ext = "mp3", "mp3"
+            produce = lambda: self._stream(text)
+
+        if self.cache is None:
+            yield from produce()
+            return
+
+        key = self._cache_key(text, output_format)
+        path = self.cache.get(key, ext)
+        if path is not None:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(FILE_CHUNK_BYTES)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        # Stream to the caller and fill the cache at the same time
+        yield from self.cache.tee(key, ext, produce())
+
+    async def astream(self, text: str, ulaw: bool = False) -> AsyncIterator[bytes]:
+        """
+        Async version of stream(). Each chunk is pulled in a worker thread, so the event
+        loop is never blocked on ElevenLabs or the disk cache.
+        """
+        iterator = self.stream(text, ulaw=ulaw)
+        done = object()
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, iterator, done)
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            # Closing the generator aborts the write to the cache if we stopped early.
+            # If we were cancelled mid-chunk the worker still owns it; GC closes it then.
+            try:
+                await asyncio.to_thread(iterator.close)
+            except ValueError:
+                pass
+
+    def _stream(self, text: str, output_format: str = None) -> Iterator[bytes]:
+        """Start an ElevenLabs streaming synthesis and return its chunk iterator."""
+        options = {"output_format": output_format} if output_format else {}
+        try:
+            for chunk in self.client.text_to_speech.stream(
                 voice_id=self.voice_id,
                 model_id=self.model_id,
                 text=text,
-                voice_settings=VoiceSettings(
-                    stability=0.5,
-                    similarity_boost=0.75,
-                    style=0.0,
-                    use_speaker_boost=True
-                )
-            )
-            
-            # Save the audio to file
-            with open(output_path, 'wb') as audio_file:
-                for chunk in audio_generator:
-                    audio_file.write(chunk)
-            
-            print(f"✅ Synthesized audio with ElevenLabs and saved to {output_path}")
-            
+                voice_settings=VoiceSettings(**self.voice_settings),
+                **options
+            ):
+                if chunk:
+                    yield chunk
         except Exception as e:
-            print(f"❌ Error during ElevenLabs TTS synthesis: {e}")
+            print(f"❌ Error during ElevenLabs streaming synthesis: {e}")
             raise
@@ -0,0 +1,202 @@
+# backend/src/utils/audio_codec.py
+"""
+Vectorized, in-process audio codecs for telephony.
+
+G.711 u-law and A-law are implemented with precomputed lookup tables (one 256-entry
+table per decoder, one 65536-entry table per encoder), so encoding or decoding a
+buffer is a single NumPy indexing operation. Resampling between the common
+telephony/TTS rates (8k, 16k, 22.05k, 24k) uses a windowed-sinc low-pass filter
+plus linear interpolation, and StreamResampler carries filter and phase state across
+chunks so streamed audio can be converted piece by piece without clicks.
+
+All functions accept either raw little-endian 16-bit PCM bytes or NumPy arrays.
+"""
+from typing import Union
+
+import numpy as np
+
+AudioInput = Union[bytes, bytearray, memoryview, np.ndarray]
+
+SUPPORTED_RATES = (8000, 16000, 22050, 24000)
+
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 32635
+
+
+def _as_int16(samples: AudioInput) -> np.ndarray:
+    if isinstance(samples, np.ndarray):
+        return samples.astype(np.int16, copy=False)
+    return np.frombuffer(samples, dtype="<i2")
+
+
+def _as_uint8(data: AudioInput) -> np.ndarray:
+    if isinstance(data, np.ndarray):
+        return data.astype(np.uint8, copy=False)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+# --- Lookup tables -------------------------------------------------------
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = u & 0x80
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + _ULAW_BIAS) << exponent) - _ULAW_BIAS
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 2  # 14-bit
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    value = np.minimum(np.abs(pcm), _ULAW_CLIP >> 2) + (_ULAW_BIAS >> 2)
+    segment_ends = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+    seg = np.searchsorted(segment_ends, value)
+    table = ((seg << 4) | ((value >> (seg + 1)) & 0x0F)) ^ mask
+    # Reorder so the table can be indexed by the int16 value reinterpreted as uint16
+    return np.roll(table.astype(np.uint8), -32768)
+
+
+def _build_alaw_decode_table() -> np.ndarray:
+    a = np.arange(256, dtype=np.int32) ^ 0x55
+    t = (a & 0x0F) << 4
+    seg = (a & 0x70) >> 4
+    t = np.where(seg == 0, t + 8, t + 0x108)
+    t = np.where(seg > 1, t << np.maximum(seg - 1, 0), t)
+    return np.where(a & 0x80, t, -t).astype(np.int16)
+
+
+def _build_alaw_encode_table() -> np.ndarray:
+    pcm = np.arange(-32768, 32768, dtype=np.int32) >> 3  # 13-bit
+    mask = np.where(pcm >= 0, 0xD5, 0x55)
+    value = np.where(pcm >= 0, pcm, -pcm - 1)
+    segment_ends = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+    seg = np.searchsorted(segment_ends, value)
+    shift = np.where(seg < 2, 1, seg)
+    aval = (np.minimum(seg, 7) << 4) | ((value >> shift) & 0x0F)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    table = (aval ^ mask) & 0xFF
+    return np.roll(table.astype(np.uint8), -32768)
+
+
+ULAW_DECODE_TABLE = _build_ulaw_decode_table()
+ULAW_ENCODE_TABLE = _build_ulaw_encode_table()
+ALAW_DECODE_TABLE = _build_alaw_decode_table()
+ALAW_ENCODE_TABLE = _build_alaw_encode_table()
+
+
+# --- G.711 ---------------------------------------------------------------
+
+def ulaw_decode(data: AudioInput) -> np.ndarray:
+    """Decode G.711 u-law bytes into int16 samples."""
+    return ULAW_DECODE_TABLE[_as_uint8(data)]
+
+
+def ulaw_encode(samples: AudioInput) -> bytes:
+    """Encode int16 samples (or 16-bit PCM bytes) as G.711 u-law bytes."""
+    return ULAW_ENCODE_TABLE[_as_int16(samples).view(np.uint16)].tobytes()
+
+
+def alaw_decode(data: AudioInput) -> np.ndarray:
+    """Decode G.711 A-law bytes into int16 samples."""
+    return ALAW_DECODE_TABLE[_as_uint8(data)]
+
+
+def alaw_encode(samples: AudioInput) -> bytes:
+    """Encode int16 samples (or 16-bit PCM bytes) as G.711 A-law bytes."""
+    return ALAW_ENCODE_TABLE[_as_int16(samples).view(np.uint16)].tobytes()
+
+
+# --- Resampling ----------------------------------------------------------
+
+def _lowpass_kernel(from_rate: int, to_rate: int, taps: int) -> np.ndarray:
+    """Hamming-windowed sinc low-pass just below the target Nyquist frequency."""
+    cutoff = 0.5 * to_rate / from_rate * 0.9  # Fraction of the input sample rate
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+class StreamResampler:
+    """
+    Stateful mono resampler for streamed audio. Feed consecutive chunks to process();
+    filter history and interpolation phase carry over between calls.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int, taps: int = 31):
+        """
+        Args:
+            from_rate: Input sample rate in Hz
+            to_rate: Output sample rate in Hz
+            taps: Length of the anti-aliasing filter used when downsampling
+        """
+        if from_rate <= 0 or to_rate <= 0:
+            raise ValueError("Sample rates must be positive.")
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self._step = from_rate / to_rate
+        self._kernel = _lowpass_kernel(from_rate, to_rate, taps) if to_rate < from_rate else None
+        self._history = np.zeros(taps - 1, dtype=np.float32) if self._kernel is not None else None
+        self._previous = None  # Last (filtered) input sample of the previous chunk
+        # Position of the next output sample, in input samples. Starting at the filter's
+        # group delay cancels the latency the low-pass would otherwise add.
+        self._position = (taps - 1) / 2 if self._kernel is not None else 0.0
+
+    def process(self, samples: AudioInput) -> np.ndarray:
+        """Resample one chunk and return the int16 output samples it produced."""
+        x = _as_int16(samples).astype(np.float32)
+        if self.from_rate == self.to_rate:
+            return x.astype(np.int16)
+        if x.size == 0:
+            return np.zeros(0, dtype=np.int16)
+
+        if self._kernel is not None:
+            padded = np.concatenate([self._history, x])
+            self._history = padded[-self._history.size:]
+            x = np.convolve(padded, self._kernel, mode="valid").astype(np.float32)
+
+        if self._previous is not None:
+            x = np.concatenate([[self._previous], x])
+
+        last = x.size - 1
+        if last < self._position:
+            count = 0
+        else:
+            count = int(np.floor((last - self._position) / self._step)) + 1
+        positions = self._position + self._step * np.arange(count)
+        out = np.interp(positions, np.arange(x.size), x)
+
+        # The next chunk will be prefixed with x[last], so rebase the phase onto it
+        self._position = self._position + self._step * count - last
+        self._previous = x[last]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+def resample(samples: AudioInput, from_rate: int, to_rate: int) -> np.ndarray:
+    """Resample a complete mono int16 buffer (or 16-bit PCM bytes) in one shot."""
+    x = _as_int16(samples)
+    if from_rate == to_rate:
+        return x.copy()
+    taps = 31
+    if to_rate < from_rate:
+        # Flush the filter's group delay so the tail of the input is not lost
+        x = np.concatenate([x, np.zeros((taps - 1) // 2, dtype=np.int16)])
+    return StreamResampler(from_rate, to_rate, taps).process(x)
+
+
+# --- Conveniences --------------------------------------------------------
+
+def rms(samples: AudioInput) -> float:
+    """Root-mean-square level of int16 samples (0-32767)."""
+    x = _as_int16(samples)
+    if x.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(np.square(x, dtype=np.float64))))
+
+
+def to_mono(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Average interleaved multi-channel int16 samples down to mono."""
+    if channels == 1:
+        return samples
+    frames = samples[: samples.size - samples.size % channels].reshape(-1, channels)
+    return frames.mean(axis=1).astype(np.int16)
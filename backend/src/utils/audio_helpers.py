@@ -1,14 +1,46 @@
 # backend/src/utils/audio_helpers.py
-# This file is a placeholder for audio conversion utilities.
-# For example, you might need to convert between WAV, MP3, and telephony-specific
-# formats like G.711 (ulaw/alaw).
+# Audio conversion utilities for moving between WAV, MP3, raw PCM and
+# telephony-specific formats like G.711 (ulaw/alaw).
 
+import io
 import subprocess
+import wave
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from . import audio_codec
+
+# Twilio Media Streams carry 8 kHz mono G.711 u-law
+TELEPHONY_SAMPLE_RATE = 8000
 
 def convert_to_ulaw(input_wav_path: str, output_ulaw_path: str):
     """
-    Converts a standard WAV file to a G.711 u-law formatted file
-    using FFmpeg. This is a common format for VoIP.
+    Converts a standard 16-bit PCM WAV file to a G.711 u-law formatted file
+    (8000 Hz, mono). This is a common format for VoIP.
+
+    The conversion runs in-process with NumPy; files the wave module cannot
+    read (compressed WAVs, other containers) fall back to FFmpeg.
+    """
+    try:
+        with wave.open(input_wav_path, 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                raise wave.Error(f"unsupported sample width {wf.getsampwidth()}")
+            channels, sample_rate = wf.getnchannels(), wf.getframerate()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    except (wave.Error, EOFError):
+        convert_to_ulaw_ffmpeg(input_wav_path, output_ulaw_path)
+        return
+
+    samples = audio_codec.resample(audio_codec.to_mono(pcm, channels), sample_rate, TELEPHONY_SAMPLE_RATE)
+    with open(output_ulaw_path, 'wb') as f:
+        f.write(audio_codec.ulaw_encode(samples))
+    print(f"Successfully converted {input_wav_path} to {output_ulaw_path}")
+
+
+def convert_to_ulaw_ffmpeg(input_wav_path: str, output_ulaw_path: str):
+    """
+    Converts any audio file FFmpeg understands to a G.711 u-law formatted file.
 
     Requires ffmpeg to be installed on the system.
     """
@@ -27,4 +59,63 @@ def convert_to_ulaw(input_wav_path: str, output_ulaw_path: str):
         print(f"Successfully converted {input_wav_path} to {output_ulaw_path}")
     except subprocess.CalledProcessError as e:
         print(f"Error converting audio file: {e.stderr}")
-        raise
\ No newline at end of file
+        raise
+
+
+def ulaw_to_pcm16(ulaw_bytes: bytes) -> bytes:
+    """Decodes G.711 u-law bytes into 16-bit little-endian PCM."""
+    return audio_codec.ulaw_decode(ulaw_bytes).astype("<i2").tobytes()
+
+
+def pcm16_to_ulaw(pcm_bytes: bytes) -> bytes:
+    """Encodes 16-bit little-endian PCM into G.711 u-law bytes."""
+    return audio_codec.ulaw_encode(pcm_bytes)
+
+
+def resample_pcm16(pcm_bytes: bytes, from_rate: int, to_rate: int, state=None):
+    """
+    Resamples mono 16-bit PCM. Pass the returned state back in to resample a stream
+    chunk by chunk without clicks at chunk boundaries.
+
+    Returns:
+        tuple: (resampled_bytes, state)
+    """
+    if from_rate == to_rate:
+        return pcm_bytes, state
+    if state is None:
+        state = audio_codec.StreamResampler(from_rate, to_rate)
+    return state.process(pcm_bytes).astype("<i2").tobytes(), state
+
+
+def pcm16_stream_to_ulaw(chunks: Iterable[bytes], from_rate: int) -> Iterator[bytes]:
+    """
+    Converts a stream of mono 16-bit PCM chunks at `from_rate` into 8 kHz u-law chunks
+    as they arrive. Chunks may split samples; the odd byte is carried to the next chunk.
+    """
+    state = None
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        usable = len(data) - len(data) % 2
+        carry = data[usable:]
+        if not usable:
+            continue
+        pcm, state = resample_pcm16(data[:usable], from_rate, TELEPHONY_SAMPLE_RATE, state)
+        if pcm:
+            yield pcm16_to_ulaw(pcm)
+
+
+def pcm16_rms(pcm_bytes: bytes) -> int:
+    """Root-mean-square level of a 16-bit PCM chunk (0-32767)."""
+    return int(audio_codec.rms(pcm_bytes))
+
+
+def pcm16_to_wav_bytes(pcm_bytes: bytes, sample_rate: int = TELEPHONY_SAMPLE_RATE) -> bytes:
+    """Wraps raw mono 16-bit PCM in an in-memory WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm_bytes)
+    return buffer.getvalue()
\ No newline at end of file
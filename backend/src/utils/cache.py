@@ -0,0 +1,129 @@
+# backend/src/utils/cache.py
+"""
+A small thread-safe LRU cache with per-entry time-to-live.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire `ttl` seconds after insertion.
+
+    Safe to share between threads. get_or_create() builds a missing value at most once
+    per key even when several threads ask for it at the same time.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None, on_evict: Callable[[Hashable, Any], None] = None):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used one is evicted.
+            ttl: Seconds an entry stays valid. None means entries never expire.
+            on_evict: Optional callback(key, value) run when an entry is evicted or expires.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    def _evict(self, key):
+        value, _ = self._data.pop(key)
+        if self.on_evict:
+            self.on_evict(key, value)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[1]):
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._data.pop(key)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                self._evict(next(iter(self._data)))
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]):
+        """Return the cached value for `key`, building it with `factory()` on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+
+        with self._lock:
+            # [lock, holders]: the lock is shared until the last thread waiting on it is done
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                # Another thread may have built it while we waited for the key lock
+                with self._lock:
+                    cached = self._data.get(key)
+                    if cached is not None and not self._expired(cached[1]):
+                        return cached[0]
+                value = factory()
+                self.set(key, value)
+                return value
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._key_locks.pop(key, None)
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, _ = self._data.pop(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry. Returns how many were removed."""
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._data.items() if self._expired(expires_at)]
+            for key in expired:
+                self._evict(key)
+            return len(expired)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(entry[1])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
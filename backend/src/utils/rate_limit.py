@@ -0,0 +1,68 @@
+# backend/src/utils/rate_limit.py
+"""
+Thread-safe rate limiting primitives used by the campaign dialer.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    A classic token bucket: tokens refill at `rate` per second up to `capacity`,
+    and every acquire() consumes one token, blocking until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Args:
+            rate: Tokens added per second (e.g. calls per second). Must be > 0.
+            capacity: Maximum burst size. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be greater than 0.")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self) -> bool:
+        """Consume a token if one is available right now. Never blocks."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Block until a token is available and consume it.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits forever.
+
+        Returns:
+            bool: True if a token was acquired, False if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
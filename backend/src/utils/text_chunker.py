@@ -0,0 +1,78 @@
+# backend/src/utils/text_chunker.py
+"""
+Incremental splitting of streamed LLM text into speakable clauses, so speech
+synthesis can start on the first clause while the rest is still being generated.
+"""
+import re
+from typing import List
+
+# Sentence punctuation always ends a clause; clause punctuation only once the
+# clause is long enough to be worth speaking on its own.
+SENTENCE_END = ".!?"
+CLAUSE_END = ",;:—"
+
+# Tokens ending in a period that do not end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "a.m.", "p.m."}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ClauseChunker:
+    """
+    Feed streamed text fragments in, get complete clauses out.
+
+    A boundary is only confirmed once the character after the punctuation arrives
+    (it must be whitespace), so "10.30" or "3,000" are never split.
+    """
+
+    def __init__(self, min_clause_chars: int = 20, max_clause_chars: int = 200):
+        """
+        Args:
+            min_clause_chars: Shortest clause emitted at a comma/semicolon/colon boundary.
+            max_clause_chars: Force a split at the last space once a clause grows this long.
+        """
+        self.min_clause_chars = min_clause_chars
+        self.max_clause_chars = max_clause_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add a fragment and return any clauses it completed."""
+        self._buffer += text
+        clauses = []
+        start = 0
+        for i in range(len(self._buffer) - 1):
+            char, following = self._buffer[i], self._buffer[i + 1]
+            if not following.isspace():
+                continue
+            candidate = self._buffer[start:i + 1].strip()
+            is_sentence_end = char in SENTENCE_END and not self._is_abbreviation(candidate)
+            is_clause_end = char in CLAUSE_END and len(candidate) >= self.min_clause_chars
+            if not (is_sentence_end or is_clause_end):
+                continue
+            if candidate:
+                clauses.append(self._normalize(candidate))
+            start = i + 1
+
+        self._buffer = self._buffer[start:]
+
+        if len(self._buffer) > self.max_clause_chars:
+            cut = self._buffer.rfind(" ", 0, self.max_clause_chars)
+            if cut > 0:
+                clauses.append(self._normalize(self._buffer[:cut]))
+                self._buffer = self._buffer[cut:]
+        return clauses
+
+    def flush(self) -> List[str]:
+        """Return whatever text is left once the stream has ended."""
+        remainder = self._normalize(self._buffer)
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+    @staticmethod
+    def _is_abbreviation(candidate: str) -> bool:
+        last_word = candidate.rsplit(None, 1)[-1].lower() if candidate else ""
+        return last_word in ABBREVIATIONS
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _WHITESPACE.sub(" ", text).strip()
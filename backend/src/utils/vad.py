@@ -0,0 +1,313 @@
+# backend/src/utils/vad.py
+"""
+In-process voice activity detection on 16-bit PCM. Frame features are computed with
+NumPy for a whole chunk at once; only the per-frame decision is a scalar loop.
+
+Each frame (20 ms by default) is described by two features:
+  - RMS energy, compared with a threshold that follows the line's noise floor
+  - zero-crossing rate (ZCR): voiced speech crosses zero far less often than hiss and
+    broadband noise, so frames that are only moderately loud must also have a low ZCR
+Frames whose peak towers over their RMS (clicks, line pops) are rejected as impulses.
+
+A frame is speech when it is loud enough and either voiced-looking or clearly loud.
+Hangover keeps the decision on for a short while after the last speech frame, so
+quiet consonants and short dips inside words do not split an utterance.
+
+VoiceActivityDetector works on whole clips (labels, trim; trim_wav_silence() runs
+before STTService.transcribe_buffer() sends a clip to the provider). StreamingVAD keeps
+state across chunks of a live call and reports when the caller starts talking, when
+they have talked long enough to interrupt the agent (barge-in) and when their
+utterance has ended.
+"""
+import io
+import wave
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .audio_codec import AudioInput, _as_int16
+
+SPEECH_START, BARGE_IN, SPEECH_END = "speech_start", "barge_in", "speech_end"
+
+
+class VADEvent(NamedTuple):
+    type: str  # SPEECH_START, BARGE_IN or SPEECH_END
+    # SPEECH_END only: the utterance's audio (with pre-roll and trailing silence) and its speech duration
+    audio: bytes = b""
+    speech_ms: int = 0
+
+
+class VoiceActivityDetector:
+    """Frame-level energy/zero-crossing speech detector."""
+
+    def __init__(
+        self,
+        sample_rate: int = 8000,
+        frame_ms: int = 20,
+        speech_rms: int = None,
+        noise_ratio: float = 2.0,
+        zcr_max: float = 0.35,
+        strong_ratio: float = 3.0,
+        crest_max: float = 8.0,
+        hangover_ms: int = None,
+    ):
+        """
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+            frame_ms: Analysis frame length
+            speech_rms: Minimum RMS of a speech frame. Defaults to settings.MEDIA_STREAM_SPEECH_RMS
+            noise_ratio: Speech must also be this many times louder than the noise floor
+            zcr_max: Highest zero-crossing rate (crossings per sample) of a voiced frame
+            strong_ratio: Frames this many times louder than speech_rms are speech whatever
+                          their ZCR (loud fricatives such as "s" and "f"). On a noisy line,
+                          beating the noise-floor threshold is enough on its own, since
+                          the noise itself already drives the ZCR up
+            crest_max: Frames whose peak exceeds this many times their RMS are clicks, not speech
+            hangover_ms: How long the decision stays on after the last speech frame.
+                         Defaults to settings.VAD_HANGOVER_MS
+        """
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.speech_rms = speech_rms or settings.MEDIA_STREAM_SPEECH_RMS
+        self.noise_ratio = noise_ratio
+        self.zcr_max = zcr_max
+        self.strong_ratio = strong_ratio
+        self.crest_max = crest_max
+        hangover_ms = settings.VAD_HANGOVER_MS if hangover_ms is None else hangover_ms
+        self.hangover_frames = hangover_ms // frame_ms
+
+    def frame_features(self, pcm: AudioInput) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        RMS and zero-crossing rate of every complete frame. Impulsive frames (see
+        crest_max) are reported with an RMS of 0.
+        """
+        x = _as_int16(pcm)
+        count = x.size // self.frame_samples
+        frames = x[: count * self.frame_samples].reshape(count, self.frame_samples).astype(np.float32)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        rms[np.max(np.abs(frames), axis=1) > self.crest_max * rms] = 0.0
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_samples - 1)
+        return rms, zcr
+
+    def threshold(self, noise_floor: float) -> float:
+        return max(self.speech_rms, noise_floor * self.noise_ratio)
+
+    def initial_noise_floor(self) -> float:
+        return self.speech_rms / self.noise_ratio
+
+    def decide(self, rms: np.ndarray, zcr: np.ndarray, noise_floor: float) -> Tuple[np.ndarray, float]:
+        """
+        Raw per-frame speech decision, before hangover.
+
+        Args:
+            rms: Frame RMS levels (from frame_features)
+            zcr: Frame zero-crossing rates
+            noise_floor: Noise-floor estimate before the first frame
+
+        Returns:
+            Tuple[np.ndarray, float]: The boolean decisions and the updated noise floor
+        """
+        decisions = np.zeros(rms.size, dtype=bool)
+        strong = self.speech_rms * self.strong_ratio
+        for i, (level, crossings) in enumerate(zip(rms.tolist(), zcr.tolist())):
+            threshold = self.threshold(noise_floor)
+            speech = level >= threshold and (crossings <= self.zcr_max or level >= max(strong, threshold))
+            if speech:
+                decisions[i] = True
+                # Creep up very slowly, so noise that starts out loud enough to pass for
+                # speech is eventually learned instead of being speech for the rest of the call
+                if level > noise_floor:
+                    noise_floor += 0.001 * (level - noise_floor)
+            else:
+                # Follow the line's noise on frames nobody is talking in
+                noise_floor = 0.95 * noise_floor + 0.05 * level
+        return decisions, noise_floor
+
+    def apply_hangover(self, decisions: np.ndarray) -> np.ndarray:
+        """Extend every run of speech frames by the hangover."""
+        if not self.hangover_frames or not decisions.size:
+            return decisions
+        window = np.ones(self.hangover_frames + 1)
+        return np.convolve(decisions.astype(np.float32), window)[: decisions.size] > 0
+
+    def label(self, pcm: AudioInput) -> np.ndarray:
+        """Speech/non-speech label of every complete frame of a clip."""
+        rms, zcr = self.frame_features(pcm)
+        decisions, _ = self.decide(rms, zcr, self.initial_noise_floor())
+        return self.apply_hangover(decisions)
+
+    def trim(self, pcm: AudioInput, padding_ms: int = 150) -> bytes:
+        """
+        Drop leading and trailing non-speech from a clip, keeping `padding_ms` around
+        the speech. Returns b"" if the clip contains no speech at all.
+        """
+        x = _as_int16(pcm)
+        speech = np.flatnonzero(self.label(x))
+        if not speech.size:
+            return b""
+        padding = padding_ms // self.frame_ms
+        start = max(0, speech[0] - padding) * self.frame_samples
+        end = min(x.size, (speech[-1] + 1 + padding) * self.frame_samples)
+        return x[start:end].astype("<i2").tobytes()
+
+
+def trim_wav_silence(wav_bytes: bytes, padding_ms: int = 150) -> bytes:
+    """
+    Trim leading and trailing silence from a 16-bit mono WAV file's contents.
+
+    Returns:
+        bytes: The trimmed WAV, b"" if it holds no speech, or the input unchanged if it
+        is not 16-bit mono PCM (or not a WAV at all)
+    """
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                return wav_bytes
+            sample_rate = wav.getframerate()
+            pcm = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return wav_bytes
+
+    trimmed = VoiceActivityDetector(sample_rate=sample_rate).trim(pcm, padding_ms)
+    if not trimmed:
+        return b""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(trimmed)
+    return out.getvalue()
+
+
+class StreamingVAD:
+    """
+    Stateful speech detector for live audio. Feed consecutive PCM chunks to process();
+    partial frames carry over to the next call.
+    """
+
+    def __init__(
+        self,
+        detector: VoiceActivityDetector = None,
+        start_ms: int = None,
+        barge_in_ms: int = None,
+        end_of_utterance_ms: int = None,
+        min_speech_ms: int = 200,
+        preroll_ms: int = 200,
+        collect_audio: bool = True,
+    ):
+        """
+        Args:
+            detector: Frame classifier. Defaults to an 8 kHz VoiceActivityDetector
+            start_ms: Speech needed before SPEECH_START. Defaults to settings.VAD_SPEECH_START_MS
+            barge_in_ms: Speech needed before BARGE_IN. Defaults to settings.VAD_BARGE_IN_MS
+            end_of_utterance_ms: Trailing silence that ends an utterance.
+                                 Defaults to settings.MEDIA_STREAM_END_OF_SPEECH_MS
+            min_speech_ms: Utterances with less speech than this end without SPEECH_END
+            preroll_ms: Audio kept from before SPEECH_START so the first syllable is not cut
+            collect_audio: Keep the utterance audio for the SPEECH_END event
+        """
+        self.detector = detector or VoiceActivityDetector()
+        frame_ms = self.detector.frame_ms
+        self.start_frames = max(1, (start_ms or settings.VAD_SPEECH_START_MS) // frame_ms)
+        self.barge_in_frames = max(1, (barge_in_ms or settings.VAD_BARGE_IN_MS) // frame_ms)
+        self.end_frames = max(1, (end_of_utterance_ms or settings.MEDIA_STREAM_END_OF_SPEECH_MS) // frame_ms)
+        self.min_speech_frames = min_speech_ms // frame_ms
+        self.preroll_frames = preroll_ms // frame_ms
+        self.collect_audio = collect_audio
+
+        self.noise_floor = self.detector.initial_noise_floor()
+        self.frames_processed = 0
+        self._carry = np.zeros(0, dtype=np.int16)
+        self._recent: List[np.ndarray] = []  # Pre-roll frames while idle
+        self._utterance: List[np.ndarray] = []
+        self._reset()
+
+    def _reset(self):
+        self.in_speech = False  # SPEECH_START sent for the current utterance
+        self._speech_frames = 0
+        self._candidate_frames = 0
+        self._silence_frames = 0
+        self._since_speech = None
+        self._barged_in = False
+        self._utterance = []
+
+    def process(self, pcm: AudioInput) -> List[VADEvent]:
+        """Analyse one chunk. Returns the events it triggered, in order."""
+        x = np.concatenate([self._carry, _as_int16(pcm)])
+        samples = self.detector.frame_samples
+        count = x.size // samples
+        self._carry = x[count * samples:].copy()
+        if not count:
+            return []
+
+        frames = x[: count * samples].reshape(count, samples)
+        rms, zcr = self.detector.frame_features(frames.reshape(-1))
+        decisions, self.noise_floor = self.detector.decide(rms, zcr, self.noise_floor)
+        events = []
+        for i, speech in enumerate(decisions.tolist()):
+            event = self._step(speech, frames[i])
+            if event is not None:
+                events.append(event)
+        self.frames_processed += count
+        return events
+
+    def _step(self, speech: bool, frame: np.ndarray) -> Optional[VADEvent]:
+        if speech:
+            self._since_speech = 0
+        elif self._since_speech is not None:
+            self._since_speech += 1
+        # Hangover: a short dip after speech still counts as speech
+        voiced = speech or (self._since_speech is not None and self._since_speech <= self.detector.hangover_frames)
+
+        if not self.in_speech:
+            if self.collect_audio:
+                self._recent.append(frame)
+                del self._recent[: -max(self.preroll_frames + self.start_frames, 1)]
+            self._candidate_frames = self._candidate_frames + 1 if voiced else 0
+            if speech:
+                self._speech_frames += 1
+            elif not voiced:
+                self._speech_frames = 0
+            if self._candidate_frames >= self.start_frames and self._speech_frames:
+                self.in_speech = True
+                self._silence_frames = 0
+                if self.collect_audio:
+                    self._utterance = list(self._recent)
+                    self._recent = []
+                return VADEvent(SPEECH_START)
+            return None
+
+        if self.collect_audio:
+            self._utterance.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silence_frames = 0
+            if not self._barged_in and self._speech_frames >= self.barge_in_frames:
+                self._barged_in = True
+                return VADEvent(BARGE_IN)
+            return None
+
+        self._silence_frames += 1
+        if self._silence_frames < self.end_frames:
+            return None
+        speech_frames = self._speech_frames
+        audio = np.concatenate(self._utterance).astype("<i2").tobytes() if self._utterance else b""
+        self._reset()
+        if speech_frames < self.min_speech_frames:
+            return None
+        return VADEvent(SPEECH_END, audio, speech_frames * self.detector.frame_ms)
+
+    def flush(self) -> Optional[VADEvent]:
+        """End the stream: returns SPEECH_END for an utterance still in progress, if long enough."""
+        if not self.in_speech:
+            return None
+        speech_frames = self._speech_frames
+        audio = np.concatenate(self._utterance).astype("<i2").tobytes() if self._utterance else b""
+        self._reset()
+        if speech_frames < self.min_speech_frames:
+            return None
+        return VADEvent(SPEECH_END, audio, speech_frames * self.detector.frame_ms)
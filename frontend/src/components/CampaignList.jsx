@@ -57,7 +57,7 @@ const CampaignList = ({ campaigns }) => {
                     {campaign.status}
                   </span>
                 </td>
-                <td>{campaign.contacts.length}</td>
+                <td>{campaign.total_contacts}</td>
                 <td className="actions-cell">
                   <button 
                     onClick={() => handleViewClick(campaign.id)}
@@ -48,7 +48,7 @@ const VoiceChat = ({ agentId, agentName, onClose }) => {
   }, []);
 
   const connectWebSocket = () => {
-    const ws = new WebSocket(`ws://localhost:8000/api/v1/chat/voice/${agentId}`);
+    const ws = new WebSocket(`ws://localhost:8000/api/v1/chat/voice/${agentId}?stream=true`);
     
     ws.onopen = () => {
       setIsConnected(true);
@@ -64,9 +64,13 @@ const VoiceChat = ({ agentId, agentName, onClose }) => {
         return;
       }
 
-      if (data.type === 'agent_response') {
+      if (data.type === 'agent_response_partial') {
+        // Speak each clause as soon as it arrives; utterances queue up in order
+        if (data.index === 0) stopSpeaking();
+        queueSpeech(data.text);
+      } else if (data.type === 'agent_response') {
         addTranscript('agent', data.text);
-        speakText(data.text);
+        if (!data.streamed) speakText(data.text);
       } else if (data.type === 'transcription') {
         addTranscript('user', data.text);
       }
@@ -124,7 +128,10 @@ const VoiceChat = ({ agentId, agentName, onClose }) => {
 
   const speakText = (text) => {
     stopSpeaking(); // Stop any ongoing speech
-    
+    queueSpeech(text);
+  };
+
+  const queueSpeech = (text) => {
     const utterance = new SpeechSynthesisUtterance(text);
     utterance.rate = 1.0;
     utterance.pitch = 1.0;
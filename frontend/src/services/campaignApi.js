@@ -36,7 +36,7 @@ apiClient.interceptors.response.use(
 );
 
 // --- Campaign Endpoints ---
-export const getCampaigns = () => apiClient.get('/campaigns/');
+export const getCampaigns = () => apiClient.get('/campaigns/summary');
 export const createCampaign = (campaignData) => apiClient.post('/campaigns/', campaignData);
 export const getCampaignById = (id) => apiClient.get(`/campaigns/${id}`);
 export const getCampaignStatus = (id) => apiClient.get(`/campaigns/${id}/status`);
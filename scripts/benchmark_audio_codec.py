@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the in-process audio codec (backend/src/utils/audio_codec.py).
+
+Measures:
+  - G.711 u-law / A-law encode and decode throughput (seconds of audio per second)
+  - Resampling throughput from common TTS rates down to 8 kHz, one-shot and streamed
+  - Whole-file WAV -> u-law conversion, in-process vs. the FFmpeg subprocess
+    (the FFmpeg column is skipped if ffmpeg is not on the PATH)
+
+It also checks the round trip: u-law encode -> decode must stay within the G.711
+quantisation error for every 16-bit sample value.
+
+Usage:
+  python scripts/benchmark_audio_codec.py
+  python scripts/benchmark_audio_codec.py --seconds 30 --chunk-ms 20
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "audio_codec_bench.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.utils import audio_codec  # noqa: E402
+from src.utils.audio_helpers import convert_to_ulaw, convert_to_ulaw_ffmpeg  # noqa: E402
+
+
+def speech_like(seconds: float, rate: int) -> np.ndarray:
+    """A few harmonics with a syllable-rate envelope plus a little noise."""
+    t = np.arange(int(seconds * rate)) / rate
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1400, 2800)))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    noise = np.random.default_rng(0).normal(0, 0.05, t.size)
+    return (8000 * (signal * envelope + noise)).clip(-32768, 32767).astype(np.int16)
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, audio_seconds: float, elapsed: float):
+    print(f"  {label:<34} {elapsed * 1000:9.2f} ms   {audio_seconds / elapsed:10.0f}x realtime")
+
+
+def check_round_trip():
+    samples = np.arange(-32768, 32768, dtype=np.int16)
+    decoded = audio_codec.ulaw_decode(audio_codec.ulaw_encode(samples)).astype(np.int32)
+    worst = int(np.abs(decoded - samples).max())
+    # The widest u-law segment quantises in steps of 1024 (plus clipping above 32635)
+    status = "✅" if worst <= 1024 else "❌"
+    print(f"{status} u-law round trip: worst-case error {worst} over all 65536 sample values")
+
+
+def bench_g711(seconds: float):
+    pcm = speech_like(seconds, 8000)
+    ulaw, alaw = audio_codec.ulaw_encode(pcm), audio_codec.alaw_encode(pcm)
+    print(f"\n🎛️  G.711 on {seconds:.0f}s of 8 kHz audio")
+    report("u-law encode", seconds, timed(lambda: audio_codec.ulaw_encode(pcm)))
+    report("u-law decode", seconds, timed(lambda: audio_codec.ulaw_decode(ulaw)))
+    report("A-law encode", seconds, timed(lambda: audio_codec.alaw_encode(pcm)))
+    report("A-law decode", seconds, timed(lambda: audio_codec.alaw_decode(alaw)))
+
+
+def bench_resample(seconds: float, chunk_ms: int):
+    print(f"\n🔁 Resampling {seconds:.0f}s of audio ({chunk_ms} ms chunks when streamed)")
+    for from_rate in (16000, 22050, 24000):
+        pcm = speech_like(seconds, from_rate)
+        chunk = from_rate * chunk_ms // 1000
+
+        def streamed():
+            resampler = audio_codec.StreamResampler(from_rate, 8000)
+            for offset in range(0, pcm.size, chunk):
+                resampler.process(pcm[offset:offset + chunk])
+
+        report(f"{from_rate} -> 8000 one-shot", seconds, timed(lambda: audio_codec.resample(pcm, from_rate, 8000)))
+        report(f"{from_rate} -> 8000 streamed", seconds, timed(streamed, repeat=3))
+    pcm = speech_like(seconds, 8000)
+    report("8000 -> 16000 one-shot", seconds, timed(lambda: audio_codec.resample(pcm, 8000, 16000)))
+
+
+def bench_files(seconds: float):
+    print(f"\n📁 WAV -> u-law file conversion ({seconds:.0f}s, 22.05 kHz mono)")
+    workdir = tempfile.mkdtemp(prefix="audio_codec_bench_")
+    wav_path = os.path.join(workdir, "input.wav")
+    with wave.open(wav_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(22050)
+        wf.writeframes(speech_like(seconds, 22050).tobytes())
+
+    in_process = os.path.join(workdir, "numpy.ulaw")
+    report("in-process (NumPy)", seconds, timed(lambda: convert_to_ulaw(wav_path, in_process), repeat=3))
+    if shutil.which("ffmpeg") is None:
+        print("  ⚠️  ffmpeg not found on PATH, skipping the subprocess comparison")
+        return
+    via_ffmpeg = os.path.join(workdir, "ffmpeg.ulaw")
+    report("ffmpeg subprocess", seconds, timed(lambda: convert_to_ulaw_ffmpeg(wav_path, via_ffmpeg), repeat=3))
+    print(f"  Output sizes: numpy {os.path.getsize(in_process)} bytes, ffmpeg {os.path.getsize(via_ffmpeg)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy G.711 codec and resampler.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic test audio")
+    parser.add_argument("--chunk-ms", type=int, default=20, help="Chunk size for the streamed resampler")
+    args = parser.parse_args()
+
+    check_round_trip()
+    bench_g711(args.seconds)
+    bench_resample(args.seconds, args.chunk_ms)
+    bench_files(args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the campaign dialer.
+
+Runs the concurrent dialer against a throwaway SQLite database and a stubbed
+Twilio client, so no real calls are placed and no API keys are needed.
+
+Usage:
+  python scripts/benchmark_dialer.py --contacts 200 --concurrency 1 10 50 --cps 5 20
+  python scripts/benchmark_dialer.py --test-mode   # use the TEST_MODE simulation path
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# --- Configure a throwaway environment before importing the backend ---
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="dialer_bench_"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.core.config import settings  # noqa: E402
+from src.core.database import Base, engine, SessionLocal  # noqa: E402
+from src.models import agent as agent_model, campaign as campaign_model, call as call_model  # noqa: E402,F401
+from src.services.call_tracking import call_tracking  # noqa: E402
+from src.services.campaign_queue import CampaignJobQueue  # noqa: E402
+from src.services.campaign_service import CampaignService  # noqa: E402
+
+
+class StubTwilioService:
+    """Pretends to be TwilioService: each call "rings" for a while, then completes."""
+
+    def __init__(self, api_latency: float, call_seconds: float):
+        self.api_latency = api_latency
+        self.call_seconds = call_seconds
+        self.calls = 0
+        self.live = 0
+        self.peak_live = 0
+        self._lock = threading.Lock()
+
+    def originate_call(self, to_number: str, agent_id: int, **kwargs):
+        time.sleep(self.api_latency)  # Simulated REST round-trip
+        with self._lock:
+            self.calls += 1
+            self.live += 1
+            self.peak_live = max(self.peak_live, self.live)
+            call_sid = f"CA_STUB_{self.calls}"
+        threading.Timer(self.call_seconds, self._hang_up, args=(call_sid,)).start()
+        return {"status": "success", "call_sid": call_sid}
+
+    def _hang_up(self, call_sid: str):
+        # Stand-in for Twilio's status callback reporting the call finished
+        db = SessionLocal()
+        try:
+            while call_tracking.apply_status(db, call_sid, "completed") is None:
+                time.sleep(0.01)  # The dialer records the SID right after originate returns
+        finally:
+            db.close()
+        with self._lock:
+            self.live -= 1
+
+
+def seed_campaign(contacts: int, concurrency: int, cps: float) -> int:
+    db = SessionLocal()
+    try:
+        agent = db.query(agent_model.Agent).first()
+        if agent is None:
+            agent = agent_model.Agent(name="Benchmark Agent", system_prompt="You are a benchmark.")
+            db.add(agent)
+            db.commit()
+
+        campaign = campaign_model.Campaign(
+            name=f"bench-{concurrency}-{cps}",
+            agent_id=agent.id,
+            status="running",
+            dialer_mode="concurrent",
+            max_concurrent_calls=concurrency,
+            calls_per_second=cps,
+        )
+        db.add(campaign)
+        db.commit()
+        db.add_all([
+            campaign_model.Contact(phone_number=f"+1555{campaign.id:03d}{i:04d}", campaign_id=campaign.id)
+            for i in range(contacts)
+        ])
+        db.commit()
+        return campaign.id
+    finally:
+        db.close()
+
+
+def run_once(args, concurrency: int, cps: float):
+    stub = StubTwilioService(api_latency=args.api_latency, call_seconds=args.call_seconds)
+    service = CampaignService(telephony=stub, test_mode=args.test_mode, queue=CampaignJobQueue())
+    campaign_id = seed_campaign(args.contacts, concurrency, cps)
+
+    started = time.perf_counter()
+    service._run_dialer(campaign_id)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"concurrency={concurrency:<4} cps={cps:<6} "
+        f"wall={elapsed:7.2f}s  throughput={args.contacts / elapsed:7.2f} calls/s  "
+        f"peak_live={stub.peak_live if not args.test_mode else 'n/a'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the concurrent campaign dialer offline.")
+    parser.add_argument("--contacts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--cps", type=float, nargs="+", default=[5.0, 50.0])
+    parser.add_argument("--call-seconds", type=float, default=0.5, help="Simulated call duration")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Simulated Twilio REST latency")
+    parser.add_argument("--test-mode", action="store_true", help="Use the TEST_MODE simulation path")
+    args = parser.parse_args()
+
+    settings.DIALER_POLL_INTERVAL = min(settings.DIALER_POLL_INTERVAL, 0.05)
+    settings.TEST_CALL_SECONDS = args.call_seconds
+    Base.metadata.create_all(bind=engine)
+
+    print(f"🏎️  Dialer benchmark: {args.contacts} contacts, {args.call_seconds}s calls, DB at {DB_PATH}")
+    sequential = args.contacts * (args.call_seconds + 10)
+    print(f"   (sequential dialer estimate: ~{sequential:.0f}s with its 10s inter-call wait)")
+    for concurrency in args.concurrency:
+        for cps in args.cps:
+            run_once(args, concurrency, cps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark of per-call client overhead for Gemini requests
+(backend/src/services/gemini_backend.py against the previous LLMService path).
+
+Both implementations run through the real google.generativeai SDK: request building,
+proto conversion and response parsing all happen as in production. Only the network
+is replaced: a fixture client answers every generate_content request with the
+GenerateContentResponse in scripts/fixtures/gemini_generate_content.json (API JSON
+format), deserialized from bytes on each call as if it had just come off the wire.
+The timings are therefore the overhead each implementation adds on top of the
+model's own latency.
+
+  - previous: start_chat(history=[]), append each prior message to chat.history,
+    send_message() with a new GenerationConfig; system prompt sent as a "model" turn
+  - backend:  one-pass contents, per-agent GenerativeModel with system_instruction,
+    shared GenerationConfig
+
+Usage:
+  python scripts/benchmark_gemini_backend.py
+  python scripts/benchmark_gemini_backend.py --calls 2000 --turns 1 5 20 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "gemini_bench.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import google.generativeai as genai  # noqa: E402
+from google.generativeai import protos  # noqa: E402
+
+from src.agents.appointment_setter.prompts import APPOINTMENT_SETTER_SYSTEM_PROMPT, VOICE_RESPONSE_RULES  # noqa: E402
+from src.services.gemini_backend import GeminiBackend  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "gemini_generate_content.json")
+MODEL = "gemini-2.0-flash-exp"
+SYSTEM_PROMPT = APPOINTMENT_SETTER_SYSTEM_PROMPT + "\n\n" + VOICE_RESPONSE_RULES
+
+
+class FixtureClient:
+    """Stands in for the generative service client: replays the fixture response."""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            fixture = protos.GenerateContentResponse.from_json(f.read(), ignore_unknown_fields=True)
+        self.payload = protos.GenerateContentResponse.serialize(fixture)
+        self.text = fixture.candidates[0].content.parts[0].text
+        self.requests = 0
+        self.last_request = None
+
+    def generate_content(self, request, **kwargs):
+        self.requests += 1
+        self.last_request = request
+        return protos.GenerateContentResponse.deserialize(self.payload)
+
+
+def previous_gemini_response(model, messages):
+    """LLMService._get_gemini_response before the Gemini backend, verbatim."""
+    chat = model.start_chat(history=[])
+
+    for msg in messages[:-1]:
+        role = "user" if msg["role"] == "user" else "model"
+        chat.history.append({
+            "role": role,
+            "parts": [msg["content"]]
+        })
+
+    last_message = messages[-1]["content"]
+    response = chat.send_message(
+        last_message,
+        generation_config=genai.types.GenerationConfig(
+            max_output_tokens=60,
+            temperature=0.7,
+        )
+    )
+    return response.text
+
+
+def conversation(turns: int):
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "assistant", "content": "Hi, this is Alex from QuickFix Services. Is now a good time?"},
+    ]
+    for turn in range(turns - 1):
+        messages.append({"role": "user", "content": f"Sure, what about the furnace inspection on turn {turn}?"})
+        messages.append({"role": "assistant", "content": "Would Tuesday at 10 AM or Thursday at 2 PM work better?"})
+    messages.append({"role": "user", "content": "Tuesday works, but can the technician come after nine?"})
+    return messages
+
+
+def timed(fn, calls: int) -> float:
+    """Best-of-3 seconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gemini request overhead against a fixture response.")
+    parser.add_argument("--calls", type=int, default=500, help="Calls per timing run")
+    parser.add_argument("--turns", type=int, nargs="+", default=[1, 5, 20, 50], help="Caller turns in the prompt")
+    args = parser.parse_args()
+
+    genai.configure(api_key="benchmark")
+    previous_client, backend_client = FixtureClient(FIXTURE), FixtureClient(FIXTURE)
+    previous_model = genai.GenerativeModel(MODEL)
+    previous_model._client = previous_client
+    backend = GeminiBackend(MODEL)
+    backend.model_for(SYSTEM_PROMPT)._client = backend_client
+
+    print("🔍 Requests")
+    messages = conversation(5)
+    check("both return the fixture reply",
+          previous_gemini_response(previous_model, messages) == backend.generate(messages) == backend_client.text)
+    old, new = previous_client.last_request, backend_client.last_request
+    check("the system prompt is a system instruction, not a model turn",
+          new.system_instruction.parts[0].text == SYSTEM_PROMPT
+          and old.contents[0].role == "model" and old.contents[0].parts[0].text == SYSTEM_PROMPT
+          and all(p.text != SYSTEM_PROMPT for c in new.contents for p in c.parts))
+    check("the conversation itself is unchanged",
+          [(c.role, [p.text for p in c.parts]) for c in old.contents[1:]]
+          == [(c.role, [p.text for p in c.parts]) for c in new.contents])
+    check("generation settings are unchanged",
+          (old.generation_config.max_output_tokens, round(old.generation_config.temperature, 3))
+          == (new.generation_config.max_output_tokens, round(new.generation_config.temperature, 3)))
+    check("one GenerativeModel per agent prompt", backend.model_for(SYSTEM_PROMPT) is backend.model_for(SYSTEM_PROMPT))
+
+    print(f"⏱️ Client overhead per call (best of 3 × {args.calls} calls)")
+    print(f"  {'turns':>5} {'messages':>8} {'previous':>11} {'backend':>11} {'speedup':>8}")
+    for turns in args.turns:
+        messages = conversation(turns)
+        before = timed(lambda: previous_gemini_response(previous_model, messages), args.calls)
+        after = timed(lambda: backend.generate(messages), args.calls)
+        print(f"  {turns:>5} {len(messages):>8} {before * 1e6:>9.0f}µs {after * 1e6:>9.0f}µs {before / after:>7.1f}x")
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
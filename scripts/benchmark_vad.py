@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the voice activity detector (backend/src/utils/vad.py).
+
+Measures, on one core:
+  - StreamingVAD fed 20 ms frames one at a time, as MediaStreamSession does per
+    Twilio "media" message (including the u-law decode)
+  - StreamingVAD fed larger chunks (e.g. 200 ms from a buffered client)
+  - VoiceActivityDetector.label() and trim() over a whole clip, as run before
+    transcribe_buffer()
+
+Throughput is reported in 20 ms frames per second; a live call produces 50 frames
+per second, so frames/s / 50 is roughly how many concurrent calls one core can
+screen.
+
+Usage:
+  python scripts/benchmark_vad.py
+  python scripts/benchmark_vad.py --seconds 120 --chunk-ms 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "vad_bench.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.utils.audio_helpers import pcm16_to_ulaw, ulaw_to_pcm16  # noqa: E402
+from src.utils.vad import StreamingVAD, VoiceActivityDetector  # noqa: E402
+
+RATE = 8000
+FRAME_MS = 20
+
+
+def call_audio(seconds: float) -> np.ndarray:
+    """Alternating turns of speech-like audio and pauses over light line noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * RATE)) / RATE
+    signal = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((150, 300, 450, 900, 1800)))
+    talking = (np.floor(t / 1.5) % 2 == 0) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    return (3000 * signal * talking + rng.normal(0, 150, t.size)).clip(-32768, 32767).astype(np.int16)
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, frames: int, elapsed: float):
+    rate = frames / elapsed
+    print(f"  {label:<34} {elapsed * 1000:9.1f} ms  {rate:12,.0f} frames/s  ~{rate / 50:8,.0f} calls/core")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the energy/zero-crossing VAD.")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of the synthetic call audio")
+    parser.add_argument("--chunk-ms", type=int, default=200, help="Chunk size for the chunked streaming run")
+    args = parser.parse_args()
+
+    pcm = call_audio(args.seconds)
+    frames = int(args.seconds * 1000 // FRAME_MS)
+    frame_samples = RATE * FRAME_MS // 1000
+    ulaw_frames = [pcm16_to_ulaw(pcm[i * frame_samples:(i + 1) * frame_samples].tobytes()) for i in range(frames)]
+    pcm_frames = [ulaw_to_pcm16(frame) for frame in ulaw_frames]
+    chunk_samples = RATE * args.chunk_ms // 1000
+    chunks = [pcm[offset:offset + chunk_samples] for offset in range(0, pcm.size, chunk_samples)]
+
+    def per_frame_ulaw():
+        vad = StreamingVAD()
+        for frame in ulaw_frames:
+            vad.process(ulaw_to_pcm16(frame))
+
+    def per_frame_pcm():
+        vad = StreamingVAD()
+        for frame in pcm_frames:
+            vad.process(frame)
+
+    def chunked():
+        vad = StreamingVAD()
+        for chunk in chunks:
+            vad.process(chunk)
+
+    detector = VoiceActivityDetector()
+    print(f"🎙️  VAD on {args.seconds:.0f}s of 8 kHz call audio ({frames} frames of {FRAME_MS} ms)")
+    report("streaming, 20 ms u-law frames", frames, timed(per_frame_ulaw))
+    report("streaming, 20 ms PCM frames", frames, timed(per_frame_pcm))
+    report(f"streaming, {args.chunk_ms} ms chunks", frames, timed(chunked))
+    report("label() whole clip", frames, timed(lambda: detector.label(pcm)))
+    report("trim() whole clip", frames, timed(lambda: detector.trim(pcm)))
+
+    labels = detector.label(pcm)
+    print(f"  Speech in {labels.mean():.0%} of frames (the synthetic call talks half the time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Offline check that the campaign dialer hands back contacts it claimed but never
+dialed, and that a sequential campaign finishes (backend/src/services/campaign_service.py,
+campaign_queue.py).
+
+Runs against a throwaway SQLite database and a stubbed Twilio client whose calls hang
+up shortly after they are placed:
+
+  - a sequential campaign waits for each call to hang up before placing the next one,
+    and is marked completed after the last call ends
+  - a call that hangs up before the dialer has recorded it still completes its contact
+  - a sequential campaign paused while the dialer waits between calls releases the
+    contact it had already claimed, instead of dialing it or keeping its lease
+  - a dialer that fails between claim and dial releases its claims too
+  - released contacts are claimable again, by any worker
+
+Usage:
+  python scripts/check_campaign_queue.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# --- Configure a throwaway environment before importing the backend ---
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="campaign_queue_check_"), "check.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+os.environ["DIALER_POLL_INTERVAL"] = "0.02"
+os.environ["DIALER_MAX_CALL_SECONDS"] = "5"  # Bounds the wait if a hangup is lost
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.core.database import Base, engine, SessionLocal  # noqa: E402
+from src.models import agent as agent_model, campaign as campaign_model, call as call_model  # noqa: E402,F401
+from src.services import campaign_service as campaign_service_module  # noqa: E402
+from src.services.call_tracking import call_tracking  # noqa: E402
+from src.services.campaign_queue import CampaignJobQueue  # noqa: E402
+from src.services.campaign_service import CampaignService  # noqa: E402
+
+Contact = campaign_model.Contact
+
+
+class StubTwilio:
+    """Originates calls without placing them; each one "hangs up" after call_seconds."""
+
+    def __init__(self, call_seconds: float = 0.1):
+        self.dialed = []
+        self.call_seconds = call_seconds
+        self.live = 0
+        self.max_live = 0
+        self._lock = threading.Lock()
+
+    def originate_call(self, to_number: str, agent_id: int, **kwargs):
+        with self._lock:
+            self.dialed.append(to_number)
+            call_sid = f"CA_CHECK_{len(self.dialed)}"
+            self.live += 1
+            self.max_live = max(self.max_live, self.live)
+        threading.Timer(self.call_seconds, self._hang_up, args=(call_sid,)).start()
+        return {"status": "success", "call_sid": call_sid}
+
+    def _hang_up(self, call_sid: str):
+        with self._lock:
+            self.live -= 1
+        # Twilio's final status callback
+        db = SessionLocal()
+        try:
+            call_tracking.apply_status(db, call_sid, "completed", duration=1)
+        finally:
+            db.close()
+
+
+class EarlyHangupTwilio(StubTwilio):
+    """Delivers each call's final status callback before originate_call() returns."""
+
+    def originate_call(self, to_number: str, agent_id: int, **kwargs):
+        with self._lock:
+            self.dialed.append(to_number)
+            call_sid = f"CA_EARLY_{len(self.dialed)}"
+            self.live += 1
+            self.max_live = max(self.max_live, self.live)
+        self._hang_up(call_sid)
+        return {"status": "success", "call_sid": call_sid}
+
+
+def pause(campaign_id: int):
+    db = SessionLocal()
+    try:
+        db.query(campaign_model.Campaign).filter(campaign_model.Campaign.id == campaign_id).update({"status": "paused"})
+        db.commit()
+    finally:
+        db.close()
+
+
+class FailingQueue(CampaignJobQueue):
+    """Claims contacts, then loses the database before they can be dialed."""
+
+    def claim(self, db, campaign_id, limit=1):
+        claimed = super().claim(db, campaign_id, limit)
+        raise RuntimeError(f"connection lost after claiming {claimed}")
+
+
+def seed_campaign(contacts: int, dialer_mode: str) -> int:
+    db = SessionLocal()
+    try:
+        agent = db.query(agent_model.Agent).first()
+        if agent is None:
+            agent = agent_model.Agent(name="Check Agent", system_prompt="You are a check.")
+            db.add(agent)
+            db.commit()
+        campaign = campaign_model.Campaign(
+            name=f"check-{dialer_mode}", agent_id=agent.id, status="running", dialer_mode=dialer_mode,
+            max_concurrent_calls=3, calls_per_second=100.0,
+        )
+        db.add(campaign)
+        db.commit()
+        db.add_all([
+            Contact(phone_number=f"+1555{campaign.id:03d}{i:04d}", campaign_id=campaign.id)
+            for i in range(contacts)
+        ])
+        db.commit()
+        return campaign.id
+    finally:
+        db.close()
+
+
+def contacts(campaign_id: int):
+    db = SessionLocal()
+    try:
+        return db.query(Contact).filter(Contact.campaign_id == campaign_id).order_by(Contact.id).all()
+    finally:
+        db.close()
+
+
+def campaign_status(campaign_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(campaign_model.Campaign.status).filter(campaign_model.Campaign.id == campaign_id).scalar()
+    finally:
+        db.close()
+
+
+def service(telephony, queue):
+    dialer = CampaignService(telephony=telephony, test_mode=False, queue=queue)
+    dialer._prepare_greeting = lambda agent: None  # No LLM or TTS calls offline
+    return dialer
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def check_sequential_completes(twilio: StubTwilio):
+    campaign_id = seed_campaign(3, "sequential")
+    sleep = time.sleep
+
+    def short_wait_between_calls(seconds):
+        # Only the dialer (this thread) is sped up; poll intervals are already short
+        if threading.current_thread() is threading.main_thread():
+            seconds = min(seconds, 0.02)
+        return sleep(seconds)
+
+    campaign_service_module.time.sleep = short_wait_between_calls
+    started_at = time.monotonic()
+    try:
+        service(twilio, CampaignJobQueue())._run_dialer(campaign_id)
+    finally:
+        campaign_service_module.time.sleep = sleep
+    rows = contacts(campaign_id)
+    check("every contact was dialed once", len(twilio.dialed) == 3 and all(c.dialed_at is not None for c in rows))
+    check("calls never overlapped", twilio.max_live == 1)
+    check("every contact ended completed", all(c.status == "completed" for c in rows))
+    check("the campaign is marked completed", campaign_status(campaign_id) == "completed")
+    check("no call waited out DIALER_MAX_CALL_SECONDS", time.monotonic() - started_at < 5)
+
+
+def check_paused_sequential():
+    print("⏸️  Sequential campaign paused between calls")
+    campaign_id = seed_campaign(3, "sequential")
+    twilio, queue = StubTwilio(), CampaignJobQueue()
+    sleep = time.sleep
+
+    def wait_between_calls(seconds):
+        # time.sleep is patched process-wide; only the dialer's wait between calls is affected
+        if threading.current_thread() is not threading.main_thread() or seconds < 1:
+            return sleep(seconds)
+        # The user pauses the campaign while the dialer waits before its second call
+        pause(campaign_id)
+        sleep(0.01)
+
+    campaign_service_module.time.sleep = wait_between_calls
+    try:
+        service(twilio, queue)._run_dialer(campaign_id)
+    finally:
+        campaign_service_module.time.sleep = sleep
+    first, second, third = contacts(campaign_id)
+    check("only the first contact was dialed", len(twilio.dialed) == 1 and first.dialed_at is not None)
+    check("the contact claimed before the pause is pending again, with no lease",
+          second.status == "pending" and second.lease_owner is None and second.attempts == 1)
+    check("untouched contacts stay pending", third.status == "pending" and third.attempts == 0)
+    db = SessionLocal()
+    try:
+        check("this worker holds no leases", queue.held(db, campaign_id) == [])
+        check("another worker can claim it right away", CampaignJobQueue().claim(db, campaign_id) == [second.id])
+    finally:
+        db.close()
+
+
+def check_failed_dialer():
+    print("💥 Dialer failing between claim and dial")
+    campaign_id = seed_campaign(5, "concurrent")
+    queue = FailingQueue()
+    service(StubTwilio(), queue)._run_dialer(campaign_id)
+    rows = contacts(campaign_id)
+    check("nothing was dialed", all(c.dialed_at is None for c in rows))
+    check("the claims were released", all(c.status == "pending" and c.lease_owner is None for c in rows)
+          and sum(c.attempts for c in rows) == 3)
+    db = SessionLocal()
+    try:
+        check("heartbeats no longer renew them", queue.heartbeat(db) == 0)
+    finally:
+        db.close()
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    print("📞 Sequential campaign dialing every contact")
+    check_sequential_completes(StubTwilio())
+    print("⚡ Calls hanging up before the dialer records them")
+    check_sequential_completes(EarlyHangupTwilio())
+    check_paused_sequential()
+    check_failed_dialer()
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All campaign queue checks passed")
+
+
+if __name__ == "__main__":
+    main()
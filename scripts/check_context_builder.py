@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Offline check of token-aware prompt windowing (backend/src/agents/context_builder.py).
+
+Simulates a long call against AppointmentSetterAgent with a fake LLM that records
+every prompt, and compares it with sending the full history each turn:
+
+  - prompt tokens stay under the budget and flat as the call grows
+  - user/assistant exchanges are never split, and the latest ones are verbatim
+  - older turns survive as a memo; the system prefix is byte-identical every turn
+  - the window only shifts every few turns, so consecutive prompts share long prefixes
+
+Usage:
+  python scripts/check_context_builder.py [--turns 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "context_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.agents.appointment_setter.logic import AppointmentSetterAgent  # noqa: E402
+from src.agents.appointment_setter.prompts import APPOINTMENT_SETTER_SYSTEM_PROMPT, VOICE_RESPONSE_RULES  # noqa: E402
+from src.agents.context_builder import ContextBuilder, estimate_tokens, prompt_tokens, split_exchanges  # noqa: E402
+
+CALLER_LINES = [
+    "Yes, this is Sam. What's this about?",
+    "Oh right, the furnace inspection. Can you remind me what it includes?",
+    "Tuesday morning is tricky because I drop the kids off at school around eight.",
+    "Does the technician need access to the basement and the attic?",
+    "My neighbour mentioned you also clean ducts. Is that a separate appointment?",
+    "Thursday afternoon could work, but only after two o'clock.",
+]
+
+
+class RecordingLLM:
+    model_id = "gemini:check"
+
+    def __init__(self):
+        self.prompts = []
+
+    def get_response(self, messages):
+        self.prompts.append(messages)
+        turn = len(self.prompts)
+        return f"Turn {turn}: happy to help with that. Would Thursday at {2 + turn % 4} PM suit you?"
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def shared_prefix(a, b) -> int:
+    """Number of leading messages two prompts have in common."""
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def simulate(turns: int, budget: int):
+    llm = RecordingLLM()
+    agent = AppointmentSetterAgent(llm)
+    agent.context = ContextBuilder(agent.context.system_message["content"], llm.model_id, budget_tokens=budget)
+    history = [{"role": "assistant", "content": "Hi, this is Alex from QuickFix Services. Is now a good time?"}]
+    full_sizes, sizes = [], []
+    for turn in range(turns):
+        user = f"{CALLER_LINES[turn % len(CALLER_LINES)]} (turn {turn})"
+        full = [{"role": "system", "content": agent.context.system_message["content"]}] + history + [{"role": "user", "content": user}]
+        full_sizes.append(prompt_tokens(full))
+        reply = agent.process_response(user, history)
+        sizes.append(prompt_tokens(llm.prompts[-1]))
+        history += [{"role": "user", "content": user}, {"role": "assistant", "content": reply}]
+    return agent, llm, history, full_sizes, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=1500)
+    args = parser.parse_args()
+
+    print("🔢 Token estimates")
+    check("empty text is free", estimate_tokens("") == 0)
+    check("short words are one token each", estimate_tokens("can you call me back") == 5)
+    check("long words split", estimate_tokens("internationalization") > 1)
+
+    print(f"📞 {args.turns}-turn call, budget {args.budget} tokens")
+    agent, llm, history, full_sizes, sizes = simulate(args.turns, args.budget)
+    prefix = agent.context.system_message["content"]
+    check("the voice rules are part of the static prefix",
+          prefix == APPOINTMENT_SETTER_SYSTEM_PROMPT + "\n\n" + VOICE_RESPONSE_RULES)
+    check("the system prefix is identical on every turn", all(p[0] == {"role": "system", "content": prefix} for p in llm.prompts))
+    check(f"prompts stay within budget (max {max(sizes)})", max(sizes) <= args.budget)
+    late = sizes[len(sizes) // 2:]
+    check(f"prompt size is flat late in the call ({min(late)}-{max(late)} tokens)", max(late) - min(late) <= args.budget * 0.5)
+    check(f"full history would have grown to {full_sizes[-1]} tokens", full_sizes[-1] > 3 * args.budget)
+
+    last = llm.prompts[-1]
+    body = [m for m in last if m["role"] != "system"]
+    check("the window starts at a user message", body[0]["role"] == "user")
+    check("every exchange in the window is complete",
+          all(len(exchange) == 2 for exchange in split_exchanges(body[:-1])))
+    check("the latest exchanges are verbatim", body[-3:-1] == history[-4:-2] and body[-1]["content"] == history[-2]["content"])
+    memo = [m["content"] for m in last[1:] if m["role"] == "system"]
+    check("older turns are summarized in a memo", len(memo) == 1 and "Caller:" in memo[0])
+    check(f"the memo stays small ({estimate_tokens(memo[0])} tokens)",
+          estimate_tokens(memo[0]) <= agent.context.memo_tokens)
+
+    # Consecutive prompts share everything but the newest exchange unless the window just shifted
+    shifts = sum(1 for a, b in zip(llm.prompts, llm.prompts[1:]) if shared_prefix(a, b) < len(a) - 1)
+    check(f"the window shifted on {shifts} of {len(llm.prompts) - 1} turns", shifts <= len(llm.prompts) / 3)
+
+    saved = sum(full_sizes) - sum(sizes)
+    print(f"📊 Prompt tokens over the call: {sum(full_sizes)} full history vs {sum(sizes)} windowed "
+          f"({saved / sum(full_sizes):.0%} fewer); last turn {full_sizes[-1]} vs {sizes[-1]}")
+
+    print("💬 Short calls")
+    agent, llm, history, full_sizes, sizes = simulate(4, args.budget)
+    check("short calls are sent in full", sizes == full_sizes and len(llm.prompts[-1]) == len(history))
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All context builder checks passed")
+
+
+if __name__ == "__main__":
+    main()
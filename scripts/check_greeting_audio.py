@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Offline check of pre-rendered greeting audio (backend/src/services/greeting_audio.py).
+
+The agent's services are replaced by stubs (no LLM or ElevenLabs calls):
+
+  - an LLM failure (LLMService returns FALLBACK_RESPONSE) stores nothing, so the
+    webhook keeps generating the greeting live, and the dialer carries on
+  - a later successful prepare() stores the real greeting, served by lookup()
+
+Usage:
+  python scripts/check_greeting_audio.py
+"""
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+AUDIO_DIR = tempfile.mkdtemp(prefix="greeting_check_")
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "greeting_check.db"))
+os.environ["AUDIO_DIR"] = AUDIO_DIR
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.services import greeting_audio as greeting_module  # noqa: E402
+from src.services.campaign_service import CampaignService  # noqa: E402
+from src.services.greeting_audio import GreetingAudioService  # noqa: E402
+from src.services.llm_service import FALLBACK_RESPONSE  # noqa: E402
+
+
+class StubLLM:
+    """Behaves like LLMService.get_response: provider errors become FALLBACK_RESPONSE."""
+
+    model_id = "gemini:check"
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    def get_response(self, messages):
+        self.calls += 1
+        return FALLBACK_RESPONSE if self.down else "Hi, this is Alex from QuickFix. Got a minute?"
+
+
+class StubTTS:
+    def __init__(self):
+        self.texts = []
+
+    def synthesize(self, text: str, output_path: str):
+        self.texts.append(text)
+        with open(output_path, "wb") as f:
+            f.write(b"ID3 fake mp3")
+
+    def synthesize_ulaw(self, text: str) -> bytes:
+        self.texts.append(text)
+        return b"\xff" * 160
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def main():
+    llm, tts = StubLLM(), StubTTS()
+    greeting_module.service_factory.get_services_for_agent = lambda agent: SimpleNamespace(llm=llm, tts=tts)
+    agent = SimpleNamespace(
+        id=7, system_prompt="You are Alex.", llm_provider="gemini", llm_model="check",
+        tts_voice_id="voice", response_cache_enabled=False,
+    )
+    service = GreetingAudioService(audio_dir=AUDIO_DIR, public_url="http://localhost:8000")
+    greeting_module.greeting_audio = service
+
+    print("🎙️ Greeting preparation with the LLM down")
+    try:
+        service.prepare(agent)
+        raised = False
+    except RuntimeError:
+        raised = True
+    check("prepare() refuses the fallback response", raised)
+    check("nothing was synthesized", tts.texts == [])
+    check("no greeting is stored, so calls generate it live", service.lookup(agent) is None
+          and not os.listdir(service.directory))
+    CampaignService._prepare_greeting(agent)
+    check("the dialer logs the failure and carries on", service.lookup(agent) is None)
+
+    print("🎙️ Greeting preparation after recovery")
+    llm.down = False
+    prepared = service.prepare(agent)
+    check("the real greeting is stored", prepared is not None and prepared.text.startswith("Hi, this is Alex"))
+    check("lookup() serves it", service.lookup(agent) == prepared and FALLBACK_RESPONSE not in tts.texts)
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All greeting audio checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Offline check of LLM routing, hedging and circuit breaking (backend/src/services/llm_router.py).
+
+Every model is a FakeBackend with scripted latency and failures, so no provider is
+called. Covered:
+
+  - routing: traffic moves to the model with the lowest p50 once it has been measured;
+    first-token and full-completion latency are ranked separately
+  - hedging: a slow primary is raced against the next model after its deadline, which
+    cuts the latency tail; losers are cancelled
+  - failover: errors and empty replies move on at once, and the canned fallback
+    only comes out when every model fails
+  - circuit breaker: consecutive failures take a model out of rotation, one trial
+    request after the cooldown, closed again on recovery
+  - streaming: hedging on the first token, no fallback after a mid-stream error
+  - blocking get_response failover, and AppointmentSetterAgent on top of a router
+  - streamed replies cut off by a provider error are not put in the response cache
+
+Usage:
+  python scripts/check_llm_router.py
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "llm_router_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.agents.appointment_setter.logic import AppointmentSetterAgent  # noqa: E402
+from src.services.llm_router import (  # noqa: E402
+    CLOSED, COMPLETION, FIRST_TOKEN, OPEN, LLMHealthRegistry, LLMRouter, ModelHealth
+)
+from src.services.llm_service import FALLBACK_RESPONSE  # noqa: E402
+from src.services.response_cache import ResponseCache  # noqa: E402
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Is Tuesday free?"}]
+
+
+class FakeBackend:
+    """
+    Stands in for an LLMService. `latency` is seconds (or a callable returning seconds),
+    split evenly over the reply's tokens when streaming; `fail` is a callable deciding
+    per request whether it raises.
+    """
+
+    def __init__(self, model_id: str, latency=0.01, fail=None, tokens=3, mid_stream_error=False):
+        self.model_id = model_id
+        self.latency = latency
+        self.fail = fail or (lambda: False)
+        self.tokens = tokens
+        self.mid_stream_error = mid_stream_error
+        self.calls = 0
+        self.cancelled = 0
+        self.completed = 0
+
+    def _latency(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    def complete(self, messages) -> str:
+        self.calls += 1
+        time.sleep(self._latency())
+        if self.fail():
+            raise ConnectionError(f"{self.model_id} unavailable")
+        self.completed += 1
+        return f"reply from {self.model_id}"
+
+    async def astream_raw(self, messages):
+        self.calls += 1
+        step = self._latency() / max(1, self.tokens)
+        try:
+            await asyncio.sleep(step)
+            if self.fail():
+                raise ConnectionError(f"{self.model_id} unavailable")
+            for i in range(self.tokens):
+                if i:
+                    await asyncio.sleep(step)
+                if self.mid_stream_error and i == 1:
+                    raise ConnectionError(f"{self.model_id} dropped the stream")
+                yield f"{self.model_id}[{i}] "
+            self.completed += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def router(backends, hedge_ms=200, hedge_min_ms=20, cooldown=0.3, failures=3):
+    registry = LLMHealthRegistry()
+    for backend in backends:
+        registry._models[backend.model_id] = ModelHealth(
+            backend.model_id, window=50, failures_to_open=failures, error_rate_to_open=0.5, cooldown=cooldown
+        )
+    return LLMRouter(backends, health=registry, hedge_ms=hedge_ms, hedge_min_ms=hedge_min_ms), registry
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+async def check_routing():
+    print("🧭 Routing to the fastest model")
+    slow, fast = FakeBackend("gemini:slow", latency=0.12), FakeBackend("groq:fast", latency=0.03)
+    llm, registry = router([slow, fast], hedge_ms=60, hedge_min_ms=50)
+    first = await llm.agenerate(MESSAGES)
+    check("the first request hedges past the unmeasured primary and the faster backup wins",
+          first.startswith("groq:fast") and registry.hedges == 1 and registry.hedge_wins == 1 and slow.cancelled == 1)
+    for _ in range(20):
+        await llm.agenerate(MESSAGES)
+    check(f"later requests go straight to the faster model ({fast.calls} of 21)", fast.calls == 21 and slow.calls == 1)
+    check("the ranking follows p50", [b.model_id for b in llm.ranked()] == ["groq:fast", "gemini:slow"])
+    stats = registry.stats()["models"]
+    check(f"the cancelled loser still counts as slow (p50 {stats['gemini:slow']['completion_p50_ms']} ms)",
+          stats["gemini:slow"]["completion_p50_ms"] >= 50 and stats["gemini:slow"]["requests"] == 0)
+
+    # A model that starts talking at once but takes long to finish, against one that
+    # thinks first and then finishes quickly
+    chatty = FakeBackend("gemini:chatty", latency=0.3, tokens=10)
+    terse = FakeBackend("groq:terse", latency=0.1, tokens=1)
+    llm, registry = router([chatty, terse], hedge_ms=150)
+    for _ in range(3):
+        await llm.agenerate(MESSAGES)
+        [token async for token in llm.astream(MESSAGES)]
+    health = registry.get("gemini:chatty")
+    check(f"first-token and completion latency are kept apart "
+          f"({health.p50(FIRST_TOKEN) * 1000:.0f} vs {health.p50(COMPLETION) * 1000:.0f} ms)",
+          health.p50(FIRST_TOKEN) < 0.1 < health.p50(COMPLETION))
+    check("streams go to the fastest first token, completions to the fastest reply",
+          llm.ranked(FIRST_TOKEN)[0] is chatty and llm.ranked(COMPLETION)[0] is terse)
+    check("hedge deadlines follow the same kind",
+          llm.hedge_delay(chatty, FIRST_TOKEN) < 0.1 < llm.hedge_delay(chatty, COMPLETION))
+
+
+async def check_hedging():
+    print("🏇 Hedged requests")
+    # The primary is usually quick but has a heavy tail; the backup is steady
+    tail = random.Random(7)
+
+    def spiky():
+        return 0.6 if tail.random() < 0.1 else 0.02
+
+    async def run(hedge_ms):
+        primary, backup = FakeBackend("gemini:spiky", latency=spiky), FakeBackend("groq:steady", latency=0.05)
+        llm, registry = router([primary, backup], hedge_ms=hedge_ms, hedge_min_ms=50)
+        # Rank the primary first: it is the faster model at the median
+        registry.get("groq:steady").record_success(0.05)
+        times = []
+        for _ in range(100):
+            started = time.monotonic()
+            await llm.agenerate(MESSAGES)
+            times.append(time.monotonic() - started)
+        return times, registry
+
+    plain, _ = await run(hedge_ms=60_000)
+    hedged, registry = await run(hedge_ms=150)
+    p99_plain, p99_hedged = percentile(plain, 99) * 1000, percentile(hedged, 99) * 1000
+    check(f"p99 drops from {p99_plain:.0f} ms to {p99_hedged:.0f} ms", p99_hedged < p99_plain / 2)
+    check(f"the median is unchanged ({percentile(plain, 50) * 1000:.0f} vs {percentile(hedged, 50) * 1000:.0f} ms)",
+          percentile(hedged, 50) < 0.05)
+    check(f"only the slow requests were hedged ({registry.hedges} hedges)", 3 <= registry.hedges <= 25)
+
+
+async def check_failover_and_breaker():
+    print("🔌 Failover and circuit breaker")
+    broken = {"down": True}
+    flaky = FakeBackend("gemini:flaky", latency=0.005, fail=lambda: broken["down"])
+    backup = FakeBackend("groq:backup", latency=0.02)
+    llm, registry = router([flaky, backup], cooldown=0.3)
+    # Measured as the faster model before it broke, so it stays first in the ranking
+    for _ in range(5):
+        registry.get("gemini:flaky").record_success(0.005)
+
+    replies = [await llm.agenerate(MESSAGES) for _ in range(3)]
+    check("errors fail over to the backup at once, never the canned reply",
+          all(r.startswith("groq:backup") for r in replies) and registry.failovers == 3)
+    health = registry.get("gemini:flaky")
+    check("three consecutive failures open the circuit", health.state == OPEN)
+    calls = flaky.calls
+    for _ in range(5):
+        await llm.agenerate(MESSAGES)
+    check("an open circuit gets no traffic", flaky.calls == calls)
+
+    await asyncio.sleep(0.35)
+    await llm.agenerate(MESSAGES)
+    check("after the cooldown one trial request goes through and reopens the circuit",
+          flaky.calls == calls + 1 and health.state == OPEN)
+
+    await asyncio.sleep(0.35)
+    broken["down"] = False
+    await asyncio.gather(*(llm.agenerate(MESSAGES) for _ in range(5)))
+    check("concurrent requests in half-open send a single trial", flaky.calls == calls + 2)
+    check("a successful trial closes the circuit", health.state == CLOSED)
+    reply = await llm.agenerate(MESSAGES)
+    check("the recovered model takes traffic again", reply.startswith("gemini:flaky"))
+
+    print("🧯 Everything down")
+    dead = [FakeBackend(f"groq:dead{i}", fail=lambda: True) for i in range(2)]
+    llm, registry = router(dead, failures=1)
+    check("the fallback response is the last resort", await llm.agenerate(MESSAGES) == FALLBACK_RESPONSE)
+    check("both models were tried and their circuits opened",
+          all(b.calls == 1 and registry.get(b.model_id).state == OPEN for b in dead) and registry.fallbacks == 1)
+    dead[1].fail = lambda: False
+    check("with every circuit open, models are still tried before giving up",
+          (await llm.agenerate(MESSAGES)).startswith("groq:dead1") and registry.get("groq:dead1").state == CLOSED)
+    empty = FakeBackend("gemini:empty", tokens=0)
+    llm, _ = router([empty, FakeBackend("groq:ok")])
+    check("an empty reply counts as a failure", (await llm.agenerate(MESSAGES)).startswith("groq:ok"))
+
+
+async def check_streaming():
+    print("🌊 Streaming")
+    slow = FakeBackend("gemini:slow-first-token", latency=0.6)
+    fast = FakeBackend("groq:fast", latency=0.06)
+    llm, registry = router([slow, fast], hedge_ms=100)
+    started = time.monotonic()
+    tokens = [token async for token in llm.astream(MESSAGES)]
+    elapsed = time.monotonic() - started
+    check(f"a slow first token is hedged ({elapsed * 1000:.0f} ms)",
+          elapsed < 0.3 and all(t.startswith("groq:fast") for t in tokens) and len(tokens) == 3)
+    check("the losing stream is cancelled", slow.cancelled == 1 and slow.completed == 0)
+
+    broken = FakeBackend("gemini:drops", latency=0.03, mid_stream_error=True)
+    llm, registry = router([broken, FakeBackend("groq:spare")])
+    tokens = [token async for token in llm.astream(MESSAGES)]
+    check("a mid-stream error ends the reply without the canned fallback",
+          tokens == ["gemini:drops[0] "] and registry.get("gemini:drops").consecutive_failures == 1)
+
+    failing = FakeBackend("gemini:down", fail=lambda: True)
+    llm, _ = router([failing, FakeBackend("groq:spare")])
+    tokens = [token async for token in llm.astream(MESSAGES)]
+    check("an error before the first token fails over", tokens and all(t.startswith("groq:spare") for t in tokens))
+
+    llm, _ = router([FakeBackend("groq:long", latency=0.1, tokens=10)])
+    stream = llm.astream(MESSAGES)
+    await stream.__anext__()
+    await stream.aclose()
+    check("a caller that stops listening closes the stream", True)
+
+
+def check_blocking():
+    print("🧱 Blocking get_response")
+    down = FakeBackend("gemini:down", fail=lambda: True)
+    llm, registry = router([down, FakeBackend("groq:ok")])
+    check("fails over in order", llm.get_response(MESSAGES) == "reply from groq:ok" and registry.failovers == 1)
+    llm, _ = router([FakeBackend("groq:dead", fail=lambda: True)])
+    check("returns the fallback when every model fails", llm.get_response(MESSAGES) == FALLBACK_RESPONSE)
+
+
+async def check_agent():
+    print("🤖 AppointmentSetterAgent on a router")
+    llm, _ = router([FakeBackend("gemini:down", fail=lambda: True), FakeBackend("groq:ok")])
+    agent = AppointmentSetterAgent(llm)
+    reply = await agent.aprocess_response("Is Tuesday free?", [])
+    check("the agent gets the backup's reply", reply.startswith("groq:ok"))
+    check("replies are keyed under the agent's own model", agent.model_id == "gemini:down")
+
+    print("🗃️  Response cache and broken streams")
+    for label, llm in [
+        ("a single model", FakeBackend("gemini:drops", mid_stream_error=True)),
+        ("a router", router([FakeBackend("gemini:drops", mid_stream_error=True)])[0]),
+    ]:
+        cache = ResponseCache(maxsize=10, ttl=60)
+        agent = AppointmentSetterAgent(llm, response_cache=cache)
+        streamed = [token async for token in agent.astream_response("Is Tuesday free?", [])]
+        messages = agent._response_messages("Is Tuesday free?", [])
+        check(f"a reply cut off mid-stream is not cached ({label})",
+              streamed == ["gemini:drops[0] "] and cache.get(agent.model_id, messages) is None)
+        llm = llm.backends[0] if isinstance(llm, LLMRouter) else llm
+        llm.mid_stream_error = False
+        streamed = "".join([token async for token in agent.astream_response("Is Tuesday free?", [])])
+        check(f"a complete reply is cached ({label})", cache.get(agent.model_id, messages) == streamed)
+    dead = FakeBackend("gemini:dead", fail=lambda: True)
+    agent = AppointmentSetterAgent(dead, response_cache=ResponseCache(maxsize=10, ttl=60))
+    check("a stream that fails before its first token falls back",
+          [token async for token in agent.astream_response("Is Tuesday free?", [])] == [FALLBACK_RESPONSE])
+
+
+def main():
+    asyncio.run(check_routing())
+    asyncio.run(check_hedging())
+    asyncio.run(check_failover_and_breaker())
+    asyncio.run(check_streaming())
+    check_blocking()
+    asyncio.run(check_agent())
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All LLM router checks passed")
+
+
+if __name__ == "__main__":
+    main()
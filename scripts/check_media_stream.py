@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Offline check of the Twilio Media Streams session (backend/src/services/media_stream.py),
+driven with the stub providers from replay_media_stream.py.
+
+  - replies are played from the TTS stream as it is synthesized, not after the
+    whole reply; barge-in stops the synthesis
+  - recordings are written in order, in batches, from worker threads
+  - every turn is persisted through ConversationStore to call_logs.full_transcript
+  - the call ends once the goodbye has played, unless the caller talks over it
+
+Usage:
+  python scripts/check_media_stream.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+# A fresh database: the transcript check creates its tables
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="media_stream_check_"), "check.db")
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.core.database import Base, SessionLocal, engine  # noqa: E402
+from src.models import agent, call as call_model, campaign  # noqa: E402,F401
+from src.services.conversation_store import ConversationStore  # noqa: E402
+from src.services.media_stream import MediaStreamSession  # noqa: E402
+from replay_media_stream import StubAgent, StubSTT, StubTTS, recorded_call, synthetic_call  # noqa: E402
+
+START = {"event": "start", "streamSid": "MZ_CHECK", "start": {"streamSid": "MZ_CHECK", "callSid": "CA_CHECK"}}
+
+
+class SlowStreamingTTS:
+    """Streams four 200 ms chunks, 100 ms apart; notes whether the stream was closed early."""
+
+    def __init__(self):
+        self.closed_early = False
+        self.chunks_made = 0
+
+    async def astream(self, text: str, ulaw: bool = True):
+        try:
+            for _ in range(4):
+                await asyncio.sleep(0.1)
+                self.chunks_made += 1
+                yield b"\xff" * 1600
+        except GeneratorExit:
+            self.closed_early = True
+            raise
+
+
+class GoodbyeAgent(StubAgent):
+    """Says goodbye when the caller is done."""
+
+    async def aprocess_response(self, user_input: str, conversation_history) -> str:
+        if "that's all" in user_input.lower():
+            return "Thanks for your time. Goodbye!"
+        return await super().aprocess_response(user_input, conversation_history)
+
+
+class Hangup:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+
+
+class WholeTTS:
+    """Synthesizes 400 ms of audio in one piece."""
+
+    def synthesize_ulaw(self, text: str) -> bytes:
+        return b"\xff" * 3200
+
+
+class Outbox:
+    """Collects what the session sends to Twilio."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def __call__(self, message: dict):
+        self.sent.append((time.perf_counter(), message))
+
+    def events(self, name: str):
+        return [m for _, m in self.sent if m["event"] == name]
+
+
+def session(tts, send, agent=None, **kwargs):
+    return MediaStreamSession(
+        agent=agent or StubAgent(0.0), stt=StubSTT(["Hello"], 0.0), tts=tts, send=send,
+        streaming_stt=False, speculative=False, **kwargs,
+    )
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+async def check_streaming_tts():
+    print("🔊 Streaming synthesis")
+    tts, outbox = SlowStreamingTTS(), Outbox()
+    call = session(tts, outbox)
+    await call.handle_message(START)
+    await call.wait_idle()
+    started = time.perf_counter()
+    first_audio = await call._speak("Tuesday at ten works.")
+    check(f"the first chunk goes out after {(first_audio - started) * 1000:.0f} ms, before synthesis ends",
+          first_audio - started < 0.2)
+    media = outbox.events("media")
+    check("every synthesized chunk is sent, then a mark", len(media) == 8 and outbox.sent[-1][1]["event"] == "mark")
+
+    tts, outbox = SlowStreamingTTS(), Outbox()
+    call = session(tts, outbox)
+    await call.handle_message(START)
+    await call.wait_idle()
+    marks, tts.chunks_made = len(outbox.events("mark")), 0
+    speaking = asyncio.create_task(call._speak("A long answer the caller talks over."))
+    await asyncio.sleep(0.15)
+    await call._barge_in()
+    await speaking
+    check("barge-in stops the synthesis and sends no mark",
+          tts.closed_early and tts.chunks_made < 4 and len(outbox.events("mark")) == marks)
+
+    outbox = Outbox()
+    call = session(WholeTTS(), outbox)
+    await call.handle_message(START)
+    await call.wait_idle()
+    check("providers without astream() are synthesized in one piece",
+          len(outbox.events("media")) == 2 and len(outbox.events("mark")) == 1)
+
+
+async def check_recording():
+    print("📼 Recording")
+    path = os.path.join(tempfile.mkdtemp(prefix="media_stream_check_"), "calls", "call.jsonl")
+    call = session(StubTTS(0.0), Outbox(), record_path=path)
+    writers = []
+    append = call._append_record
+
+    def append_record(lines):
+        writers.append((threading.current_thread() is threading.main_thread(), len(lines)))
+        append(lines)
+
+    call._append_record = append_record
+    messages = list(synthetic_call(1, speech_seconds=0.5, silence_seconds=1.0))
+    for message in messages:
+        if message["event"] == "stop":
+            await call.wait_idle()
+        await call.handle_message(message)
+    check(f"{len(messages)} messages written in {len(writers)} batches", 1 < len(writers) < len(messages) // 10)
+    check("no file writes on the event loop thread", not any(main for main, _ in writers))
+    check("the recording replays every message in order", list(recorded_call(path)) == messages)
+
+
+def echo(mark: str) -> dict:
+    return {"event": "mark", "streamSid": "MZ_CHECK", "mark": {"name": mark}}
+
+
+async def check_end_of_call():
+    print("🏁 Transcript and end of call")
+    Base.metadata.create_all(bind=engine)
+    store = ConversationStore(flush_interval=0.05, session_factory=SessionLocal)
+    outbox, hangup = Outbox(), Hangup()
+    call = session(StubTTS(0.0), outbox, agent=GoodbyeAgent(0.0), hangup=hangup, conversation_store=store)
+    await call.handle_message(START)
+    await call.wait_idle()
+    await call._respond_to_transcript("Tuesday works", end_of_speech=time.perf_counter())
+    greeting_mark, reply_mark = [m["mark"]["name"] for m in outbox.events("mark")]
+    check("an ordinary reply does not end the call",
+          await call.handle_message(echo(greeting_mark)) and await call.handle_message(echo(reply_mark))
+          and hangup.calls == 0)
+
+    await call._respond_to_transcript("That's all, thanks", end_of_speech=time.perf_counter())
+    goodbye_mark = outbox.events("mark")[-1]["mark"]["name"]
+    check("the call stays up while the goodbye plays", hangup.calls == 0 and not call.ended)
+    check("the goodbye's mark ends the call", not await call.handle_message(echo(goodbye_mark))
+          and hangup.calls == 1 and call.ended)
+
+    store.flush()
+    db = SessionLocal()
+    try:
+        transcript = db.query(call_model.CallLog.full_transcript).filter(call_model.CallLog.call_sid == "CA_CHECK").scalar()
+    finally:
+        db.close()
+    check("every turn is in call_logs.full_transcript",
+          transcript is not None and json.loads(transcript) == call.conversation_history
+          and [m["role"] for m in json.loads(transcript)] == ["assistant", "user", "assistant", "user", "assistant"])
+    store.close()
+
+    outbox, hangup = Outbox(), Hangup()
+    call = session(StubTTS(0.0), outbox, agent=GoodbyeAgent(0.0), hangup=hangup)
+    await call.handle_message(START)
+    await call.wait_idle()
+    await call._respond_to_transcript("That's all, thanks", end_of_speech=time.perf_counter())
+    await call._barge_in()
+    marks = [m["mark"]["name"] for m in outbox.events("mark")]
+    # After "clear", Twilio echoes every mark it dropped
+    still_up = [await call.handle_message(echo(mark)) for mark in marks]
+    check("a caller who talks over the goodbye keeps the call", all(still_up) and hangup.calls == 0)
+
+
+def main():
+    asyncio.run(check_streaming_tts())
+    asyncio.run(check_recording())
+    asyncio.run(check_end_of_call())
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All media stream checks passed")
+
+
+if __name__ == "__main__":
+    main()
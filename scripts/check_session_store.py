@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Offline check of the chat session store backends (backend/src/services/session_store.py).
+
+Exercises the in-process store (LRU, idle TTL and memory cap eviction, per-agent
+listing) and the Redis backend against FakeRedis, a small in-memory stand-in for
+the handful of Redis commands the store uses. Pass --redis-url to run the same
+checks against a real server instead.
+
+Usage:
+  python scripts/check_session_store.py
+  python scripts/check_session_store.py --redis-url redis://localhost:6379/15
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import tempfile
+import time
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "session_store_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.services.session_store import InMemorySessionStore, RedisSessionStore  # noqa: E402
+
+
+class FakeRedis:
+    """In-memory subset of the redis.Redis API (decode_responses=True semantics)."""
+
+    def __init__(self):
+        self._values = {}  # key -> (value, expires_at)
+        self._zsets = {}
+
+    def _alive(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._alive(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ex=None):
+        self._values[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self._alive(key) is not None and self._values.pop(key, None) is not None
+            removed += self._zsets.pop(key, None) is not None
+        return removed
+
+    def keys(self, pattern="*"):
+        return [k for k in list(self._values) + list(self._zsets) if fnmatch.fnmatch(k, pattern) and (k in self._zsets or self._alive(k))]
+
+    def zadd(self, key, mapping):
+        self._zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def zrem(self, key, *members):
+        zset = self._zsets.get(key, {})
+        return sum(zset.pop(m, None) is not None for m in members)
+
+    @staticmethod
+    def _bound(value):
+        return {"-inf": float("-inf"), "+inf": float("inf")}.get(value, value)
+
+    def zrangebyscore(self, key, low, high):
+        low, high = self._bound(low), self._bound(high)
+        items = sorted(self._zsets.get(key, {}).items(), key=lambda item: item[1])
+        return [member for member, score in items if low <= score <= high]
+
+    def zremrangebyscore(self, key, low, high):
+        members = self.zrangebyscore(key, low, high)
+        return self.zrem(key, *members) if members else 0
+
+
+def exchange(n: int):
+    return [{"role": "user", "content": f"message {n}"}, {"role": "assistant", "content": f"reply {n}"}]
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def check_common(store):
+    store.save(1, "a", exchange(1))
+    store.save(1, "b", exchange(2) + exchange(3))
+    store.save(2, "a", exchange(4))
+    check("sessions are isolated per agent", store.get(2, "a") == exchange(4))
+    check("listing uses the per-agent index",
+          store.list_sessions(1) == [{"session_id": "a", "message_count": 2}, {"session_id": "b", "message_count": 4}])
+    history = store.get(1, "a")
+    history.append({"role": "user", "content": "not saved"})
+    check("get() returns a copy", len(store.get(1, "a")) == 2)
+    store.save(1, "long", sum((exchange(i) for i in range(50)), []))
+    check("histories are trimmed to max_messages", len(store.get(1, "long")) == store.max_messages)
+    store.save(1, "odd", [{"role": "assistant", "content": "greeting"}] + sum((exchange(i) for i in range(50)), []) + [{"role": "user", "content": "?"}])
+    check("trimming keeps whole exchanges", store.get(1, "odd")[0]["role"] == "user")
+    check("delete() reports removal", store.delete(1, "a") and not store.delete(1, "a"))
+    check("deleted sessions leave the index", [s["session_id"] for s in store.list_sessions(1)] == ["b", "long", "odd"])
+    check("missing sessions read as empty", store.get(3, "nope") == [])
+
+
+def check_memory():
+    print("🧠 InMemorySessionStore")
+    check_common(InMemorySessionStore(max_sessions=100, idle_ttl=60, max_bytes=10_000_000, max_messages=20))
+
+    store = InMemorySessionStore(max_sessions=3, idle_ttl=60, max_bytes=10_000_000, max_messages=20)
+    for name in "abc":
+        store.save(1, name, exchange(0))
+    store.get(1, "a")  # "b" is now the least recently used
+    store.save(1, "d", exchange(0))
+    check("LRU eviction drops the least recently used session",
+          [s["session_id"] for s in store.list_sessions(1)] == ["a", "c", "d"])
+
+    store = InMemorySessionStore(max_sessions=100, idle_ttl=0.2, max_bytes=10_000_000, max_messages=20)
+    store.save(1, "idle", exchange(0))
+    time.sleep(0.3)
+    check("idle sessions expire", store.get(1, "idle") == [] and store.list_sessions(1) == [])
+
+    store = InMemorySessionStore(max_sessions=1000, idle_ttl=60, max_bytes=2_000, max_messages=20)
+    for i in range(100):
+        store.save(1, f"s{i}", exchange(i))
+    check(f"memory cap holds ({store.stats()['bytes']} bytes in {store.stats()['sessions']} sessions)",
+          store.stats()["bytes"] <= 2_000 and store.stats()["evictions"] > 0)
+
+
+def check_redis(client):
+    print("🗄️  RedisSessionStore")
+    for key in client.keys("check:*"):
+        client.delete(key)
+    store = RedisSessionStore(client, idle_ttl=60, max_messages=20, key_prefix="check")
+    check_common(store)
+
+    other_worker = RedisSessionStore(client, idle_ttl=60, max_messages=20, key_prefix="check")
+    store.save(5, "shared", exchange(7))
+    check("a second worker sees the same session", other_worker.get(5, "shared") == exchange(7))
+
+    short = RedisSessionStore(client, idle_ttl=1, max_messages=20, key_prefix="check")
+    short.save(6, "idle", exchange(0))
+    time.sleep(1.2)
+    check("idle sessions expire and leave the index", short.get(6, "idle") == [] and short.list_sessions(6) == [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the chat session store backends offline.")
+    parser.add_argument("--redis-url", help="Run the Redis checks against this server instead of FakeRedis")
+    args = parser.parse_args()
+
+    check_memory()
+    if args.redis_url:
+        import redis
+        check_redis(redis.Redis.from_url(args.redis_url, decode_responses=True))
+    else:
+        check_redis(FakeRedis())
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All session store checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Offline check of speculative LLM generation on interim transcripts
+(backend/src/services/speculative_llm.py).
+
+  - SpeculativeResponder driven by hand with a fake LLM that records every call
+    and cancellation: debouncing, restarts on material changes only, hits, misses,
+    failures and the hit/waste counters
+  - MediaStreamSession with the scripted streaming STT provider from
+    replay_media_stream.py, paced like a live call, with and without speculation:
+    the LLM time left after each endpoint should mostly disappear
+
+Usage:
+  python scripts/check_speculation.py
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "speculation_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.services.media_stream import MediaStreamSession  # noqa: E402
+from src.services.speculative_llm import SpeculationStats, SpeculativeResponder  # noqa: E402
+from replay_media_stream import StubAgent, StubSTT, StubTTS, synthetic_call  # noqa: E402
+
+HISTORY = [{"role": "assistant", "content": "Hi, this is Alex. Is now a good time?"}]
+
+
+class FakeLLM:
+    """Replies after a fixed latency; records started, finished and cancelled calls."""
+
+    def __init__(self, latency: float = 0.1, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.started = []
+        self.finished = []
+        self.cancelled = []
+
+    async def generate(self, text, history):
+        self.started.append(text)
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+        if self.fail:
+            raise ConnectionError("provider unavailable")
+        self.finished.append(text)
+        return f"reply to {text}"
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+async def check_responder():
+    print("🔮 SpeculativeResponder")
+
+    # Interim results arriving faster than the debounce start one LLM call, on the latest text
+    stats, llm = SpeculationStats(), FakeLLM()
+    responder = SpeculativeResponder(debounce_ms=50, stats=stats)
+    for text in ["yes", "yes who", "yes who is this"]:
+        responder.update(text, HISTORY, llm.generate)
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    reply = await responder.commit("Yes, who is this?", HISTORY, llm.generate)
+    check("rapid interim results start a single LLM call", llm.started == ["yes who is this"])
+    check("a final transcript differing only in case/punctuation is a hit",
+          reply == "reply to yes who is this" and stats.hits == 1 and len(llm.started) == 1)
+    check(f"the hit saved the whole LLM call ({stats.saved_ms:.0f} ms)", stats.saved_ms >= 90)
+
+    # Fillers and punctuation do not restart; new words do
+    stats, llm = SpeculationStats(), FakeLLM(latency=0.2)
+    responder = SpeculativeResponder(debounce_ms=0, stats=stats)
+    responder.update("Tuesday works", HISTORY, llm.generate)
+    await asyncio.sleep(0.05)
+    responder.update("um, Tuesday works.", HISTORY, llm.generate)
+    await asyncio.sleep(0.05)
+    check("fillers and punctuation do not restart the speculation", llm.started == ["Tuesday works"])
+    check("speculating_on() matches equivalent transcripts only",
+          responder.speculating_on("Tuesday, works!") and not responder.speculating_on("Tuesday works fine"))
+    responder.update("Tuesday works but not before noon", HISTORY, llm.generate)
+    await asyncio.sleep(0.01)
+    check("a material change cancels and restarts it", llm.cancelled == ["Tuesday works"] and len(llm.started) == 2)
+    check(f"the discarded call counts as waste ({stats.wasted_ms:.0f} ms)",
+          stats.discarded == 1 and 80 <= stats.wasted_ms <= 200)
+    reply = await responder.commit("Tuesday works but not before noon", HISTORY, llm.generate)
+    check("the restarted speculation is committed", reply.endswith("not before noon") and stats.hits == 1)
+
+    # A final transcript that differs from the speculation is generated from scratch
+    stats, llm = SpeculationStats(), FakeLLM(latency=0.05)
+    responder = SpeculativeResponder(debounce_ms=0, stats=stats)
+    responder.update("I'm not", HISTORY, llm.generate)
+    await asyncio.sleep(0.01)
+    reply = await responder.commit("I'm not interested", HISTORY, llm.generate)
+    check("a mismatching final transcript misses and generates again",
+          reply == "reply to I'm not interested" and stats.misses == 1 and stats.discarded == 1
+          and llm.cancelled == ["I'm not"])
+
+    # The history moving on invalidates a speculation even for the same words
+    stats, llm = SpeculationStats(), FakeLLM(latency=0.02)
+    responder = SpeculativeResponder(debounce_ms=0, stats=stats)
+    responder.update("yes", HISTORY, llm.generate)
+    await asyncio.sleep(0.05)
+    longer = HISTORY + [{"role": "user", "content": "hello"}, {"role": "assistant", "content": "Hi again"}]
+    await responder.commit("yes", longer, llm.generate)
+    check("a changed history is a miss", stats.misses == 1 and stats.hits == 0 and len(llm.started) == 2)
+
+    # A failed speculation falls back to a normal generation
+    stats, failing = SpeculationStats(), FakeLLM(latency=0.01, fail=True)
+    responder = SpeculativeResponder(debounce_ms=0, stats=stats)
+    responder.update("yes", HISTORY, failing.generate)
+    await asyncio.sleep(0.05)
+    reply = await responder.commit("yes", HISTORY, FakeLLM(latency=0.01).generate)
+    check("a failed speculation is regenerated", reply == "reply to yes" and stats.misses == 1)
+
+    # Hanging up cancels whatever is running
+    stats, llm = SpeculationStats(), FakeLLM(latency=0.2)
+    responder = SpeculativeResponder(debounce_ms=0, stats=stats)
+    responder.update("let me think", HISTORY, llm.generate)
+    await asyncio.sleep(0.01)
+    responder.cancel()
+    await asyncio.sleep(0.01)
+    check("cancel() stops the running call", llm.cancelled == ["let me think"] and stats.discarded == 1)
+
+
+async def run_call(speculative: bool, llm_latency: float):
+    async def send(message: dict):
+        if message["event"] == "mark":
+            session._pending_marks.discard(message["mark"]["name"])
+
+    stats = SpeculationStats()
+    session = MediaStreamSession(
+        agent=StubAgent(llm_latency),
+        stt=StubSTT(["Yes, who is this?", "Tuesday works for me"], latency=0),
+        tts=StubTTS(0),
+        send=send,
+        streaming_stt=True,
+        speculative=speculative,
+    )
+    if speculative:
+        session.speculator = SpeculativeResponder(debounce_ms=100, stats=stats)
+    for message in synthetic_call(2):
+        if message.get("event") == "stop":
+            await session.wait_idle()
+        await session.handle_message(message)
+        # Media frames are 20 ms apart on a real call
+        await asyncio.sleep(0.02 if message.get("event") == "media" else 0)
+    return session, stats
+
+
+async def check_media_stream():
+    print("📞 MediaStreamSession with speculation")
+    llm_latency = 0.3
+    baseline, _ = await run_call(speculative=False, llm_latency=llm_latency)
+    session, stats = await run_call(speculative=True, llm_latency=llm_latency)
+
+    users = [turn["content"] for turn in session.conversation_history if turn["role"] == "user"]
+    check("the conversation is unchanged", users == ["Yes, who is this?", "Tuesday works for me"]
+          and session.conversation_history == baseline.conversation_history)
+    before = [m["llm_ms"] for m in baseline.turn_metrics]
+    after = [m["llm_ms"] for m in session.turn_metrics]
+    check(f"LLM time after the endpoint drops from {before} ms to {after} ms",
+          all(a < b / 2 for a, b in zip(after, before)))
+    summary = stats.stats()
+    check(f"counters: {summary}", summary["hits"] == 2 and summary["saved_ms"] > llm_latency * 1000)
+
+
+def main():
+    random.seed(3)
+    asyncio.run(check_responder())
+    asyncio.run(check_media_stream())
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All speculation checks passed")
+
+
+if __name__ == "__main__":
+    main()
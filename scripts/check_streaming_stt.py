@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Offline check of the streaming STT sessions (backend/src/services/streaming_stt.py).
+
+  - DeepgramStreamingSession against FakeDeepgramSocket, which records what the
+    session sends and answers with scripted Deepgram live-API messages
+  - BufferedStreamingSession (the Gemini path) with a stub transcribe_buffer()
+  - MediaStreamSession in streaming mode, driven by the scripted streaming provider
+    from replay_media_stream.py
+
+Usage:
+  python scripts/check_streaming_stt.py
+"""
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "streaming_stt_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.services.media_stream import MediaStreamSession  # noqa: E402
+from src.services.streaming_stt import (  # noqa: E402
+    ENDPOINT, FINAL, INTERIM, BufferedStreamingSession, DeepgramStreamingSession,
+)
+from src.utils.audio_helpers import pcm16_to_ulaw  # noqa: E402
+from replay_media_stream import FRAME_SAMPLES, StubAgent, StubSTT, StubTTS, synthetic_call  # noqa: E402
+
+
+def results(text: str, is_final: bool = False, speech_final: bool = False) -> str:
+    return json.dumps({
+        "type": "Results",
+        "is_final": is_final,
+        "speech_final": speech_final,
+        "channel": {"alternatives": [{"transcript": text, "confidence": 0.98}]},
+    })
+
+
+class FakeDeepgramSocket:
+    """Stands in for the websockets connection: records sends, replays scripted messages."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.sent = []
+        self.url = None
+        self.headers = None
+        self._inbox = asyncio.Queue()
+
+    async def connect(self, url, additional_headers=None):
+        self.url, self.headers = url, additional_headers
+        return self
+
+    async def send(self, data):
+        self.sent.append(data)
+        if isinstance(data, bytes) and self.script:
+            # One scripted reply per audio chunk, like results trailing the audio
+            self._inbox.put_nowait(self.script.pop(0))
+        elif isinstance(data, str) and json.loads(data).get("type") == "CloseStream":
+            for message in self.script:
+                self._inbox.put_nowait(message)
+            self._inbox.put_nowait(None)
+
+    async def close(self):
+        self._inbox.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self._inbox.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+async def collect(session):
+    return [event async for event in session.events()]
+
+
+def noise_frame() -> bytes:
+    return struct.pack(f"<{FRAME_SAMPLES}h", *(random.randint(-6000, 6000) for _ in range(FRAME_SAMPLES)))
+
+
+SILENCE_FRAME = b"\x00\x00" * FRAME_SAMPLES
+
+
+async def check_deepgram():
+    print("🌐 DeepgramStreamingSession")
+    socket = FakeDeepgramSocket([
+        results("yes"),
+        results("yes who is"),
+        results("Yes, who is this?", is_final=True),
+        results("", is_final=True, speech_final=True),
+        results("tuesday"),
+        results("Tuesday works.", is_final=True),
+        json.dumps({"type": "UtteranceEnd", "last_word_end": 3.1}),
+        json.dumps({"type": "Metadata"}),
+    ])
+    session = DeepgramStreamingSession(api_key="dg-key", model="nova-2", connect=socket.connect)
+    await session.start()
+    consumer = asyncio.create_task(collect(session))
+    for _ in range(5):
+        await session.send_audio(b"\xff" * 160)
+        await asyncio.sleep(0)
+    await session.finish()
+    events = await consumer
+
+    check("connects with interim results, endpointing and the API key",
+          "interim_results=true" in socket.url and "endpointing=" in socket.url
+          and "encoding=mulaw" in socket.url and socket.headers == {"Authorization": "Token dg-key"})
+    check("audio goes out as binary frames, then CloseStream",
+          sum(isinstance(m, bytes) for m in socket.sent) == 5 and json.loads(socket.sent[-1]) == {"type": "CloseStream"})
+    check("interim results become interim events",
+          [e.text for e in events if e.type == INTERIM] == ["yes", "yes who is", "tuesday"])
+    check("speech_final ends the first utterance",
+          [(e.type, e.text) for e in events][2:4] == [(FINAL, "Yes, who is this?"), (ENDPOINT, "Yes, who is this?")])
+    check("UtteranceEnd ends the second utterance",
+          [(e.type, e.text) for e in events][-1] == (ENDPOINT, "Tuesday works."))
+
+
+async def check_buffered():
+    print("📦 BufferedStreamingSession")
+    clips = []
+
+    def transcribe_buffer(wav: bytes, mimetype: str) -> str:
+        clips.append(wav)
+        return f"utterance {len(clips)}"
+
+    session = BufferedStreamingSession(transcribe_buffer, speech_threshold=500, end_of_speech_ms=300, min_speech_ms=200)
+    consumer = asyncio.create_task(collect(session))
+    frames = [noise_frame()] * 3 + [SILENCE_FRAME] * 40           # 60 ms of noise: ignored
+    frames += [noise_frame()] * 25 + [SILENCE_FRAME] * 20         # 500 ms of speech
+    frames += [noise_frame()] * 15                                # cut off by the end of the stream
+    for frame in frames:
+        await session.send_audio(pcm16_to_ulaw(frame))
+    await session.finish()
+    events = await consumer
+
+    check("short noise bursts are not transcribed", len(clips) == 2)
+    check("the utterance clip holds pre-roll, the speech and the endpoint silence",
+          abs((len(clips[0]) - 44) / 2 / 8000 - 1.0) < 0.03)
+    check("each utterance yields final + endpoint, including the one cut off by finish()",
+          [(e.type, e.text) for e in events] == [
+              (FINAL, "utterance 1"), (ENDPOINT, "utterance 1"), (FINAL, "utterance 2"), (ENDPOINT, "utterance 2"),
+          ])
+
+
+async def check_media_stream():
+    print("📞 MediaStreamSession with streaming STT")
+    sent = []
+
+    async def send(message: dict):
+        sent.append(message)
+        if message["event"] == "mark":
+            # Playback is instant offline: echo the mark as Twilio would once it was heard
+            session._pending_marks.discard(message["mark"]["name"])
+
+    stt = StubSTT(["Yes, who is this?", "Tuesday works for me"], latency=0)
+    session = MediaStreamSession(
+        agent=StubAgent(0.01), stt=stt, tts=StubTTS(0), send=send, streaming_stt=True,
+    )
+    interims = []
+    for message in synthetic_call(2):
+        if message.get("event") == "stop":
+            await session.wait_idle()
+        await session.handle_message(message)
+        if session.interim_transcript and session.interim_transcript not in interims:
+            interims.append(session.interim_transcript)
+        await asyncio.sleep(0)
+
+    users = [turn["content"] for turn in session.conversation_history if turn["role"] == "user"]
+    check("interim transcripts are visible while the caller speaks", "Yes, who" in interims)
+    check("each endpoint produces one agent turn", users == ["Yes, who is this?", "Tuesday works for me"])
+    check("no local transcription time is spent", all(m["stt_ms"] == 0 for m in session.turn_metrics))
+
+
+def main():
+    random.seed(7)
+    asyncio.run(check_deepgram())
+    asyncio.run(check_buffered())
+    asyncio.run(check_media_stream())
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All streaming STT checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Offline check of TTLCache.get_or_create (backend/src/utils/cache.py) under contention.
+
+  - concurrent misses on one key run the factory once
+  - when the first factory call raises, the threads already waiting retry one at a
+    time, and threads arriving later share the same per-key lock, so the factory
+    never runs twice at once
+  - per-key locks are dropped once nobody holds or waits on them
+
+Usage:
+  python scripts/check_ttl_cache.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.utils.cache import TTLCache  # noqa: E402
+
+
+class Factory:
+    """Slow factory that records how many calls overlap; the first `failures` calls raise."""
+
+    def __init__(self, failures: int = 0, delay: float = 0.05):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            call = self.calls
+        try:
+            time.sleep(self.delay)
+            if call <= self.failures:
+                raise ConnectionError("provider unavailable")
+            return f"client {call}"
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def hammer(cache: TTLCache, factory: Factory, threads: int, stagger: float = 0.0):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(cache.get_or_create("llm", factory))
+        except ConnectionError as e:
+            errors.append(e)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+        time.sleep(stagger)
+    for thread in pool:
+        thread.join()
+    return results, errors
+
+
+def main():
+    print("🔒 TTLCache.get_or_create")
+    cache, factory = TTLCache(maxsize=8), Factory()
+    results, _ = hammer(cache, factory, threads=20)
+    check("concurrent misses build the value once", factory.calls == 1 and set(results) == {"client 1"})
+
+    # Threads keep arriving while the first (failing) factory call is still running
+    cache, factory = TTLCache(maxsize=8), Factory(failures=1)
+    results, errors = hammer(cache, factory, threads=20, stagger=0.005)
+    check(f"a failed build is retried without overlapping calls (max {factory.max_running} at once)",
+          factory.max_running == 1)
+    check("only the failing caller sees the error; everyone else shares the retry",
+          len(errors) == 1 and factory.calls == 2 and set(results) == {"client 2"})
+    check("per-key locks are released", not cache._key_locks)
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All TTL cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Offline check of the content-addressed TTS audio cache (backend/src/services/tts_cache.py).
+
+Drives TTSService with FakeElevenLabs, a stand-in client that returns deterministic
+audio and counts how often it was asked to synthesize, and checks that:
+  - repeated phrases are synthesized once and then served from disk
+  - voice, model, voice settings and output format all change the cache key
+  - concurrent requests for the same phrase synthesize it once; when synthesis fails,
+    waiting and later requests retry one at a time, never in parallel
+  - a synthesis that fails half-way leaves no partial file behind
+  - the sweeper evicts least recently used files down to the size limit
+  - stream()/astream() yield chunks as they arrive, convert PCM to u-law on the fly,
+    fill the cache only when a stream completes and replay hits from disk
+
+Usage:
+  python scripts/check_tts_cache.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "tts_cache_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from src.services.tts_cache import TTSAudioCache  # noqa: E402
+from src.services.tts_service import TTSService  # noqa: E402
+
+
+class FakeTextToSpeech:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.fail_after_first_chunk = False
+        self._lock = threading.Lock()
+
+    def convert(self, voice_id, model_id, text, voice_settings, output_format="mp3_44100_128"):
+        with self._lock:
+            self.calls += 1
+        fail = self.fail_after_first_chunk
+
+        def chunks():
+            time.sleep(self.latency)
+            audio = f"{output_format}|{voice_id}|{model_id}|{text}".encode("utf-8") * 64
+            yield audio[:len(audio) // 2]
+            if fail:
+                raise ConnectionError("stream interrupted")
+            yield audio[len(audio) // 2:]
+
+        return chunks()
+
+    def stream(self, voice_id, model_id, text, voice_settings, output_format="mp3_44100_128"):
+        with self._lock:
+            self.calls += 1
+        if output_format.startswith("pcm_"):
+            # One second of a 16-bit tone, delivered in odd-sized pieces that split samples
+            rate = int(output_format.split("_")[1])
+            samples = (np.sin(2 * np.pi * 440 * np.arange(rate) / rate) * 8000).astype("<i2").tobytes()
+            pieces = [samples[i:i + 1001] for i in range(0, len(samples), 1001)]
+        else:
+            audio = f"{output_format}|{voice_id}|{model_id}|{text}".encode("utf-8") * 64
+            pieces = [audio[i:i + 500] for i in range(0, len(audio), 500)]
+        for piece in pieces:
+            time.sleep(self.latency)
+            yield piece
+
+
+class FakeElevenLabs:
+    """Offline stand-in for elevenlabs.client.ElevenLabs (text_to_speech.convert and .stream)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.text_to_speech = FakeTextToSpeech(latency)
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def files_in(directory: str):
+    return sorted(os.path.join(root, name) for root, _, names in os.walk(directory) for name in names)
+
+
+def check_reuse(directory: str):
+    print("🔁 Reuse")
+    cache = TTSAudioCache(directory=directory, max_bytes=10_000_000, sweep_interval=3600)
+    client = FakeElevenLabs()
+    tts = TTSService(voice_id="voice-a", client=client, cache=cache)
+
+    first = tts.synthesize_file("Perfect, you're booked.")
+    second = tts.synthesize_file("Perfect, you're booked.")
+    check("a repeated phrase is synthesized once", client.text_to_speech.calls == 1 and first == second)
+
+    output_path = os.path.join(directory, "copy.mp3")
+    tts.synthesize("Perfect, you're booked.", output_path)
+    with open(first, "rb") as cached, open(output_path, "rb") as copied:
+        check("synthesize() copies the cached audio to the caller's path", cached.read() == copied.read())
+    os.remove(output_path)
+
+    ulaw_a = tts.synthesize_ulaw("Perfect, you're booked.")
+    ulaw_b = tts.synthesize_ulaw("Perfect, you're booked.")
+    check("u-law output is cached separately from MP3", client.text_to_speech.calls == 2 and ulaw_a == ulaw_b)
+
+    other_voice = TTSService(voice_id="voice-b", client=client, cache=cache)
+    other_voice.synthesize_file("Perfect, you're booked.")
+    other_model = TTSService(voice_id="voice-a", client=client, cache=cache)
+    other_model.model_id = "another-model"
+    other_model.synthesize_file("Perfect, you're booked.")
+    other_settings = TTSService(voice_id="voice-a", client=client, cache=cache)
+    other_settings.voice_settings["stability"] = 0.9
+    other_settings.synthesize_file("Perfect, you're booked.")
+    check("voice, model and voice settings are part of the key", client.text_to_speech.calls == 5)
+
+    stats = cache.stats()
+    check(f"hit/miss counters ({stats['hits']} hits, {stats['misses']} misses)",
+          stats["hits"] == 3 and stats["misses"] == 5 and stats["writes"] == 5)
+
+
+def check_concurrency(directory: str):
+    print("🧵 Concurrency")
+    cache = TTSAudioCache(directory=directory, max_bytes=10_000_000, sweep_interval=3600)
+    client = FakeElevenLabs(latency=0.05)
+    tts = TTSService(voice_id="voice-a", client=client, cache=cache)
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(tts.synthesize_file("I'll have someone call you back.")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("8 concurrent requests synthesize the phrase once",
+          client.text_to_speech.calls == 1 and len(set(paths)) == 1)
+
+    # The first synthesis fails while more requests keep arriving
+    calls, running, max_running = [0], [0], [0]
+    lock = threading.Lock()
+
+    def flaky_synthesize():
+        with lock:
+            calls[0] += 1
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+            call = calls[0]
+        try:
+            time.sleep(0.05)
+            if call == 1:
+                raise ConnectionError("ElevenLabs unavailable")
+            return [b"audio"]
+        finally:
+            with lock:
+                running[0] -= 1
+
+    results = []
+
+    def request():
+        try:
+            results.append(cache.get_or_create("flaky", "mp3", flaky_synthesize))
+        except ConnectionError:
+            results.append(None)
+
+    threads = []
+    for _ in range(8):
+        threads.append(threading.Thread(target=request))
+        threads[-1].start()
+        time.sleep(0.01)  # Some arrive while the failing synthesis is still running
+    for thread in threads:
+        thread.join()
+    check(f"after a failed synthesis, requests retry one at a time ({max_running[0]} at once)", max_running[0] == 1)
+    check(f"the first successful retry serves everyone else ({calls[0]} syntheses)",
+          calls[0] == 2 and results.count(None) == 1 and len(set(filter(None, results))) == 1)
+    check("per-key locks are dropped once nobody waits on them", cache._key_locks == {})
+
+
+def check_atomic_writes(directory: str):
+    print("🧱 Atomic writes")
+    cache = TTSAudioCache(directory=directory, max_bytes=10_000_000, sweep_interval=3600)
+    client = FakeElevenLabs()
+    tts = TTSService(voice_id="voice-a", client=client, cache=cache)
+    client.text_to_speech.fail_after_first_chunk = True
+    try:
+        tts.synthesize_file("This stream breaks.")
+        failed = False
+    except ConnectionError:
+        failed = True
+    check("the synthesis error reaches the caller", failed)
+    check("no partial or temporary file is left behind", files_in(directory) == [])
+    client.text_to_speech.fail_after_first_chunk = False
+    path = tts.synthesize_file("This stream breaks.")
+    check("the next request synthesizes it again", client.text_to_speech.calls == 2 and os.path.exists(path))
+
+
+def check_eviction(directory: str):
+    print("🧹 Eviction")
+    client = FakeElevenLabs()
+    probe = TTSAudioCache(directory=os.path.join(directory, "probe"), max_bytes=10_000_000, sweep_interval=3600)
+    size = os.path.getsize(TTSService(voice_id="v", client=client, cache=probe).synthesize_file("phrase 00"))
+
+    cache = TTSAudioCache(directory=os.path.join(directory, "lru"), max_bytes=size * 5, sweep_interval=3600)
+    tts = TTSService(voice_id="v", client=client, cache=cache)
+    paths = []
+    for i in range(10):
+        paths.append(tts.synthesize_file(f"phrase {i:02d}"))
+        # Distinct mtimes so the LRU order is unambiguous
+        os.utime(paths[-1], (1_000_000 + i, 1_000_000 + i))
+    tts.synthesize_file("phrase 00")  # a hit makes the oldest file the most recently used
+
+    removed = cache.sweep()
+    remaining = files_in(cache.directory)
+    check(f"sweep() brings the cache under max_bytes ({removed} files evicted)",
+          sum(os.path.getsize(p) for p in remaining) <= cache.max_bytes)
+    check("the recently hit file survives", paths[0] in remaining)
+    check("the least recently used files go first", paths[1] not in remaining and paths[9] in remaining)
+
+    stale = os.path.join(cache.directory, "ab", "stale.mp3.0123.tmp")
+    os.makedirs(os.path.dirname(stale), exist_ok=True)
+    open(stale, "wb").close()
+    os.utime(stale, (1_000_000, 1_000_000))
+    cache.sweep()
+    check("abandoned temporary files are removed", not os.path.exists(stale))
+
+
+def check_streaming(directory: str):
+    print("🌊 Streaming")
+    cache = TTSAudioCache(directory=directory, max_bytes=10_000_000, sweep_interval=3600)
+    client = FakeElevenLabs(latency=0.01)
+    tts = TTSService(voice_id="voice-a", client=client, cache=cache)
+
+    started = time.perf_counter()
+    stream = tts.stream("Let me check the calendar for you.")
+    first = next(stream)
+    first_ms = (time.perf_counter() - started) * 1000
+    rest = b"".join(stream)
+    total_ms = (time.perf_counter() - started) * 1000
+    check(f"the first chunk arrives before synthesis ends ({first_ms:.0f} ms vs {total_ms:.0f} ms)",
+          first and first_ms < total_ms / 2)
+    replay = b"".join(tts.stream("Let me check the calendar for you."))
+    check("a completed stream is cached and replayed from disk",
+          client.text_to_speech.calls == 1 and replay == first + rest)
+
+    abandoned = tts.stream("I was interrupted.")
+    next(abandoned)
+    abandoned.close()
+    check("an abandoned stream is not cached",
+          not any(p.endswith(".tmp") for p in files_in(directory))
+          and cache.get(tts._cache_key("I was interrupted.", "mp3"), "mp3") is None)
+
+    ulaw = b"".join(tts.stream("One second of tone.", ulaw=True))
+    decoded = np.frombuffer(bytes(ulaw), dtype=np.uint8)
+    check(f"PCM is converted to 8 kHz u-law on the fly ({len(ulaw)} bytes for 1 s)",
+          abs(len(ulaw) - 8000) <= 16 and 0x7f not in decoded[100:-100])
+
+    async def collect():
+        return [chunk async for chunk in tts.astream("Async please.")]
+
+    chunks = asyncio.run(collect())
+    check(f"astream() yields the same chunks ({len(chunks)} chunks)",
+          len(chunks) > 1 and b"".join(chunks) == b"".join(tts.stream("Async please.")))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        check_reuse(os.path.join(directory, "reuse"))
+        check_concurrency(os.path.join(directory, "concurrency"))
+        check_atomic_writes(os.path.join(directory, "atomic"))
+        check_eviction(os.path.join(directory, "eviction"))
+        check_streaming(os.path.join(directory, "streaming"))
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All TTS cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Offline check of the voice activity detector (backend/src/utils/vad.py) against a
+labeled set of synthetic 8 kHz clips.
+
+Each clip is a list of segments with a known label per 20 ms frame:
+  - voiced speech: harmonics of a wandering pitch under a syllable-rate envelope
+  - fricatives: loud high-frequency noise ("s", "f"), which must count as speech
+  - background noise at several levels, alone and under speech (SNR 20 and 10 dB)
+  - mains hum and isolated clicks, which must not
+
+and checks:
+  - frame accuracy, missed speech and false alarms per clip
+  - end-of-utterance latency against MEDIA_STREAM_END_OF_SPEECH_MS, and that short
+    pauses between words do not split an utterance
+  - barge-in fires on sustained speech but not on a cough or clicks, and makes
+    MediaStreamSession send "clear" only while agent audio is still playing
+  - silence trimming of clips and WAV files
+
+Usage:
+  python scripts/check_vad.py
+  python scripts/check_vad.py --verbose      # per-clip confusion counts
+"""
+import argparse
+import asyncio
+import base64
+import io
+import os
+import sys
+import tempfile
+import wave
+
+import numpy as np
+
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "check")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "vad_check.db"))
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.core.config import settings  # noqa: E402
+from src.services.media_stream import MediaStreamSession  # noqa: E402
+from src.utils.audio_helpers import pcm16_to_ulaw, pcm16_to_wav_bytes  # noqa: E402
+from src.utils.vad import (  # noqa: E402
+    BARGE_IN, SPEECH_END, SPEECH_START, StreamingVAD, VoiceActivityDetector, trim_wav_silence,
+)
+
+RATE = 8000
+FRAME_MS = 20
+FRAME = RATE * FRAME_MS // 1000
+rng = np.random.default_rng(21)
+
+
+# --- Labeled clips --------------------------------------------------------
+
+def voiced(seconds: float, level: float = 4000) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, 6))
+    phase = 2 * np.pi * np.cumsum(pitch) / RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    # Syllables: the envelope never drops below ~40% inside a word
+    envelope = 0.7 + 0.3 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, 6))
+    signal = signal * envelope
+    return signal / np.sqrt(np.mean(signal ** 2)) * level
+
+
+def fricative(seconds: float, level: float = 2500) -> np.ndarray:
+    noise = np.diff(rng.normal(0, 1, int(seconds * RATE) + 1))  # Tilted towards high frequencies
+    return noise / np.sqrt(np.mean(noise ** 2)) * level
+
+
+def noise(seconds: float, level: float) -> np.ndarray:
+    return rng.normal(0, level, int(seconds * RATE))
+
+
+def hum(seconds: float, level: float = 300) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.sqrt(2) * level * np.sin(2 * np.pi * 60 * t)
+
+
+def clicks(seconds: float, count: int = 4) -> np.ndarray:
+    x = np.zeros(int(seconds * RATE))
+    x[rng.choice(x.size, count, replace=False)] = 20000
+    return x
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE))
+
+
+def build(segments, background: float = 0.0):
+    """segments: [(samples, is_speech)] -> (int16 pcm, per-frame labels)"""
+    pcm = np.concatenate([samples for samples, _ in segments])
+    labels = np.concatenate([np.full(samples.size // FRAME, label) for samples, label in segments])
+    if background:
+        pcm = pcm + rng.normal(0, background, pcm.size)
+    return np.clip(pcm, -32768, 32767).astype(np.int16), labels
+
+
+def clip_set():
+    speech_level = 4000
+    return {
+        "quiet line": build([(silence(1), False), (voiced(1.5), True), (silence(1), False), (voiced(1), True), (silence(1), False)]),
+        "fricatives": build([(silence(1), False), (fricative(0.2), True), (voiced(0.8), True), (fricative(0.3), True), (silence(1), False)]),
+        "noise 150 rms": build([(noise(2, 150), False)]),
+        "noise 800 rms": build([(noise(3, 800), False)]),
+        "hum": build([(hum(2), False)]),
+        "clicks": build([(clicks(2), False)]),
+        "SNR 20 dB": build([(silence(1), False), (voiced(1.5, speech_level), True), (silence(1), False)], background=speech_level / 10),
+        "SNR 10 dB": build([(silence(1), False), (voiced(1.5, speech_level), True), (silence(1), False)], background=speech_level / 3.16),
+    }
+
+
+# --- Checks -----------------------------------------------------------------
+
+def check(label: str, condition: bool):
+    print(f"  {'✅' if condition else '❌'} {label}")
+    if not condition:
+        check.failures += 1
+
+
+check.failures = 0
+
+
+def check_labels(verbose: bool):
+    print("🏷️  Frame labels")
+    detector = VoiceActivityDetector()
+    tolerance = detector.hangover_frames + 1
+    totals = np.zeros(4, dtype=int)
+    for name, (pcm, labels) in clip_set().items():
+        predicted = detector.label(pcm)[: labels.size]
+        # Frames just after speech ends are covered by the hangover on purpose
+        after_speech = np.convolve(labels.astype(float), np.ones(tolerance))[: labels.size] > 0
+        tp = int(np.sum(predicted & labels))
+        fn = int(np.sum(~predicted & labels))
+        fp = int(np.sum(predicted & ~labels & ~after_speech))
+        tn = int(np.sum(~predicted & ~labels & ~after_speech))
+        totals += (tp, fn, fp, tn)
+        if verbose:
+            print(f"     {name:<14} tp={tp:4d} fn={fn:4d} fp={fp:4d} tn={tn:4d}")
+        if not labels.any():
+            check(f"{name}: no false alarms ({fp} frames)", fp == 0)
+        else:
+            recall = tp / max(1, tp + fn)
+            check(f"{name}: {recall:.0%} of speech frames detected, {fp} false alarms", recall >= 0.95 and fp <= 2)
+    tp, fn, fp, tn = totals
+    check(f"overall frame accuracy {(tp + tn) / totals.sum():.1%}", (tp + tn) / totals.sum() >= 0.97)
+
+
+def run_stream(pcm: np.ndarray, vad: StreamingVAD):
+    """Feed 20 ms frames; returns [(event, time_ms)]."""
+    events = []
+    for i in range(pcm.size // FRAME):
+        for event in vad.process(pcm[i * FRAME:(i + 1) * FRAME]):
+            events.append((event, (i + 1) * FRAME_MS))
+    return events
+
+
+def check_endpointing():
+    print("⏹️  End of utterance")
+    end_ms = settings.MEDIA_STREAM_END_OF_SPEECH_MS
+    pcm, _ = build([(silence(1), False), (voiced(0.6), True), (silence(0.3), False), (voiced(0.8), True), (silence(2), False)])
+    events = run_stream(pcm, StreamingVAD())
+    ends = [(event, at) for event, at in events if event.type == SPEECH_END]
+    check("a 300 ms pause between words does not split the utterance", len(ends) == 1)
+    if ends:
+        latency = ends[0][1] - 2700
+        check(f"end of utterance {latency} ms after the last word (MEDIA_STREAM_END_OF_SPEECH_MS={end_ms})",
+              end_ms - FRAME_MS <= latency <= end_ms + 2 * FRAME_MS)
+        check(f"the utterance audio keeps the first syllable ({len(ends[0][0].audio) / 2 / RATE:.2f}s)",
+              len(ends[0][0].audio) / 2 / RATE >= 1.7 + end_ms / 1000)
+    starts = [at for event, at in events if event.type == SPEECH_START]
+    check(f"speech start detected {starts[0] - 1000 if starts else '-'} ms after onset",
+          bool(starts) and starts[0] - 1000 <= settings.VAD_SPEECH_START_MS + FRAME_MS)
+
+    pcm, _ = build([(silence(0.5), False), (voiced(1), True), (silence(1.5), False)], background=800)
+    vad = StreamingVAD()
+    ends = [event for event, _ in run_stream(pcm, vad) if event.type == SPEECH_END]
+    check(f"noisy line: one utterance, noise floor settles at {vad.noise_floor:.0f} rms", len(ends) == 1)
+
+
+def check_barge_in():
+    print("✋ Barge-in")
+    barge_ms = settings.VAD_BARGE_IN_MS
+    pcm, _ = build([(silence(0.5), False), (voiced(1), True), (silence(1), False)])
+    fired = [at for event, at in run_stream(pcm, StreamingVAD()) if event.type == BARGE_IN]
+    check(f"sustained speech barges in after {fired[0] - 500 if fired else '-'} ms (VAD_BARGE_IN_MS={barge_ms})",
+          len(fired) == 1 and barge_ms - FRAME_MS <= fired[0] - 500 <= barge_ms + settings.VAD_SPEECH_START_MS + FRAME_MS)
+
+    pcm, _ = build([(silence(0.5), False), (voiced(0.12), True), (silence(0.5), False), (clicks(1), False), (silence(0.5), False)])
+    events = run_stream(pcm, StreamingVAD())
+    check("a cough and clicks neither barge in nor end an utterance",
+          not [e for e, _ in events if e.type in (BARGE_IN, SPEECH_END)])
+
+    async def talk_over_agent(playing: bool, barge_in: bool = True):
+        sent = []
+
+        async def send(message: dict):
+            sent.append(message)
+
+        session = MediaStreamSession(agent=None, stt=None, tts=None, send=send, streaming_stt=False, barge_in=barge_in)
+        session.stream_sid, session.call_sid = "MZ_CHECK", "CA_CHECK"
+        if playing:
+            session._pending_marks.add("turn-1")
+        pcm, _ = build([(voiced(0.5), True)])
+        ulaw = pcm16_to_ulaw(pcm.tobytes())
+        for offset in range(0, len(ulaw), FRAME):
+            await session.handle_message({"event": "media", "media": {"payload": _b64(ulaw[offset:offset + FRAME])}})
+        return session, sent
+
+    session, sent = asyncio.run(talk_over_agent(playing=True))
+    check("talking over agent audio sends one \"clear\" to Twilio",
+          [m["event"] for m in sent] == ["clear"] and sent[0]["streamSid"] == "MZ_CHECK"
+          and session.barge_ins == 1 and not session.agent_speaking)
+    session, sent = asyncio.run(talk_over_agent(playing=False))
+    check("speech while the agent is silent is not a barge-in", sent == [] and session.barge_ins == 0)
+    session, sent = asyncio.run(talk_over_agent(playing=True, barge_in=False))
+    check("MEDIA_STREAM_BARGE_IN=False leaves the agent talking", sent == [] and session.agent_speaking)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def check_trimming():
+    print("✂️  Silence trimming")
+    detector = VoiceActivityDetector()
+    pcm, _ = build([(silence(1.5), False), (voiced(1), True), (silence(2), False)])
+    trimmed = detector.trim(pcm, padding_ms=150)
+    seconds = len(trimmed) / 2 / RATE
+    hangover = detector.hangover_frames * FRAME_MS / 1000
+    check(f"4.5s clip trimmed to {seconds:.2f}s around 1s of speech", 1.0 <= seconds <= 1.0 + 0.3 + hangover + 0.04)
+    check("silence-only clips trim to nothing", detector.trim(noise(2, 150).astype(np.int16)) == b"")
+
+    wav = pcm16_to_wav_bytes(pcm.tobytes(), RATE)
+    trimmed_wav = trim_wav_silence(wav)
+    with wave.open(io.BytesIO(trimmed_wav), "rb") as w:
+        ok = w.getframerate() == RATE and w.getnframes() == len(trimmed) // 2
+    check(f"WAV clips are trimmed and rewritten ({len(wav)} -> {len(trimmed_wav)} bytes)", ok)
+    check("non-WAV input passes through untouched", trim_wav_silence(b"ID3 not a wav") == b"ID3 not a wav")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the voice activity detector on labeled synthetic clips.")
+    parser.add_argument("--verbose", action="store_true", help="Print per-clip confusion counts")
+    args = parser.parse_args()
+
+    check_labels(args.verbose)
+    check_endpointing()
+    check_barge_in()
+    check_trimming()
+
+    if check.failures:
+        print(f"❌ {check.failures} check(s) failed")
+        sys.exit(1)
+    print("✅ All VAD checks passed")
+
+
+if __name__ == "__main__":
+    main()
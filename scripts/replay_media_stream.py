@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Offline replayer for the Twilio Media Streams session.
+
+Feeds Twilio-style messages into MediaStreamSession with stub STT, LLM and TTS
+providers, so the real-time call path can be exercised without Twilio or API keys.
+
+Recordings are the JSON-lines files written when MEDIA_STREAM_RECORD_DIR is set.
+Without a recording a synthetic call is generated: one burst of "speech" (loud
+noise) followed by silence per scripted caller utterance.
+
+With --streaming-stt the session streams frames to a scripted streaming STT
+provider instead, which reveals each transcript word by word as interim results and
+ends the utterance after a stretch of silence. Replies are then generated
+speculatively from the interim results unless --no-speculation is given; use
+--realtime so the speculation has the time it would have on a live call.
+
+Usage:
+  python scripts/replay_media_stream.py
+  python scripts/replay_media_stream.py --streaming-stt
+  python scripts/replay_media_stream.py --streaming-stt --realtime [--no-speculation]
+  python scripts/replay_media_stream.py --recording media_stream_1_abc.jsonl --realtime
+  python scripts/replay_media_stream.py --transcripts "Yes, who is this?" "Tuesday works" --llm-latency 0.3
+"""
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "media_stream_replay.db"))
+for key in [
+    "GEMINI_API_KEY", "GROQ_API_KEY", "ELEVENLABS_API_KEY", "DEEPGRAM_AUTH_TOKEN",
+    "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "SECRET_KEY",
+]:
+    os.environ.setdefault(key, "replay")
+os.environ.setdefault("AUDIO_DIR", tempfile.gettempdir())
+os.environ.setdefault("PUBLIC_URL", "http://localhost:8000")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from src.services.media_stream import MediaStreamSession  # noqa: E402
+from src.services.streaming_stt import ENDPOINT, FINAL, INTERIM, StreamingSTTSession  # noqa: E402
+from src.utils.audio_helpers import TELEPHONY_SAMPLE_RATE, pcm16_rms, pcm16_to_ulaw, ulaw_to_pcm16  # noqa: E402
+
+FRAME_SAMPLES = TELEPHONY_SAMPLE_RATE // 50  # 20 ms
+
+
+# --- Stub providers -----------------------------------------------------
+
+class StubSTT:
+    """Returns scripted transcripts in order, after a fixed latency."""
+
+    def __init__(self, transcripts, latency: float):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+
+    def transcribe_buffer(self, audio_data: bytes, mimetype: str = "audio/wav") -> str:
+        time.sleep(self.latency)
+        return self.transcripts.pop(0) if self.transcripts else ""
+
+    def open_stream(self, sample_rate: int = TELEPHONY_SAMPLE_RATE, encoding: str = "mulaw"):
+        return ScriptedStreamingSession(self.transcripts, sample_rate=sample_rate, encoding=encoding)
+
+
+class ScriptedStreamingSession(StreamingSTTSession):
+    """
+    Fake streaming STT provider. While the caller is loud it reveals the next scripted
+    transcript one word per `word_ms` of speech as interim results; `end_of_speech_ms`
+    of silence makes the transcript final and ends the utterance.
+    """
+
+    def __init__(self, transcripts, sample_rate: int = TELEPHONY_SAMPLE_RATE, encoding: str = "mulaw",
+                 word_ms: int = 200, end_of_speech_ms: int = 300, speech_rms: int = 500):
+        super().__init__()
+        self.transcripts = transcripts
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.word_ms = word_ms
+        self.end_of_speech_ms = end_of_speech_ms
+        self.speech_rms = speech_rms
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._words_shown = 0
+
+    async def _send(self, chunk: bytes):
+        pcm = ulaw_to_pcm16(chunk) if self.encoding == "mulaw" else chunk
+        chunk_ms = len(pcm) // 2 * 1000 // self.sample_rate
+        if pcm16_rms(pcm) >= self.speech_rms:
+            self._speech_ms += chunk_ms
+            self._silence_ms = 0
+            words = self.transcripts[0].split() if self.transcripts else []
+            shown = min(len(words), self._speech_ms // self.word_ms + 1)
+            if shown > self._words_shown:
+                self._words_shown = shown
+                self._emit(INTERIM, " ".join(words[:shown]))
+            return
+        if not self._speech_ms:
+            return
+        self._silence_ms += chunk_ms
+        if self._silence_ms >= self.end_of_speech_ms:
+            self._emit(FINAL, self.transcripts.pop(0) if self.transcripts else "")
+            self._emit(ENDPOINT, "")
+            self._speech_ms = self._silence_ms = self._words_shown = 0
+
+
+class StubAgent:
+    """Echoes the caller after a fixed "LLM" latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def aget_initial_greeting(self) -> str:
+        await asyncio.sleep(self.latency)
+        return "Hi, this is Alex from QuickFix Services. Is now a good time?"
+
+    async def aprocess_response(self, user_input: str, conversation_history) -> str:
+        await asyncio.sleep(self.latency)
+        return f"You said: {user_input}. Does Tuesday at 10 AM work?"
+
+
+class StubTTS:
+    """Produces a quiet tone whose length follows the text, after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def synthesize_ulaw(self, text: str) -> bytes:
+        time.sleep(self.latency)
+        return self._tone(text)
+
+    async def astream(self, text: str, ulaw: bool = True):
+        """Streams the tone in 100 ms chunks; the first one comes after a third of the latency."""
+        audio = self._tone(text)
+        chunk = TELEPHONY_SAMPLE_RATE // 10
+        for offset in range(0, len(audio), chunk):
+            await asyncio.sleep(self.latency / 3 if offset == 0 else 0.01)
+            yield audio[offset:offset + chunk]
+
+    @staticmethod
+    def _tone(text: str) -> bytes:
+        samples = int(TELEPHONY_SAMPLE_RATE * 0.06 * len(text.split()))
+        pcm = struct.pack(f"<{samples}h", *(int(2000 * math.sin(2 * math.pi * 440 * n / TELEPHONY_SAMPLE_RATE)) for n in range(samples)))
+        return pcm16_to_ulaw(pcm)
+
+
+# --- Message sources ----------------------------------------------------
+
+def media_message(stream_sid: str, pcm: bytes) -> dict:
+    return {"event": "media", "streamSid": stream_sid, "media": {"payload": base64.b64encode(pcm16_to_ulaw(pcm)).decode("ascii")}}
+
+
+def synthetic_call(utterances: int, speech_seconds: float = 1.0, silence_seconds: float = 1.5):
+    stream_sid, call_sid = "MZ_REPLAY", "CA_REPLAY"
+    yield {"event": "connected", "protocol": "Call", "version": "1.0.0"}
+    yield {"event": "start", "streamSid": stream_sid, "start": {"streamSid": stream_sid, "callSid": call_sid}}
+    silence = b"\x00\x00" * FRAME_SAMPLES
+    for _ in range(int(silence_seconds * 50)):
+        yield media_message(stream_sid, silence)
+    for _ in range(utterances):
+        for _ in range(int(speech_seconds * 50)):
+            speech = struct.pack(f"<{FRAME_SAMPLES}h", *(random.randint(-6000, 6000) for _ in range(FRAME_SAMPLES)))
+            yield media_message(stream_sid, speech)
+        for _ in range(int(silence_seconds * 50)):
+            yield media_message(stream_sid, silence)
+    yield {"event": "stop", "streamSid": stream_sid}
+
+
+def recorded_call(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                message = json.loads(line)
+                message.pop("_received_at", None)
+                yield message
+
+
+# --- Replay -------------------------------------------------------------
+
+async def replay(args):
+    sent = []
+    echoes = []
+
+    async def send(message: dict):
+        sent.append((time.perf_counter(), message))
+        if message["event"] == "mark":
+            # Playback is instant offline, so Twilio would echo the mark straight away
+            echoes.append(message)
+
+    session = MediaStreamSession(
+        agent=StubAgent(args.llm_latency),
+        stt=StubSTT(args.transcripts, args.stt_latency),
+        tts=StubTTS(args.tts_latency),
+        send=send,
+        streaming_stt=args.streaming_stt,
+        speculative=not args.no_speculation,
+    )
+
+    messages = recorded_call(args.recording) if args.recording else synthetic_call(len(args.transcripts))
+    started = time.perf_counter()
+    inbound = 0
+    for message in messages:
+        inbound += 1
+        if message.get("event") == "stop":
+            await session.wait_idle()
+        if not await session.handle_message(message):
+            break
+        while echoes:
+            await session.handle_message(echoes.pop(0))
+        # Media frames are 20 ms apart on a real call
+        await asyncio.sleep(0.02 if args.realtime and message.get("event") == "media" else 0)
+    elapsed = time.perf_counter() - started
+
+    outbound_media = sum(1 for _, m in sent if m["event"] == "media")
+    marks = [m["mark"]["name"] for _, m in sent if m["event"] == "mark"]
+    print(f"📼 Replayed {inbound} inbound messages in {elapsed:.2f}s")
+    print(f"🔊 Sent {outbound_media} media chunks and marks {marks}")
+    print("🗣️  Conversation:")
+    for turn in session.conversation_history:
+        print(f"   {turn['role']:>9}: {turn['content']}")
+    for i, metrics in enumerate(session.turn_metrics, 1):
+        print(f"⏱️  Turn {i}: {metrics}")
+    if session.speculator is not None:
+        print(f"🔮 Speculation: {session.speculator.stats.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Twilio Media Streams frames through MediaStreamSession offline.")
+    parser.add_argument("--recording", help="JSON-lines recording written via MEDIA_STREAM_RECORD_DIR")
+    parser.add_argument("--transcripts", nargs="+", default=["Yes, who is this?", "Tuesday works for me"])
+    parser.add_argument("--stt-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.25)
+    parser.add_argument("--tts-latency", type=float, default=0.1)
+    parser.add_argument("--realtime", action="store_true", help="Pace media frames at 20 ms like a live call")
+    parser.add_argument("--streaming-stt", action="store_true", help="Use the scripted streaming STT provider")
+    parser.add_argument("--no-speculation", action="store_true",
+                        help="Do not start the LLM on interim transcripts (streaming STT only)")
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()